@@ -0,0 +1,132 @@
+"""
+Parse time and peak memory of a CBOE delayed-quotes payload (20k contracts):
+json.loads + transform_data vs CboeQuotesParser (streamed chunks) + transform_options.
+
+Run from the project root:  python -m benchmarks.bench_cboe_parse
+"""
+
+import gc
+import json
+import time
+import tempfile
+import tracemalloc
+
+from pathlib import Path
+
+import numpy as np
+
+from pandas import DataFrame
+
+from src.import_data.provider.cboe.cboe_data import transform_data, transform_options
+from src.import_data.provider.cboe.cboe_stream import CboeQuotesParser, STREAM_CHUNK_SIZE
+
+
+CONTRACTS = 20000
+REPEAT = 3
+
+
+def make_payload(n_contracts):
+
+    rng = np.random.default_rng(0)
+    expirations = ['270115', '270219', '270319', '270416', '270521', '270617', '270716', '270820', '270917', '271015']
+
+    options = []
+    for i in range(n_contracts):
+
+        strike = 2000 + (i // 2 // len(expirations)) * 5
+        option_type = 'C' if i % 2 == 0 else 'P'
+        expiration = expirations[(i // 2) % len(expirations)]
+
+        options.append({
+            'option': f'SPX{expiration}{option_type}{strike * 1000:08d}',
+            'bid': round(float(rng.uniform(0, 100)), 2), 'bid_size': int(rng.integers(0, 100)),
+            'ask': round(float(rng.uniform(0, 100)), 2), 'ask_size': int(rng.integers(0, 100)),
+            'iv': round(float(rng.uniform(0.05, 1)), 4), 'open_interest': int(rng.integers(0, 10000)),
+            'volume': int(rng.integers(0, 5000)), 'delta': round(float(rng.uniform(-1, 1)), 4),
+            'gamma': round(float(rng.uniform(0, 0.01)), 6), 'theta': round(float(rng.uniform(-5, 0)), 4),
+            'rho': round(float(rng.uniform(-1, 1)), 4), 'vega': round(float(rng.uniform(0, 10)), 4),
+            'theo': round(float(rng.uniform(0, 100)), 4), 'change': round(float(rng.uniform(-5, 5)), 2),
+            'open': 1.0, 'high': 2.0, 'low': 0.5, 'tick': 'up',
+            'last_trade_price': round(float(rng.uniform(0, 100)), 2), 'last_trade_time': '2026-10-16T15:59:00',
+            'percent_change': round(float(rng.uniform(-50, 50)), 2), 'prev_day_close': round(float(rng.uniform(0, 100)), 2),
+        })
+
+    return {'timestamp': '2026-10-16 16:15:00', 'data': {'symbol': '_SPX', 'current_price': 5800.0, 'options': options}}
+
+
+def load_full(payload_path):
+
+    data = json.loads(Path(payload_path).read_bytes())
+
+    return DataFrame.from_records(data['data'].pop('options')), data
+
+
+def load_stream(payload_path):
+
+    with open(payload_path, 'rb') as f:
+        parser = CboeQuotesParser.parse_chunks(iter(lambda: f.read(STREAM_CHUNK_SIZE), b''), Path(payload_path).stat().st_size)
+
+    return parser.to_frame(), parser
+
+
+def parse_full(payload_path):
+
+    data = json.loads(Path(payload_path).read_bytes())
+
+    return transform_data(data)[0]
+
+
+def parse_stream(payload_path):
+
+    options_df, parser = load_stream(payload_path)
+
+    return transform_options(options_df, parser.current_price)[0]
+
+
+def measure(function, *args):
+
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function(*args)
+    elapsed = (time.perf_counter() - start) / REPEAT
+
+    return elapsed, peak / 1e6, result
+
+
+def main():
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        payload_path = Path(tmp_dir) / 'quotes.json'
+        payload_path.write_text(json.dumps(make_payload(CONTRACTS)))
+
+        print(f"payload: {CONTRACTS} contracts, {payload_path.stat().st_size / 1e6:.1f} MB")
+        print(f"{'parser':<28} {'time s':>8} {'peak MB':>9}")
+
+        rows = [
+            ('json.loads -> DataFrame', load_full),
+            ('streamed -> DataFrame', load_stream),
+            ('json.loads + transform', parse_full),
+            ('streamed + transform', parse_stream),
+        ]
+
+        results = {}
+        for label, function in rows:
+            results[label] = measure(function, payload_path)
+            print(f"{label:<28} {results[label][0]:>8.3f} {results[label][1]:>9.1f}")
+
+        full_df = results['json.loads + transform'][2]
+        stream_df = results['streamed + transform'][2]
+
+        print(f"peak memory ratio (parse): {results['streamed -> DataFrame'][1] / results['json.loads -> DataFrame'][1]:.2f}")
+        print(f"peak memory ratio (import): {results['streamed + transform'][1] / results['json.loads + transform'][1]:.2f}, same chain: {full_df.equals(stream_df)}")
+
+
+if __name__ == '__main__':
+    main()
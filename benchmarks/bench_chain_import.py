@@ -0,0 +1,64 @@
+"""
+Watchlist import throughput (chains/min) against the local CBOE stub (benchmarks/cboe_stub.py) at several
+concurrency levels: quotes downloaded with aiohttp (latency_s added by the server to every response),
+streamed parsing, transform and Parquet write in the transform threads. Chains are written to a temporary
+directory, data/imported is not touched.
+
+Run from the project root:  python -m benchmarks.bench_chain_import [--latency 0.2] [--symbols 32]
+"""
+
+import argparse
+import tempfile
+
+from itertools import product
+from string import ascii_uppercase
+
+from benchmarks.cboe_stub import CboeStub, TemporaryImporter
+
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+SYMBOLS = 32
+CONTRACTS = 2000
+LATENCY_S = 0.2
+
+
+def stub_symbols(n_symbols):
+
+    return [''.join(letters) for letters in product(ascii_uppercase, repeat=3)][:n_symbols]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Watchlist import throughput against a local CBOE stub.')
+    parser.add_argument('--latency', type=float, default=LATENCY_S, help='Seconds added by the stub to each response.')
+    parser.add_argument('--symbols', type=int, default=SYMBOLS)
+    parser.add_argument('--contracts', type=int, default=CONTRACTS, help='Contracts per chain.')
+    parser.add_argument('--rate', type=float, default=0, help='Max requests per second and per host (0: no limit).')
+    args = parser.parse_args()
+
+    symbols = stub_symbols(args.symbols)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, CboeStub(symbols, args.contracts, args.latency) as stub:
+
+        print(f"{args.symbols} chains of {args.contracts} contracts, {args.latency * 1e3:.0f} ms latency, rate limit {args.rate or 'none'}")
+
+        rows = []
+        for concurrency in CONCURRENCY_LEVELS:
+
+            importer = TemporaryImporter(
+                tmp_dir, max_concurrency=concurrency, rate_per_s=args.rate,
+                quotes_url=stub.quotes_url, company_url=stub.company_url, index_url=stub.index_url,
+            )
+            report = importer.import_watchlist(symbols)
+
+            assert not report['failed'], report['failed']
+            rows.append((concurrency, report['elapsed_s'], report['chains_per_min']))
+
+    print(f"\n{'concurrency':>11} {'time s':>8} {'chains/min':>11}")
+    for concurrency, elapsed, chains_per_min in rows:
+        print(f"{concurrency:>11} {elapsed:>8.2f} {chains_per_min:>11.1f}")
+    print(f"speedup {rows[-1][0]} vs 1: {rows[-1][2] / rows[0][2]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+GEX / DEX / VEX tables of a 20k-contract chain: former per-figure pipelines (DataFilter, groupby by
+strike and type, groupby by strike, concat and pivot_table, gammaExposureCalcul run twice) vs
+GreeksExposure.exposureTable (one filter, one grouped reduction for every column).
+
+Run from the project root:  python -m benchmarks.bench_exposures
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.analyzer_greeks import DataFilter, GreeksExposure
+from benchmarks.common import SPOT, make_chain, timed
+
+
+CONTRACTS = 20000
+REPEAT = 5
+RATE = 0.04
+STRIKE_RANGE = (SPOT * 0.9, SPOT * 1.1)
+
+
+class ConstantRate:
+
+    def rate(self, dte):
+        return np.full(len(dte), RATE)
+
+
+def make_exposure():
+
+    greeks_exposure = GreeksExposure.__new__(GreeksExposure)
+    greeks_exposure.show_day = True
+    greeks_exposure.lot_size = 1.0
+    greeks_exposure.last_st = SPOT
+    greeks_exposure.rate_curve = ConstantRate()
+
+    return greeks_exposure
+
+
+def legacy_pivot(df, values):
+
+    df_base = df.groupby(['strike', 'option_type'], as_index=False).agg({value: 'sum' for value in values})
+    df_all = df.groupby('strike', as_index=False).agg({value: 'sum' for value in values})
+    df_all['option_type'] = 'All'
+
+    return pd.pivot_table(pd.concat([df_base, df_all], ignore_index=True), index='strike', values=values, columns=['option_type'], aggfunc='sum')
+
+
+def legacy_tables(chain, greeks_exposure):
+
+    tables = []
+
+    # gammaExposureCalcul, called for the net and the absolute figures
+    for _ in range(2):
+        df = DataFilter(chain, True, None, 'All', *STRIKE_RANGE).dataFilter()
+        df.loc[:, 'base_gex'] = df['open_interest'] * df['gamma'] * SPOT
+        df.loc[df['option_type'] == 'call', 'gex'] = df['base_gex']
+        df.loc[df['option_type'] != 'call', 'gex'] = -df['base_gex']
+        df.loc[df['option_type'] == 'call', 'abs_gex'] = df['base_gex']
+        df.loc[df['option_type'] != 'call', 'abs_gex'] = df['base_gex']
+        df['adj_volume'] = df['open_interest'] + df['volume']
+        tables.append(legacy_pivot(df, ['volume', 'open_interest', 'adj_volume', 'gex', 'abs_gex']))
+
+    # getDeltaExposure
+    df = DataFilter(chain, True, None, 'All', *STRIKE_RANGE).dataFilter()
+    df['dex'] = df['open_interest'] * df['delta']
+    tables.append(legacy_pivot(df, ['dex']))
+
+    # getVannaExposure
+    df = DataFilter(chain, True, None, 'All', *STRIKE_RANGE).dataFilter()
+    base_vex = df['open_interest'] * greeks_exposure.vanna(df) * SPOT * df['implied_volatility'] * SPOT
+    df['vex'] = np.where(df['option_type'] == 'call', base_vex, -base_vex)
+    df['abs_vex'] = base_vex
+    tables.append(legacy_pivot(df, ['vex', 'abs_vex']))
+
+    return tables
+
+
+def single_pass_table(chain, greeks_exposure):
+
+    return greeks_exposure.exposureTable(chain, *STRIKE_RANGE, 'All', None)[0]
+
+
+def main():
+
+    chain = make_chain(CONTRACTS)
+    greeks_exposure = make_exposure()
+
+    legacy_time, legacy_result = timed(legacy_tables, chain, greeks_exposure, repeat=REPEAT)
+    single_time, single_result = timed(single_pass_table, chain, greeks_exposure, repeat=REPEAT)
+
+    max_diff = max(
+        np.nanmax(np.abs(table[column].to_numpy() - single_result[column].to_numpy())) / np.nanmax(np.abs(table[column].to_numpy()))
+        for table in legacy_result for column in table.columns
+    )
+
+    print(f"chain: {CONTRACTS} contracts, {single_result.shape[0]} strikes in range")
+    print(f"{'method':<40} {'time ms':>10}")
+    print(f"{'per-figure pipelines (4 tables)':<40} {legacy_time * 1e3:>10.1f}")
+    print(f"{'exposureTable (single pass)':<40} {single_time * 1e3:>10.1f}")
+    print(f"speedup: {legacy_time / single_time:.1f}x, max relative diff: {max_diff:.2e}")
+
+
+if __name__ == '__main__':
+    main()
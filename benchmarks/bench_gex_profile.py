@@ -0,0 +1,84 @@
+"""
+GEX profile of a 20k-contract chain on a 201-level spot grid: one bs_greeks call per spot level vs
+GexProfile's chunked contracts x grid broadcast (several chunk sizes, peak memory from tracemalloc),
+cached profile lookup and zero-gamma search.
+
+Run from the project root:  python -m benchmarks.bench_gex_profile
+"""
+
+import tracemalloc
+
+import numpy as np
+
+from src.analyzers.bs_greeks import bs_greeks
+from src.analyzers.gex_profile import GexProfile, PROFILE_CACHE, spot_grid
+from benchmarks.common import SPOT, make_chain, timed
+
+
+CONTRACTS = 20000
+REPEAT = 3
+CHUNKS = [25_000, 100_000, 1_000_000]
+
+
+def loop_profile(df, spots):
+
+    sign = np.where(df['option_type'] == 'call', 1.0, -1.0)
+    weight = df['open_interest'].to_numpy(dtype=float) * sign
+
+    net = []
+    for spot in spots:
+        gamma = bs_greeks(spot, df['strike'].to_numpy(), df['dte'].to_numpy() / 365, 0.04,
+                          df['implied_volatility'].to_numpy(), greeks=['gamma'])['gamma']
+        net.append(weight @ gamma * spot)
+
+    return np.array(net)
+
+
+def chunked_profile(df, spots, chunk_elements):
+
+    PROFILE_CACHE.clear()
+
+    return GexProfile(df, 1, r=0.04, chunk_elements=chunk_elements).profile(spots)['net_gex'].to_numpy()
+
+
+def peak_memory(function, *args):
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / 1e6
+
+
+def main():
+
+    df = make_chain(CONTRACTS)
+    spots = spot_grid(SPOT)
+    evaluations = CONTRACTS * spots.size
+
+    loop_time, loop_result = timed(loop_profile, df, spots, repeat=REPEAT)
+
+    print(f"chain: {CONTRACTS} contracts x {spots.size} spot levels")
+    print(f"{'method':<34} {'time ms':>10} {'gammas/s':>14} {'peak MB':>9}")
+    print(f"{'bs_greeks per spot level':<34} {loop_time * 1e3:>10.1f} {evaluations / loop_time:>14,.0f} {peak_memory(loop_profile, df, spots):>9.1f}")
+
+    for chunk_elements in CHUNKS:
+        chunk_time, chunk_result = timed(chunked_profile, df, spots, chunk_elements, repeat=REPEAT)
+        label = f"GexProfile (chunk {chunk_elements:,})"
+        print(f"{label:<34} {chunk_time * 1e3:>10.1f} {evaluations / chunk_time:>14,.0f} {peak_memory(chunked_profile, df, spots, chunk_elements):>9.1f}")
+
+    print(f"max abs diff vs loop: {np.abs(chunk_result - loop_result).max():.2e} (net GEX up to {np.abs(loop_result).max():.2e})")
+
+    gex_profile = GexProfile(df, 1, r=0.04)
+    df_profile = gex_profile.profile(spots)
+
+    cached_time, _ = timed(lambda: GexProfile(df, 1, r=0.04).profile(spots), repeat=REPEAT)
+    zero_time, zero_gamma = timed(gex_profile.zero_gamma, df_profile, SPOT, repeat=REPEAT)
+
+    print(f"cached profile (key + lookup): {cached_time * 1e3:.1f} ms")
+    print(f"zero gamma: {zero_gamma} ({zero_time * 1e3:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Vanna over a 20k-contract chain: former row-wise DataFrame.apply (one scalar norm.pdf per contract,
+VannaCumulative.vanna) vs bs_greeks on the whole arrays, plus the time of the full greek set.
+
+Run from the project root:  python -m benchmarks.bench_greeks
+"""
+
+import numpy as np
+
+from scipy.stats import norm
+
+from src.analyzers.bs_greeks import bs_greeks, is_call, GREEKS
+from benchmarks.common import SPOT, make_chain, timed
+
+
+CONTRACTS = 20000
+REPEAT = 3
+# Columns used by the vanna inputs, the row-wise baseline builds one Series per row from all of them
+CHAIN_COLUMNS = ['strike', 'dte', 'rf', 'implied_volatility', 'option_type']
+
+
+def vanna_row(S, K, T, r, q, sigma):
+
+    S, K, T, r, q, sigma = float(S), float(K), float(T), float(r), float(q), float(sigma)
+
+    if T <= 0 or sigma <= 0:
+        return 0.0
+
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+
+    return np.exp(-q * T) * norm.pdf(d1) * d2 / sigma
+
+
+def apply_vanna(df):
+
+    return df.apply(
+        lambda row: vanna_row(SPOT, row['strike'], float(row['dte']) / 252, row['rf'], 0, row['implied_volatility']),
+        axis=1
+    ).to_numpy()
+
+
+def vector_vanna(df):
+
+    return -bs_greeks(SPOT, df['strike'].to_numpy(), df['dte'].to_numpy() / 252, df['rf'].to_numpy(),
+                      df['implied_volatility'].to_numpy(), greeks=['vanna'])['vanna']
+
+
+def vector_all(df):
+
+    return bs_greeks(SPOT, df['strike'].to_numpy(), df['dte'].to_numpy() / 252, df['rf'].to_numpy(),
+                     df['implied_volatility'].to_numpy(), q=0.012, call=is_call(df['option_type'].to_numpy()))
+
+
+def main():
+
+    df = make_chain(CONTRACTS, min_dte=0)[CHAIN_COLUMNS]
+
+    apply_time, apply_result = timed(apply_vanna, df)
+    vector_time, vector_result = timed(vector_vanna, df, repeat=REPEAT)
+    all_time, _ = timed(vector_all, df, repeat=REPEAT)
+
+    print(f"chain: {CONTRACTS} contracts")
+    print(f"{'method':<32} {'time ms':>10} {'contracts/s':>14}")
+    print(f"{'apply (vanna, row-wise)':<32} {apply_time * 1e3:>10.1f} {CONTRACTS / apply_time:>14,.0f}")
+    print(f"{'bs_greeks (vanna)':<32} {vector_time * 1e3:>10.2f} {CONTRACTS / vector_time:>14,.0f}")
+    print(f"{'bs_greeks (' + str(len(GREEKS)) + ' outputs)':<32} {all_time * 1e3:>10.2f} {CONTRACTS / all_time:>14,.0f}")
+    print(f"speedup (vanna): {apply_time / vector_time:.0f}x, max abs diff: {np.abs(apply_result - vector_result).max():.2e}")
+
+
+if __name__ == '__main__':
+    main()
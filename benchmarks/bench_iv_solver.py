@@ -0,0 +1,89 @@
+"""
+Implied volatility of a 200k-contract chain priced from known volatilities: batched Newton / bisection
+(iv_solver.implied_volatility) vs one scipy brentq per contract (on a sample), plus the full
+solve_chain (mid prices, IV + greeks columns) and Black-76.
+
+Run from the project root:  python -m benchmarks.bench_iv_solver
+"""
+
+import numpy as np
+
+from scipy.optimize import brentq
+
+from src.analyzers.bs_greeks import bs_greeks
+from src.analyzers.iv_solver import implied_volatility, solve_chain
+from benchmarks.common import SPOT, make_chain, timed
+
+
+CONTRACTS = 200000
+BRENTQ_SAMPLE = 2000
+REPEAT = 3
+RATE = 0.04
+
+
+def priced_chain(n_contracts):
+    """
+    make_chain with bid / ask around the Black-Scholes price of its implied_volatility (the true sigma).
+    """
+    df = make_chain(n_contracts)
+
+    sigma = df['implied_volatility'].to_numpy()
+    call = df['option_type'].to_numpy() == 'call'
+
+    price = bs_greeks(SPOT, df['strike'].to_numpy(), df['dte'].to_numpy() / 365, RATE, sigma, call=call, greeks=['price'])['price']
+    spread = np.maximum(price * 0.02, 0.05)
+
+    return df.assign(bid=price - spread / 2, ask=price + spread / 2, price=price, sigma=sigma, call=call)
+
+
+def brentq_iv(df):
+
+    def solve(price, K, T, call):
+        objective = lambda sigma: bs_greeks(SPOT, K, T, RATE, sigma, call=call, greeks=['price'])['price'] - price
+        try:
+            return brentq(objective, 1e-4, 10.0, xtol=1e-12)
+        except ValueError:
+            return np.nan
+
+    return np.array([solve(row.price, row.strike, row.dte / 365, row.call) for row in df.itertuples()])
+
+
+def batched_iv(df, model='black-scholes'):
+
+    S = SPOT * np.exp(RATE * df['dte'].to_numpy() / 365) if model == 'black-76' else SPOT
+
+    return implied_volatility(df['price'].to_numpy(), S, df['strike'].to_numpy(), df['dte'].to_numpy() / 365,
+                              RATE, call=df['call'].to_numpy(), model=model)
+
+
+def main():
+
+    df = priced_chain(CONTRACTS)
+    sample = df.iloc[:BRENTQ_SAMPLE]
+
+    brentq_time, brentq_result = timed(brentq_iv, sample)
+    batched_time, batched_result = timed(batched_iv, df, repeat=REPEAT)
+    black76_time, black76_result = timed(batched_iv, df, 'black-76', repeat=REPEAT)
+    chain_time, chain_result = timed(solve_chain, df, None, 'mid', RATE, repeat=REPEAT)
+
+    brentq_rate = BRENTQ_SAMPLE / brentq_time
+    batched_rate = CONTRACTS / batched_time
+
+    # Deep ITM / far OTM contracts whose price is below the float resolution of the volatility are left NaN
+    solved = np.isfinite(batched_result)
+
+    print(f"chain: {CONTRACTS} contracts (brentq on {BRENTQ_SAMPLE})")
+    print(f"{'method':<36} {'time ms':>10} {'contracts/s':>14}")
+    print(f"{'brentq (per contract)':<36} {brentq_time * 1e3:>10.1f} {brentq_rate:>14,.0f}")
+    print(f"{'implied_volatility (Black-Scholes)':<36} {batched_time * 1e3:>10.1f} {batched_rate:>14,.0f}")
+    print(f"{'implied_volatility (Black-76)':<36} {black76_time * 1e3:>10.1f} {CONTRACTS / black76_time:>14,.0f}")
+    print(f"{'solve_chain (mid, IV + 4 greeks)':<36} {chain_time * 1e3:>10.1f} {CONTRACTS / chain_time:>14,.0f}")
+    print(f"speedup vs brentq: {batched_rate / brentq_rate:.0f}x")
+    print(f"solved: {solved.mean():.2%}, max abs error vs true sigma: {np.abs(batched_result - df['sigma'])[solved].max():.2e}, "
+          f"vs brentq: {np.nanmax(np.abs(batched_result[:BRENTQ_SAMPLE] - brentq_result)):.2e}")
+    print(f"Black-76 vs Black-Scholes max abs diff: {np.nanmax(np.abs(black76_result - batched_result)):.2e}")
+    print(f"solve_chain mid IV solved: {chain_result['iv'].notna().mean():.2%}")
+
+
+if __name__ == '__main__':
+    main()
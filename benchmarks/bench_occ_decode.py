@@ -0,0 +1,75 @@
+"""
+Contract symbol decoding throughput: former regex path of transform_data
+(str.extractall + list comprehensions + DatetimeIndex) vs decode_occ_symbols.
+
+Run from the project root:  python -m benchmarks.bench_occ_decode
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.import_data.occ_symbol import decode_occ_symbols
+from benchmarks.common import timed
+
+
+SIZES = [1000, 20000, 200000]
+REPEAT = 3
+
+
+def make_symbols(n_symbols):
+
+    rng = np.random.default_rng(0)
+
+    roots = np.array(['SPX', 'SPXW', 'NDXP', 'TSLA', 'AAPL', 'MLTX'])[rng.integers(0, 6, n_symbols)]
+    expirations = np.array(['250207', '250321', '251219', '260116', '270115'])[rng.integers(0, 5, n_symbols)]
+    option_types = np.array(['C', 'P'])[rng.integers(0, 2, n_symbols)]
+    strikes = rng.integers(1, 4000, n_symbols) * 5000
+
+    return [f'{root}{expiration}{option_type}{strike:08d}' for root, expiration, option_type, strike in zip(roots, expirations, option_types, strikes)]
+
+
+def regex_decode(symbols):
+
+    option_df_index = pd.Series(symbols).str.extractall(
+        r"^(?P<Ticker>\D*)(?P<expiration>\d*)(?P<option_type>\D*)(?P<strike>\d*)"
+    )
+    option_df_index = option_df_index.reset_index().drop(columns=["match", "level_0"])
+
+    option_df_index.option_type = option_df_index.option_type.str.replace("C", "call").str.replace("P", "put")
+
+    option_df_index.strike = [ele.lstrip("0") for ele in option_df_index.strike]
+    option_df_index.strike = pd.Series(option_df_index.strike).astype(float)
+    option_df_index.strike = option_df_index.strike * (1 / 1000)
+
+    option_df_index.expiration = [ele.lstrip("1") for ele in option_df_index.expiration]
+    option_df_index.expiration = pd.DatetimeIndex(option_df_index.expiration, yearfirst=True).astype(str)
+
+    return option_df_index.rename(columns={"Ticker": "underlying_symbol"})
+
+
+def vector_decode(symbols):
+
+    decoded = decode_occ_symbols(symbols)
+    decoded.expiration = np.datetime_as_string(decoded.expiration.to_numpy(), unit='D').astype(object)
+
+    return decoded
+
+
+def main():
+
+    print(f"{'symbols':>8} {'regex s':>9} {'vector s':>9} {'regex M/s':>10} {'vector M/s':>11} {'speedup':>8} {'same':>5}")
+
+    for n_symbols in SIZES:
+
+        symbols = make_symbols(n_symbols)
+
+        regex_time, regex_df = timed(regex_decode, symbols, repeat=REPEAT)
+        vector_time, vector_df = timed(vector_decode, symbols, repeat=REPEAT)
+
+        same = regex_df[vector_df.columns].equals(vector_df)
+
+        print(f"{n_symbols:>8} {regex_time:>9.4f} {vector_time:>9.4f} {n_symbols / regex_time / 1e6:>10.2f} {n_symbols / vector_time / 1e6:>11.2f} {regex_time / vector_time:>7.1f}x {str(same):>5}")
+
+
+if __name__ == '__main__':
+    main()
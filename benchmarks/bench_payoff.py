@@ -0,0 +1,85 @@
+"""
+Payoff of a 4-leg NDX iron condor: former unit-step list comprehensions (one pd.Series per leg, range
+from RANGE_DW_FACTOR x min strike to RANGE_UP_FACTOR x max strike) + `== 0` breakeven scan vs the
+payoff engine (adaptive grid, legs as one broadcasted array, statistics from the kinks).
+
+Run from the project root:  python -m benchmarks.bench_payoff
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.analyzer_payoff import OptionPayoffManager, RANGE_UP_FACTOR, RANGE_DW_FACTOR
+from src.analyzers.payoff_engine import leg_arrays, payoff_stats
+from benchmarks.common import timed
+
+
+REPEAT = 5
+ST_PRICE = 21000.0
+
+LEGS = (
+    ['put', 'put', 'call', 'call'],
+    ['Long', 'Short', 'Short', 'Long'],
+    [19500.0, 20000.0, 22000.0, 22500.0],
+    [90.5, 160.0, 140.0, 75.0],
+)
+
+
+def legacy_payoff(list_type, list_pos, list_strike, list_premium):
+
+    range_dw = int(RANGE_DW_FACTOR * min(list_strike))
+    range_up = int(RANGE_UP_FACTOR * max(list_strike))
+
+    df = pd.DataFrame()
+
+    for i in range(len(list_type)):
+
+        sign = 1 if list_pos[i] == 'Long' else -1
+
+        if list_type[i] == 'call':
+            payoff = [sign * (max(0, St - list_strike[i]) - list_premium[i]) for St in range(range_dw, range_up)]
+        else:
+            payoff = [sign * (max(0, list_strike[i] - St) - list_premium[i]) for St in range(range_dw, range_up)]
+
+        df[i] = pd.Series(payoff, index=range(range_dw, range_up))
+
+    df['Global Payoff'] = df.sum(axis=1)
+
+    return df
+
+
+def legacy_stats(df):
+
+    break_even_list = [index for index, value in df['Global Payoff'].items() if value == 0]
+
+    return max(df['Global Payoff']), min(df['Global Payoff']), break_even_list
+
+
+def engine_payoff(list_type, list_pos, list_strike, list_premium):
+
+    return OptionPayoffManager().payoffCalculator(list_type, list_pos, list_strike, list_premium, [''] * len(list_type), ST_PRICE, stats=True)
+
+
+def engine_stats(list_type, list_pos, list_strike, list_premium):
+
+    return payoff_stats(*leg_arrays(list_type, list_pos, list_strike, list_premium))
+
+
+def main():
+
+    legacy_time, legacy_df = timed(legacy_payoff, *LEGS, repeat=REPEAT)
+    legacy_stats_time, (legacy_max, legacy_min, legacy_be) = timed(legacy_stats, legacy_df, repeat=REPEAT)
+
+    engine_time, engine_df = timed(engine_payoff, *LEGS, repeat=REPEAT)
+    engine_stats_time, stats = timed(engine_stats, *LEGS, repeat=REPEAT)
+
+    print(f"{'method':<36} {'points':>8} {'payoff ms':>10} {'stats ms':>9}")
+    print(f"{'list comprehensions + == 0 scan':<36} {len(legacy_df):>8} {legacy_time * 1e3:>10.1f} {legacy_stats_time * 1e3:>9.2f}")
+    print(f"{'payoff engine':<36} {len(engine_df):>8} {engine_time * 1e3:>10.1f} {engine_stats_time * 1e3:>9.2f}")
+    print(f"speedup: payoff {legacy_time / engine_time:.0f}x, stats {legacy_stats_time / engine_stats_time:.0f}x")
+    print(f"max profit {legacy_max:,.0f} / {stats['max_profit']:,.0f}, max loss {legacy_min:,.0f} / {stats['max_loss']:,.0f}")
+    print(f"breakevens: scan {legacy_be}, engine {np.round(stats['breakevens'], 2).tolist()}")
+
+
+if __name__ == '__main__':
+    main()
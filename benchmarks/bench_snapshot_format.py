@@ -0,0 +1,60 @@
+"""
+Load time and disk size of imported snapshots: CSV (dask) vs Parquet vs
+Arrow IPC hot tier (memory-mapped, repeated loads).
+
+Run from the project root:  python -m benchmarks.bench_snapshot_format
+"""
+
+import tempfile
+
+from pathlib import Path
+
+from src.import_data.snapshot_store import SnapshotStore
+from system.file_paths import get_data_dir_imported
+from benchmarks.common import timed
+
+
+REPEAT = 5
+
+
+def main():
+
+    store = SnapshotStore()
+    csv_files = sorted(Path(get_data_dir_imported()).glob('*/*/*/*.csv'))
+
+    if not csv_files:
+        print("No CSV snapshot found in data/imported")
+        return
+
+    print(f"{'snapshot':<45} {'rows':>7} {'csv MB':>8} {'pq MB':>8} {'csv s':>8} {'pq s':>8} {'hot s':>8} {'speedup':>8}")
+
+    total_csv_size = total_pq_size = total_csv_time = total_pq_time = total_hot_time = 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        for csv_path in csv_files:
+
+            parquet_path = store.write_snapshot(store.read_snapshot(csv_path, hot_tier=False), Path(tmp_dir) / f'{csv_path.stem}.parquet')
+
+            csv_time, df = timed(store.read_snapshot, csv_path, hot_tier=False, repeat=REPEAT)
+            pq_time, _ = timed(store.read_snapshot, parquet_path, hot_tier=False, repeat=REPEAT)
+
+            store.read_snapshot(csv_path, hot_tier=True)
+            hot_time, _ = timed(store.read_snapshot, csv_path, hot_tier=True, repeat=REPEAT)
+
+            csv_size = csv_path.stat().st_size / 1e6
+            pq_size = parquet_path.stat().st_size / 1e6
+
+            total_csv_size += csv_size
+            total_pq_size += pq_size
+            total_csv_time += csv_time
+            total_pq_time += pq_time
+            total_hot_time += hot_time
+
+            print(f"{csv_path.stem:<45} {len(df):>7} {csv_size:>8.2f} {pq_size:>8.2f} {csv_time:>8.3f} {pq_time:>8.3f} {hot_time:>8.4f} {csv_time / pq_time:>7.1f}x")
+
+    print(f"{'TOTAL':<45} {'':>7} {total_csv_size:>8.2f} {total_pq_size:>8.2f} {total_csv_time:>8.3f} {total_pq_time:>8.3f} {total_hot_time:>8.4f} {total_csv_time / total_pq_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
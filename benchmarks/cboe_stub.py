@@ -0,0 +1,276 @@
+"""
+Local stand-in for the CBOE endpoints of the importer: an aiohttp server on 127.0.0.1 (own event loop,
+background thread) serving the company directory (symboldir.csv), the index directory (indices.json)
+and synthetic delayed quotes (options/<symbol>.json, '_' prefix for indexes).
+Every response carries an ETag and a Last-Modified date, revalidations are answered 304.
+latency_s delays each response (network round trip of the real endpoints).
+
+Used by the benchmarks and checks that need the network without reaching cboe.com:
+
+    with CboeStub(['AAPL', 'SPX'], latency_s=0.2) as stub:
+        ChainImporter(quotes_url=stub.quotes_url, company_url=stub.company_url, index_url=stub.index_url)
+
+or as the mock provider of the capture scheduler (--provider-url):
+
+    python -m benchmarks.cboe_stub AAPL SPX --port 8765
+"""
+
+import json
+import zlib
+import time
+import socket
+import argparse
+import asyncio
+import hashlib
+import threading
+
+from datetime import date, timedelta
+from email.utils import formatdate
+from pathlib import Path
+
+import numpy as np
+
+from aiohttp import web
+
+from src.config.constant import PARQUET_COMPRESSION
+from src.import_data.chain_import import ChainImporter
+from src.import_data.provider.cboe.cboe_data import transform_options
+
+
+INDEX_SYMBOLS = ['SPX', 'NDX', 'RUT', 'VIX', 'XSP']
+EXPIRATIONS = 8
+
+
+def company_directory(symbols):
+
+    lines = ['Company Name, Stock Symbol, DPM Name, Post/Station']
+    lines += [f'{symbol} Stub Inc,{symbol},STUB DPM,1/1' for symbol in symbols]
+
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def index_directory():
+
+    return json.dumps([
+        {'index_symbol': symbol, 'name': f'{symbol} Index', 'source': 'cboe', 'featured': False, 'featured_order': None, 'display': True}
+        for symbol in INDEX_SYMBOLS
+    ]).encode()
+
+
+def quotes_payload(symbol, contracts, spot=100.0):
+    """
+    Delayed-quotes JSON of symbol: contracts calls / puts over EXPIRATIONS monthly expirations.
+    """
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+
+    today = date.today()
+    expirations = [(today + timedelta(days=30 * (i + 1))).strftime('%y%m%d') for i in range(EXPIRATIONS)]
+    strikes_per_expiration = max(contracts // 2 // EXPIRATIONS, 1)
+
+    options = []
+    for i in range(contracts):
+
+        strike = round(spot * (0.5 + (i // 2 // EXPIRATIONS % strikes_per_expiration) / strikes_per_expiration), 1)
+        option_type = 'C' if i % 2 == 0 else 'P'
+        expiration = expirations[(i // 2) % EXPIRATIONS]
+
+        options.append({
+            'option': f'{symbol}{expiration}{option_type}{int(strike * 1000):08d}',
+            'bid': round(float(rng.uniform(0, 10)), 2), 'bid_size': int(rng.integers(0, 100)),
+            'ask': round(float(rng.uniform(0, 10)), 2), 'ask_size': int(rng.integers(0, 100)),
+            'iv': round(float(rng.uniform(0.05, 1)), 4), 'open_interest': int(rng.integers(0, 10000)),
+            'volume': int(rng.integers(0, 5000)), 'delta': round(float(rng.uniform(-1, 1)), 4),
+            'gamma': round(float(rng.uniform(0, 0.01)), 6), 'theta': round(float(rng.uniform(-5, 0)), 4),
+            'rho': round(float(rng.uniform(-1, 1)), 4), 'vega': round(float(rng.uniform(0, 10)), 4),
+            'theo': round(float(rng.uniform(0, 10)), 4), 'change': round(float(rng.uniform(-1, 1)), 2),
+            'open': 1.0, 'high': 2.0, 'low': 0.5, 'tick': 'up',
+            'last_trade_price': round(float(rng.uniform(0, 10)), 2), 'last_trade_time': f'{today.isoformat()}T15:59:00',
+            'percent_change': round(float(rng.uniform(-50, 50)), 2), 'prev_day_close': round(float(rng.uniform(0, 10)), 2),
+        })
+
+    prefix = '_' if symbol in INDEX_SYMBOLS else ''
+
+    return json.dumps({
+        'timestamp': f'{today.isoformat()} 16:15:00',
+        'data': {'symbol': f'{prefix}{symbol}', 'current_price': spot, 'options': options},
+    }).encode()
+
+
+###############################################################
+###############################################################
+### Class -> Stub CBOE server
+###############################################################
+###############################################################
+
+class CboeStub:
+    """
+    Context manager: the server runs between __enter__ and __exit__.
+    requests: (path, headers) of every request received, in order.
+    """
+    def __init__(self, symbols, contracts=2000, latency_s=0.0, host='127.0.0.1', port=0):
+
+        self.symbols = list(symbols)
+        self.contracts = contracts
+        self.latency_s = latency_s
+        self.host = host
+        self.port = port
+
+        self.requests = []
+        self.bodies = {
+            '/symboldir.csv': company_directory(self.symbols),
+            '/indices.json': index_directory(),
+        }
+        # Payloads built upfront, not while the timed requests are served
+        self.bodies.update({self.quotes_path(symbol): quotes_payload(symbol, contracts) for symbol in self.symbols})
+        self.last_modified = {path: formatdate(usegmt=True) for path in self.bodies}
+
+        self.loop = None
+        self.thread = None
+        self.started = threading.Event()
+
+    @property
+    def base_url(self):
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def company_url(self):
+        return f'{self.base_url}/symboldir.csv'
+
+    @property
+    def index_url(self):
+        return f'{self.base_url}/indices.json'
+
+    @property
+    def quotes_url(self):
+        return f'{self.base_url}/options/{{symbol}}.json'
+
+    def set_body(self, path, body):
+        """
+        Replaces the content served at path (new ETag / Last-Modified).
+        """
+        self.bodies[path] = body
+        self.last_modified[path] = formatdate(usegmt=True)
+
+    @staticmethod
+    def quotes_path(symbol):
+
+        return f"/options/{'_' if symbol in INDEX_SYMBOLS else ''}{symbol}.json"
+
+    ###############################################################
+    ### Server
+    ###############################################################
+
+    async def handle(self, request):
+
+        self.requests.append((request.path, dict(request.headers)))
+
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+        body = self.bodies.get(request.path)
+
+        if body is None:
+            raise web.HTTPNotFound()
+
+        headers = {
+            'ETag': f'"{hashlib.sha1(body).hexdigest()[:16]}"',
+            'Last-Modified': self.last_modified[request.path],
+        }
+
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if 'If-None-Match' in request.headers:
+            not_modified = request.headers['If-None-Match'] == headers['ETag']
+        else:
+            not_modified = request.headers.get('If-Modified-Since') == headers['Last-Modified']
+
+        if not_modified:
+            return web.Response(status=304, headers=headers)
+
+        return web.Response(body=body, headers=headers, content_type='text/csv' if request.path.endswith('.csv') else 'application/json')
+
+    def _run(self, sock):
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        app = web.Application()
+        app.router.add_get('/{path:.*}', self.handle)
+
+        runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(runner.setup())
+        self.loop.run_until_complete(web.SockSite(runner, sock).start())
+
+        self.started.set()
+        self.loop.run_forever()
+
+        self.loop.run_until_complete(runner.cleanup())
+        self.loop.close()
+
+    def start(self):
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        self.thread = threading.Thread(target=self._run, args=(sock,), name='CboeStub', daemon=True)
+        self.thread.start()
+        self.started.wait()
+
+        return self
+
+    def stop(self):
+
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+###############################################################
+###############################################################
+### Class -> Importer writing outside data/imported
+###############################################################
+###############################################################
+
+class TemporaryImporter(ChainImporter):
+    """
+    ChainImporter writing the chains to output_dir (<symbol>[_<date>_<hour>].parquet) instead of the snapshot store.
+    """
+    def __init__(self, output_dir, **kwargs):
+
+        super().__init__(**kwargs)
+        self.output_dir = Path(output_dir)
+
+    def save_chain(self, symbol, parser, date_str=None, hour_time=None):
+
+        df, now_ = transform_options(parser.to_frame(), parser.current_price)
+
+        name = '_'.join(part.replace(':', '_') for part in (symbol, date_str, hour_time) if part)
+        file_path = self.output_dir / f'{name}.parquet'
+        df.to_parquet(file_path, compression=PARQUET_COMPRESSION, index=False)
+
+        return file_path
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Serve synthetic CBOE chains from 127.0.0.1 until interrupted.')
+    parser.add_argument('symbols', nargs='+')
+    parser.add_argument('--port', type=int, default=0, help='0: any free port.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to each response.')
+    parser.add_argument('--contracts', type=int, default=2000, help='Contracts per chain.')
+    args = parser.parse_args()
+
+    with CboeStub(args.symbols, args.contracts, args.latency, port=args.port) as stub:
+        print(f"CBOE stub serving {', '.join(args.symbols)} at {stub.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,124 @@
+"""
+Capture scheduler against the local CBOE stub (benchmarks/cboe_stub.py): one scheduled slot run end to end
+(lock, heartbeat during a slow import, retries of an unlisted symbol, lock released), then the lock rules
+(a second scheduler is refused, a stale lock is taken over, the lock of another scheduler is never deleted).
+Chains and the lock file are written to a temporary directory. Asserts each step.
+
+Run from the project root:  python -m benchmarks.check_capture
+"""
+
+import os
+import time
+import tempfile
+import threading
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytz
+
+from src.config.constant import CAPTURE_LOCK_STALE_S
+from src.import_data.capture_scheduler import CaptureScheduler
+from benchmarks.cboe_stub import CboeStub, TemporaryImporter
+
+
+SYMBOLS = ['AAA', 'AAB', 'SPX']
+UNLISTED = 'ZZZ'
+LATENCY_S = 1.0
+HEARTBEAT_S = 0.2
+
+
+class ImmediateScheduler(CaptureScheduler):
+    """
+    Next slot one second from now, whatever the market hours.
+    """
+    def next_slot(self, now):
+
+        return now + timedelta(seconds=1), 'intraday'
+
+
+def make_scheduler(importer, lock_path):
+
+    scheduler = ImmediateScheduler(SYMBOLS + [UNLISTED], importer, jitter_s=0, retries=1, backoff_s=0.1, heartbeat_s=HEARTBEAT_S)
+    scheduler.lock_path = lock_path
+
+    return scheduler
+
+
+def backdate(path, seconds):
+
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def lock_age(path):
+
+    return time.time() - path.stat().st_mtime
+
+
+def main():
+
+    with tempfile.TemporaryDirectory() as tmp_dir, CboeStub(SYMBOLS, contracts=500, latency_s=LATENCY_S) as stub:
+
+        tmp_dir = Path(tmp_dir)
+        lock_path = tmp_dir / 'capture.lock'
+
+        importer = TemporaryImporter(tmp_dir, quotes_url=stub.quotes_url, company_url=stub.company_url, index_url=stub.index_url)
+        scheduler = make_scheduler(importer, lock_path)
+
+        # 1. One slot, run in a thread while the lock is observed
+        runner = threading.Thread(target=scheduler.run, kwargs={'max_runs': 1})
+        runner.start()
+
+        while not stub.requests:
+            time.sleep(0.05)
+
+        # Import in progress (slow responses): the lock is held and refreshed by the heartbeat
+        assert lock_path.read_text() == str(os.getpid())
+        assert not make_scheduler(importer, lock_path).acquire_lock(), 'second scheduler got the lock'
+
+        backdate(lock_path, 2 * CAPTURE_LOCK_STALE_S)
+        time.sleep(3 * HEARTBEAT_S)
+        assert lock_age(lock_path) < 2 * HEARTBEAT_S, f'heartbeat did not refresh the lock ({lock_age(lock_path):.1f}s)'
+
+        runner.join()
+
+        written = sorted(path.name for path in tmp_dir.glob('*.parquet'))
+        assert len(written) == len(SYMBOLS), written
+        assert not lock_path.exists(), 'lock not released'
+        print(f"slot: {len(written)} chains written ({', '.join(written)}), {UNLISTED} failed after retry, lock released")
+
+        # 2. Stale lock of a dead scheduler: taken over, the moved-aside file is deleted
+        lock_path.write_text('999999')
+        backdate(lock_path, 2 * CAPTURE_LOCK_STALE_S)
+
+        assert scheduler.acquire_lock()
+        assert lock_path.read_text() == str(os.getpid())
+        assert not list(tmp_dir.glob('capture.lock.*.stale'))
+        scheduler.release_lock()
+        print("stale lock: taken over")
+
+        # 3. Fresh lock of another scheduler: refused, kept, not deleted on release
+        lock_path.write_text('999999')
+
+        assert not scheduler.acquire_lock()
+        scheduler.release_lock()
+        assert lock_path.read_text() == '999999'
+        print("live lock of another scheduler: refused and kept")
+
+        # 4. Lock lost during a run (taken over by another scheduler): not refreshed, not deleted
+        lock_path.unlink()
+        assert scheduler.acquire_lock()
+        lock_path.write_text('999999')
+        backdate(lock_path, 10)
+
+        time.sleep(3 * HEARTBEAT_S)
+        scheduler.release_lock()
+        assert lock_path.read_text() == '999999' and lock_age(lock_path) > 5
+        print("lost lock: neither refreshed nor deleted")
+
+    print("CaptureScheduler: OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+HttpCache against the local CBOE stub (benchmarks/cboe_stub.py): first fetch (200), fresh hit (no request),
+revalidation after the TTL (If-None-Match sent, 304, cached body), changed content (200, new body),
+server down (stale body). Asserts each step and prints the time of every fetch.
+
+Run from the project root:  python -m benchmarks.check_http_cache
+"""
+
+import time
+import tempfile
+
+from pathlib import Path
+
+import requests
+
+from src.import_data.http_cache import HttpCache
+from benchmarks.cboe_stub import CboeStub, company_directory
+from benchmarks.common import timed
+
+
+TTL_S = 0.5
+
+
+def main():
+
+    with tempfile.TemporaryDirectory() as tmp_dir, CboeStub(['AAPL', 'SPX']) as stub:
+
+        http_cache = HttpCache(session=requests.Session())
+        http_cache.cache_dir = Path(tmp_dir)
+
+        url = stub.company_url
+        steps = []
+
+        # 1. Empty cache: full response
+        elapsed, body = timed(http_cache.get, url, TTL_S)
+        path, headers = stub.requests[-1]
+        assert len(stub.requests) == 1 and 'If-None-Match' not in headers, headers
+        assert body == stub.bodies['/symboldir.csv']
+        steps.append(('200 (empty cache)', elapsed))
+
+        # 2. Younger than the TTL: no request
+        elapsed, body = timed(http_cache.get, url, TTL_S)
+        assert len(stub.requests) == 1
+        assert body == stub.bodies['/symboldir.csv']
+        steps.append(('fresh (no request)', elapsed))
+
+        # 3. TTL expired: conditional request, 304, cached body
+        time.sleep(TTL_S)
+        etag = http_cache._read(url)[1]['etag']
+
+        elapsed, body = timed(http_cache.get, url, TTL_S)
+        path, headers = stub.requests[-1]
+        assert len(stub.requests) == 2, stub.requests
+        assert headers.get('If-None-Match') == etag and headers.get('If-Modified-Since'), headers
+        assert body == stub.bodies['/symboldir.csv']
+        steps.append(('304 (revalidated)', elapsed))
+
+        # The 304 restarts the TTL
+        http_cache.get(url, TTL_S)
+        assert len(stub.requests) == 2
+
+        # 4. Content changed on the server: new ETag, 200, cache updated
+        stub.set_body('/symboldir.csv', company_directory(['AAPL', 'SPX', 'TSLA']))
+        time.sleep(TTL_S)
+
+        elapsed, body = timed(http_cache.get, url, TTL_S)
+        path, headers = stub.requests[-1]
+        assert len(stub.requests) == 3 and headers.get('If-None-Match') == etag, headers
+        assert body == stub.bodies['/symboldir.csv'] and b'TSLA' in body
+        assert http_cache._read(url)[1]['etag'] != etag
+        steps.append(('200 (changed content)', elapsed))
+
+        # 5. Server down: the stale body is returned
+        stub.stop()
+        time.sleep(TTL_S)
+
+        elapsed, body = timed(http_cache.get, url, TTL_S)
+        assert b'TSLA' in body
+        steps.append(('server down (stale)', elapsed))
+
+    print(f"{'fetch':<24} {'time ms':>8}")
+    for label, elapsed in steps:
+        print(f"{label:<24} {elapsed * 1e3:>8.2f}")
+    print("HttpCache revalidation: OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Helpers shared by the benchmarks and checks: timed() and the synthetic option chain of the analyzer benchmarks.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+SPOT = 21000.0
+
+
+def timed(function, *args, repeat=1, **kwargs):
+    """
+    (mean seconds per call over repeat calls, result of the last call).
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args, **kwargs)
+
+    return (time.perf_counter() - start) / repeat, result
+
+
+def make_chain(n_contracts, spot=SPOT, min_dte=1):
+    """
+    Seeded random chain around spot: strikes on a 5-point grid from 0.7x to 1.3x spot, dte in [min_dte, 400),
+    volatilities, rates, greeks, open interest and volume (same contracts on every run).
+    """
+    rng = np.random.default_rng(0)
+
+    dte = rng.integers(min_dte, 400, n_contracts)
+
+    return pd.DataFrame({
+        'strike': np.round(rng.uniform(0.7, 1.3, n_contracts) * spot / 5) * 5,
+        'dte': dte,
+        'expiration': dte,
+        'rf': rng.uniform(0.03, 0.05, n_contracts),
+        'implied_volatility': rng.uniform(0.1, 0.6, n_contracts),
+        'open_interest': rng.integers(0, 5000, n_contracts),
+        'volume': rng.integers(0, 500, n_contracts),
+        'gamma': rng.uniform(0, 1e-3, n_contracts),
+        'delta': rng.uniform(-1, 1, n_contracts),
+        'option_type': np.where(rng.integers(0, 2, n_contracts) == 0, 'call', 'put'),
+        'underlying_price': spot,
+    })
@@ -15,6 +15,7 @@ import src.gui.callbacks.callBackSettings
 import src.gui.callbacks.callBackImportData
 import src.gui.callbacks.callBackMarketMetrics
 import src.gui.callbacks.callBackPayoff
+from src.import_data.snapshot_dataset import SnapshotDataset
 from system.process_manager import terminate_when_parent_process_dies
 
 
@@ -126,6 +127,8 @@ def run_dash(host: str, port: int, server_is_started: Condition):
                 server_is_started.notify_all()
             app.server._got_first_request = True
     
+    SnapshotDataset().start_background()
+
     app.run_server(debug=False, host=host, port=port)
 
 
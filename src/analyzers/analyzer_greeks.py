@@ -7,9 +7,13 @@ import yfinance as yf
 import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
-from scipy.stats import norm
 
+from src.config.constant import GREEKS_YEAR_DAYS
 from src.import_data.utils import LoadingData
+from src.import_data.rate_curve import RateCurve
+from src.import_data.chain_schema import ChainSchema
+from src.analyzers.bs_greeks import bs_greeks
+from src.analyzers.gex_profile import GexProfile, spot_grid
 
 ################################################################################
 ###  Dataframe filtering
@@ -45,7 +49,7 @@ class DataFilter:
                 
             else:
                 exp_selected = [pd.to_datetime(exp) for exp in exp_selected]
-                self.df[col] = pd.to_datetime(df[col])
+                self.df[col] = ChainSchema.expiration_dates(df[col])
 
             df = df[df[col].isin(exp_selected)].copy()
 
@@ -56,7 +60,7 @@ class DataFilter:
                 
             else:
                 exp_selected = pd.to_datetime(exp_selected)
-                df[col] = pd.to_datetime(df[col])
+                df[col] = ChainSchema.expiration_dates(df[col])
             
             df = df[df[col] <= exp_selected].copy()
 
@@ -65,248 +69,152 @@ class DataFilter:
         return df
 
 ################################################################################
-###  Gamma Exposure
+###  Greeks Exposure (GEX / DEX / VEX)
 ################################################################################
 
-class GammaExposure:
-    def __init__(self, selected_date, selected_hour, info, show_day):
+EXPOSURE_COLUMNS = ['volume', 'open_interest', 'adj_volume', 'gex', 'abs_gex', 'dex', 'vex', 'abs_vex']
+
+class GreeksExposure:
+    def __init__(self, selected_date, selected_hour, info, show_day, dataframe=None):
 
-        self.selected_date = selected_date
+        self.selected_date = pd.to_datetime(selected_date)
         self.info = info
         self.show_day = show_day
         self.st_ticker = info['underlying_ticker']
 
-        self.last_st = LoadingData().get_st_price_hour(None, selected_date, selected_hour, self.st_ticker)
-
         self.lot_size = float(self.info['lot_size'])
 
-    def gammaExposureCalcul(self, dataframe, gex_type, vol_type, strike_dw, strike_up, exp_type, exp_selected, plot=True):
+        self.last_st = LoadingData().get_spot(self.st_ticker, selected_date, selected_hour, dataframe=dataframe)
+        self.rate_curve = RateCurve(self.selected_date)
 
-        df = DataFilter(dataframe, self.show_day, exp_selected, exp_type, strike_dw, strike_up).dataFilter()
+    def zeroGamma(self, df):
+        """
+        Zero-gamma level (net GEX sign flip) of the selected expirations, from the GEX profile around the spot.
+        """
+        gex_profile = GexProfile(df, self.lot_size, r=self.rate_curve.rate(df['dte'].fillna(0)))
+        df_profile = gex_profile.profile(spot_grid(self.last_st))
 
-     
-        df.loc[:, 'open_interest'] = pd.to_numeric(df['open_interest'], errors='coerce')
-        df.loc[:, 'gamma'] = pd.to_numeric(df['gamma'], errors='coerce')
+        return gex_profile.zero_gamma(df_profile, self.last_st)
 
-        df.loc[:, 'base_gex'] = df['open_interest'].astype(float) * df['gamma'].astype(float) * float(self.lot_size) * float(self.last_st)
-    
+    def vanna(self, df):
 
-        df.loc[df['option_type'] == 'call', 'gex'] = df['base_gex']
-        df.loc[df['option_type'] != 'call', 'gex'] = -df['base_gex']
+        mask = (df['dte'].notna() & 
+               df['strike'].notna() & 
+               df['implied_volatility'].notna())
+        
+        df['rf'] = self.rate_curve.rate(df['dte'].fillna(0))
+
+        # Whole chain at once (bs_greeks), sign of the dashboard's VEX convention: e^(-qT) N'(d1) d2 / sigma
+        vanna = bs_greeks(
+            S=self.last_st,
+            K=df['strike'].to_numpy(dtype=float, na_value=np.nan),
+            T=df['dte'].to_numpy(dtype=float, na_value=np.nan) / GREEKS_YEAR_DAYS,
+            r=df['rf'].to_numpy(dtype=float, na_value=np.nan),
+            sigma=df['implied_volatility'].to_numpy(dtype=float, na_value=np.nan),
+            q=0,
+            greeks=['vanna'],
+        )['vanna']
+
+        return np.where(mask, -vanna, 0.0)
+
+    def exposureTable(self, dataframe, strike_dw, strike_up, exp_type, exp_selected):
+        """
+        Filters the chain once and reduces every exposure column in one groupby:
+        columns (metric, 'call' / 'put' / 'All') indexed by strike, and the imported spot.
+        """
+        df = DataFilter(dataframe, self.show_day, exp_selected, exp_type, strike_dw, strike_up).dataFilter()
 
-        df.loc[df['option_type'] == 'call', 'abs_gex'] = df['base_gex']
-        df.loc[df['option_type'] != 'call', 'abs_gex'] = df['base_gex']
+        # open_interest / greeks are numeric (chain schema enforced at import)
+        sign = np.where(df['option_type'] == 'call', 1.0, -1.0)
 
-        df.loc[:, 'gex'] = df['gex'].fillna(0)
-        df.loc[:, 'abs_gex'] = df['abs_gex'].fillna(0)
+        base_gex = (df['open_interest'] * df['gamma'] * self.lot_size * float(self.last_st)).fillna(0)
+        base_vex = (df['open_interest'] * self.vanna(df) * self.lot_size * float(self.last_st) * df['implied_volatility'] * self.last_st).fillna(0)
 
         df['adj_volume'] = df['open_interest'] + df['volume']
+        df['gex'] = sign * base_gex
+        df['abs_gex'] = base_gex
+        df['dex'] = df['open_interest'] * df['delta'] * self.lot_size
+        df['vex'] = sign * base_vex
+        df['abs_vex'] = base_vex
 
-        df_base = df.groupby(['strike', 'option_type'], as_index=False).agg({
-            'volume': 'sum',
-            'open_interest': 'sum',
-            'adj_volume': 'sum',
-            'gex': 'sum',
-            'abs_gex': 'sum'
-        })
-
-        df_all = df.groupby('strike', as_index=False).agg({
-            'volume': 'sum',
-            'open_interest': 'sum',
-            'adj_volume': 'sum',
-            'gex': 'sum',
-            'abs_gex': 'sum'
-        })
-        df_all['option_type'] = 'All'  
-
-        df_final = pd.concat([df_base, df_all], ignore_index=True)
-        
-        df_pivot = pd.pivot_table(
-            data=df_final,
-            index='strike',
-            values=['adj_volume', 'volume', 'open_interest', 'gex', 'abs_gex'],
-            columns=['option_type'],
-            aggfunc='sum',
-        )
+        df_pivot = df.groupby(['strike', 'option_type'])[EXPOSURE_COLUMNS].sum().unstack('option_type')
+
+        for column in EXPOSURE_COLUMNS:
+            df_pivot[(column, 'All')] = df_pivot[column].sum(axis=1)
+
+        df_pivot = df_pivot.sort_index(axis=1)
+        df_pivot.columns.names = [None, 'option_type']
 
         st_imported_data = df['underlying_price'].iloc[0]
 
-        if plot:
-            fig = PlotGreeks().plotNetGex(df_pivot, gex_type, vol_type, self.last_st, st_imported_data)
-            return fig
+        return df_pivot, st_imported_data
 
-        return None
+    def exposureFigures(self, dataframe, vol_type, strike_dw, strike_up, exp_type, exp_selected):
+        """
+        Net GEX, absolute GEX, DEX and VEX figures from a single exposure table.
+        """
+        df_pivot, st_imported_data = self.exposureTable(dataframe, strike_dw, strike_up, exp_type, exp_selected)
 
-################################################################################
-###  Delta Exposure
-################################################################################
+        # Every strike of the selected expirations moves the zero-gamma level, not only the displayed range
+        zero_gamma = self.zeroGamma(DataFilter(dataframe, self.show_day, exp_selected, exp_type, 0, np.inf).dataFilter())
 
-class DeltaExposure:
-    def __init__(self, selected_date, selected_hour, info, show_day):
+        plot_greeks = PlotGreeks()
 
-        self.selected_date = pd.to_datetime(selected_date)
-        self.info = info
-        self.show_day = show_day
-        self.st_ticker = info['underlying_ticker']
+        fig_net_gex = plot_greeks.plotNetGex(df_pivot, 'net', vol_type, self.last_st, st_imported_data, zero_gamma)
+        fig_abs_gex = plot_greeks.plotNetGex(df_pivot, 'abs', vol_type, self.last_st, st_imported_data, zero_gamma)
+        fig_dex = plot_greeks.plotDex(df_pivot, self.last_st, st_imported_data)
+        fig_vex = plot_greeks.plotVex(df_pivot, self.last_st, st_imported_data)
 
-        self.lot_size = float(self.info['lot_size'])
-     
-        self.last_st = LoadingData().get_st_price_hour(None, selected_date, selected_hour, self.st_ticker)
+        return fig_net_gex, fig_abs_gex, fig_dex, fig_vex
 
-    def getDeltaExposure(self, dataframe, strike_dw, strike_up, exp_type, exp_selected, plot=True):
+################################################################################
+###  Gamma Exposure
+################################################################################
 
-        df = DataFilter(dataframe, self.show_day, exp_selected, exp_type, strike_dw, strike_up).dataFilter()
-        
-        df['strike'] = pd.to_numeric(df['strike'], errors='coerce')
-        df['delta'] = pd.to_numeric(df['delta'], errors='coerce')
-        
-        df.loc[:, 'open_interest'] = pd.to_numeric(df['open_interest'], errors='coerce')
-        df.loc[:, 'delta'] = pd.to_numeric(df['delta'], errors='coerce')
+class GammaExposure(GreeksExposure):
 
+    def gammaExposureCalcul(self, dataframe, gex_type, vol_type, strike_dw, strike_up, exp_type, exp_selected, plot=True):
 
-        df['dex'] = df['open_interest'].astype(float) * df['delta'].astype(float) * float(self.lot_size) 
+        df_pivot, st_imported_data = self.exposureTable(dataframe, strike_dw, strike_up, exp_type, exp_selected)
 
-        df_base = df.groupby(['strike', 'option_type'], as_index=False).agg({
-            'dex': 'sum',
-        })
+        if plot:
+            zero_gamma = self.zeroGamma(DataFilter(dataframe, self.show_day, exp_selected, exp_type, 0, np.inf).dataFilter())
+            fig = PlotGreeks().plotNetGex(df_pivot, gex_type, vol_type, self.last_st, st_imported_data, zero_gamma)
+            return fig
 
-        df_all = df.groupby('strike', as_index=False).agg({
-            'dex': 'sum',
-        })
+        return None
 
-        df_all['option_type'] = 'All'  
+################################################################################
+###  Delta Exposure
+################################################################################
 
-        df_final = pd.concat([df_base, df_all], ignore_index=True)
-        
-        df_pivot = pd.pivot_table(
-            data=df_final,
-            index='strike',
-            values=['dex'],
-            columns=['option_type'],
-            aggfunc='sum',
-        )
+class DeltaExposure(GreeksExposure):
 
-        st_imported_data = df['underlying_price'].iloc[0]
+    def getDeltaExposure(self, dataframe, strike_dw, strike_up, exp_type, exp_selected, plot=True):
+
+        df_pivot, st_imported_data = self.exposureTable(dataframe, strike_dw, strike_up, exp_type, exp_selected)
 
         if plot:
             fig = PlotGreeks().plotDex(df_pivot, self.last_st, st_imported_data)
             return fig
 
-        return df_pivot
+        return df_pivot[['dex']]
 
 ################################################################################
 ###  Vanna Exposure
 ################################################################################
 
-class VannaCumulative:
-    def __init__(self, selected_date, selected_hour, info, show_day):
-        
-        self.selected_date = pd.to_datetime(selected_date)
-        self.info = info
-        self.show_day = show_day
-        self.st_ticker = info['underlying_ticker']
-
-        self.lot_size = float(self.info['lot_size'])
-     
-        self.last_st = LoadingData().get_st_price_hour(None, selected_date, selected_hour, self.st_ticker)
-        self.rf = float(LoadingData().get_last_st(None, True, self.selected_date, '^IRX'))
-
-    def vanna(self, S: float, K: float, T: float, r: float, q: float, sigma: float) -> float:
-
-        S = float(S)
-        K = float(K)
-        T = float(T)
-        r = float(r)
-        q = float(q)
-        sigma = float(sigma)
-        
-        if T <= 0 or sigma <= 0:
-            return 0.0
-            
-        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-        N_prime_d1 = norm.pdf(d1)
-        
-        return np.exp(-q * T) * N_prime_d1 * d2 / sigma
+class VannaCumulative(GreeksExposure):
 
     def getVannaExposure(self, dataframe, strike_dw, strike_up, exp_type, exp_selected, plot=True) -> pd.DataFrame:
-        
-        df = DataFilter(dataframe, self.show_day, exp_selected, exp_type, strike_dw, strike_up).dataFilter()
-        
-        df['strike'] = pd.to_numeric(df['strike'], errors='coerce')
-        df['implied_volatility'] = pd.to_numeric(df['implied_volatility'], errors='coerce')
-        
-        mask = (df['dte'].notna() & 
-               df['strike'].notna() & 
-               df['implied_volatility'].notna())
-        
-        
-        df['vanna'] = 0.0  
-
-        df.loc[mask, 'vanna'] = df[mask].apply(
-            lambda row: self.vanna(
-                S=self.last_st,
-                K=float(row['strike']),  
-                T=float(row['dte'])/252,
-                r=self.rf/100,
-                q=0,
-                sigma=float(row['implied_volatility'])
-            ),
-            axis=1
-        )
-
-        base_vex = df['open_interest'].astype(float) * \
-               df['vanna'].astype(float) * \
-               float(self.lot_size) * \
-               float(self.last_st) * \
-               df['implied_volatility'].astype(float) * \
-               self.last_st
-    
-        df['vex'] = np.where(
-            df['option_type'] == 'call',
-            +base_vex,
-            base_vex * -1
-        )
-
-        df['abs_vex'] = np.where(
-            df['option_type'] == 'call',
-            base_vex,
-            base_vex 
-        )
 
-        df['vex'] = df['vex'].fillna(0)
-        df['abs_vex'] = df['abs_vex'].fillna(0)
-
- 
-
-        df_base = df.groupby(['strike', 'option_type'], as_index=False).agg({
-            'vex': 'sum',
-            'abs_vex': 'sum'
-        })
-
-        df_all = df.groupby('strike', as_index=False).agg({
-            'vex': 'sum',
-            'abs_vex': 'sum'
-        })
-        df_all['option_type'] = 'All'  
-
-        df_final = pd.concat([df_base, df_all], ignore_index=True)
-        
-        df_pivot = pd.pivot_table(
-            data=df_final,
-            index='strike',
-            values=['vex', 'abs_vex'],
-            columns=['option_type'],
-            aggfunc='sum',
-        )
-        
-        st_imported_data = df['underlying_price'].iloc[0]
+        df_pivot, st_imported_data = self.exposureTable(dataframe, strike_dw, strike_up, exp_type, exp_selected)
 
         if plot:
             fig_vanna = PlotGreeks().plotVex(df_pivot, self.last_st, st_imported_data)
             return fig_vanna
 
-        return df_pivot
+        return df_pivot[['abs_vex', 'vex']]
 
 ##########################################################################################
 ###    Plot
@@ -326,6 +234,8 @@ class PlotGreeks:
         call_color = '#01ac2d'  
         put_color = '#E74C3C'
 
+        # Shown as absolute put DEX (copy: the exposure table is shared by the other figures)
+        df_pivot = df_pivot.copy()
         df_pivot[('dex', 'put')] = df_pivot[('dex', 'put')] * -1
 
         fig.add_trace(
@@ -446,7 +356,7 @@ class PlotGreeks:
 
         return fig
 
-    def plotNetGex(self, df, gex_type, vol_type, last_st, st_imported):
+    def plotNetGex(self, df, gex_type, vol_type, last_st, st_imported, zero_gamma=None):
      
         vol_type_map = {
             'volume': ('volume', 'Volume'),
@@ -516,6 +426,21 @@ class PlotGreeks:
             name=f"{last_st:,.2f} (last St)"
         )
 
+        if zero_gamma is not None and df.index.min() <= zero_gamma <= df.index.max():
+            fig.add_shape(
+                type="line",
+                x0=zero_gamma,
+                x1=zero_gamma,
+                y0=y_min_with_margin,
+                y1=y_max_with_margin,
+                xref="x",
+                yref="y",
+                line=dict(color="#F39C12", width=2, dash="dot"),
+                layer="below",
+                showlegend=True,
+                name=f"{zero_gamma:,.2f} (zero gamma)"
+            )
+
         # Plot GEX
         fig.add_trace(
             go.Bar(
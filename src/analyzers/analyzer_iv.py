@@ -4,7 +4,6 @@ from datetime import date, timedelta, datetime
 
 import pandas as pd
 import pytz
-import yfinance as yf
 import plotly.graph_objects as go
 
 from scipy.interpolate import PchipInterpolator, griddata
@@ -12,6 +11,13 @@ from scipy.signal import savgol_filter
 
 from src.config.constant import UTC, CBOE_CLOSE_UTC
 from src.import_data.utils import LoadingData, ConvertData, CheckFileAndData
+from src.import_data.catalog import SnapshotCatalog
+from src.analyzers.history_scan import HistoryScan
+from src.import_data.bar_store import BarStore
+from src.import_data.quality_flags import clean_mask, QUALITY_COLUMN, IV_FLAGS
+
+
+HISTORY_COLUMNS = ['underlying_price', 'expiration', 'dte', 'strike', 'option_type', 'implied_volatility', 'delta', QUALITY_COLUMN]
 
 
 ################################################################################
@@ -36,10 +42,10 @@ class IVSmileByStrike:
 
         self.last_st = LoadingData().get_last_st(info)
 
-        self.st_date1 = LoadingData().get_st_price_hour(None, selected_date, selected_hour, underlying_ticker)
+        self.st_date1 = LoadingData().get_spot(underlying_ticker, selected_date, selected_hour, selected_option=selected_option)
 
         if variation_dates:
-            self.st_date2 = LoadingData().get_st_price_hour(None, selected_date2, selected_hour2, underlying_ticker)
+            self.st_date2 = LoadingData().get_spot(underlying_ticker, selected_date2, selected_hour2, selected_option=selected_option)
 
 
     def get_moneyness(self, moneyness, df_pivot, current_st):
@@ -107,14 +113,15 @@ class IVSmileByStrike:
                 date_list2 = [pd.to_datetime(item).date() for item in self.exp_list2]
                 var_df[col] = pd.to_datetime(var_df[col])
 
-        mask = df[col].isin(date_list)
+        # Zero / outlier IVs (quality flags) are not plotted
+        mask = df[col].isin(date_list) & clean_mask(df, IV_FLAGS)
         filtered_df = df[mask].copy()
         filtered_df.loc[:, 'implied_volatility'] = filtered_df['implied_volatility'] * 100
         
         if self.variation_dates:
             var_df_copy = var_df.copy()
             var_df_copy['dataframe_type'] = 'compare'
-            mask2 = var_df_copy[col].isin(date_list2)
+            mask2 = var_df_copy[col].isin(date_list2) & clean_mask(var_df_copy, IV_FLAGS)
             filtered_df2 = var_df_copy[mask2].copy()
             filtered_df2.loc[:, 'implied_volatility'] = filtered_df2['implied_volatility'] * 100
 
@@ -184,22 +191,20 @@ class IVAtmAndRealizedVolatility:
     
     def getAvailableDate(self, list_available_dates):
 
-        available_data = {}
-
-        for date_obj in list_available_dates:
-          
-            list_available_hour = LoadingData().load_date_imported(self.selected_option, True, date_obj)
- 
-            if date_obj not in available_data:
-                available_data[date_obj.strftime('%Y-%m-%d')] = [] 
+        if not list_available_dates:
+            return {}
 
-            available_data[date_obj.strftime('%Y-%m-%d')].extend(list_available_hour)
+        available_data = SnapshotCatalog().list_snapshots(
+            self.selected_option,
+            min(list_available_dates).strftime('%Y-%m-%d'),
+            max(list_available_dates).strftime('%Y-%m-%d'),
+        )
 
         return available_data
 
     def filterOptionsAtm(self, df, option_type, get_st):
          
-        df_filtered = df[df['option_type'] == option_type].copy()
+        df_filtered = df[(df['option_type'] == option_type) & clean_mask(df, IV_FLAGS)].copy()
         df_filtered['strike_diff'] = df_filtered['strike'].sub(get_st).abs()
         idx_min_strike = df_filtered.groupby('dte')['strike_diff'].idxmin()
         return df_filtered.loc[idx_min_strike]
@@ -239,66 +244,65 @@ class IVAtmAndRealizedVolatility:
         
         return iv_target, dte_1, dte_2
 
-    def getIVandRVData(self, indicator_exp='closest'):
+    def ivAtmSnapshot(self, df, key, element, indicator_exp='closest'):
+        """
+        [mean_iv, call_iv, put_iv, dte_1, dte_2] for one snapshot (run in the HistoryScan workers).
+        """
+        call_value, put_value, dte_1, dte_2, useless1, useless2  = np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
 
-        iv_dict = {}
+        # Snapshot columns are typed by the chain schema (numeric, datetime64 expiration)
+        get_st = df['underlying_price']
 
-        list_available_dates = self.loadHistory()
-        available_data = self.getAvailableDate(list_available_dates)
+        df_call = self.filterOptionsAtm(df, 'call', get_st)
+        df_put = self.filterOptionsAtm(df, 'put', get_st)
 
-        for key, item in available_data.items():
-         
-            for index, element in enumerate(item):
+        if indicator_exp == 'closest':
+            if not df_call.empty and 'dte' in df_call.columns:
+                min_date_idx = df_call['dte'].idxmin()
+                df_call = df_call.loc[min_date_idx:min_date_idx + 1]
+            
+            if not df_put.empty and 'dte' in df_put.columns:
+                min_date_idx = df_put['dte'].idxmin()
+                df_put = df_put.loc[min_date_idx:min_date_idx + 1]
 
-                call_value, put_value, dte_1, dte_2, useless1, useless2  = np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
+            call_value = df_call['implied_volatility'].iloc[0] if not df_call.empty else np.nan
+            put_value = df_put['implied_volatility'].iloc[0] if not df_put.empty else np.nan
 
-                if element == 'close':  
-                    item[index] = CBOE_CLOSE_UTC 
+            dte_1 = df_call['dte'].iloc[0]
+            dte_2 = df_put['dte'].iloc[0]
 
-                df = LoadingData().get_data_csv(self.selected_option, key, item[index])
-                df['underlying_price'] = pd.to_numeric(df['underlying_price'], errors='coerce')
-                get_st = df['underlying_price']
+        elif indicator_exp == '30':
 
-                df['expiration'] = pd.to_datetime(df['expiration'])
+            call_value, dte_1, dte_2= self.interpolateIvATM(df_call, 30)
+            put_value, useless1, useless2 = self.interpolateIvATM(df_put, 30)
 
-                df_call = self.filterOptionsAtm(df, 'call', get_st)
-                df_put = self.filterOptionsAtm(df, 'put', get_st)
+        mean_iv = (call_value + put_value) / 2
 
-                df_call['implied_volatility'] = pd.to_numeric(df_call['implied_volatility'], errors='coerce')
-                df_put['implied_volatility'] = pd.to_numeric(df_put['implied_volatility'], errors='coerce')
+        return [float(mean_iv), call_value, put_value, dte_1, dte_2]
 
-                if indicator_exp == 'closest':
-                    if not df_call.empty and 'dte' in df_call.columns:
-                        min_date_idx = df_call['dte'].idxmin()
-                        df_call = df_call.loc[min_date_idx:min_date_idx + 1]
-                    
-                    if not df_put.empty and 'dte' in df_put.columns:
-                        min_date_idx = df_put['dte'].idxmin()
-                        df_put = df_put.loc[min_date_idx:min_date_idx + 1]
+    def getIVandRVData(self, indicator_exp='closest'):
 
-                    call_value = df_call['implied_volatility'].iloc[0] if not df_call.empty else np.nan
-                    put_value = df_put['implied_volatility'].iloc[0] if not df_put.empty else np.nan
+        if indicator_exp not in ('closest', '30'):
+            return None
 
-                    dte_1 = df_call['dte'].iloc[0]
-                    dte_2 = df_put['dte'].iloc[0]
+        iv_dict = {}
 
-                elif indicator_exp == '30':
+        list_available_dates = self.loadHistory()
+        available_data = self.getAvailableDate(list_available_dates)
 
-                    call_value, dte_1, dte_2= self.interpolateIvATM(df_call, 30)
-                    put_value, useless1, useless2 = self.interpolateIvATM(df_put, 30)
-                
-                else:
-                    return None
+        scan_results = HistoryScan(self.selected_option, columns=HISTORY_COLUMNS).run(
+            available_data, self.ivAtmSnapshot, indicator_exp=indicator_exp
+        )
 
-                mean_iv = (call_value + put_value) / 2
+        for key, element, values in scan_results:
 
-                date_time_str = f"{key} {item[index]}"
-                date_time_obj = datetime.strptime(date_time_str, "%Y-%m-%d %H_%M")
+            date_time_str = f"{key} {CBOE_CLOSE_UTC if element == 'close' else element}"
+            date_time_obj = datetime.strptime(date_time_str, "%Y-%m-%d %H_%M")
 
-                new_key = date_time_obj.strftime("%Y-%m-%d-%H-%M")
+            new_key = date_time_obj.strftime("%Y-%m-%d-%H-%M")
 
-                if new_key not in iv_dict:
-                    iv_dict[new_key] = [float(mean_iv), call_value, put_value, dte_1, dte_2]
+            if new_key not in iv_dict:
+                iv_dict[new_key] = values
 
 
         final_df = pd.DataFrame.from_dict(iv_dict, orient='index', columns=['mean_iv', 'call_iv', 'put_iv', 'dte_1', 'dte_2'])
@@ -336,12 +340,7 @@ class IVAtmAndRealizedVolatility:
                         for i in range(1, 7):
                             new_closest_day = date_listed - pd.Timedelta(days=i)
                 
-                            data = yf.download(
-                                self.st_ticker, 
-                                start=new_closest_day.strftime('%Y-%m-%d'), 
-                                end=date_listed.strftime('%Y-%m-%d'),  
-                                interval='1h'
-                            )
+                            data = BarStore().get_bars(self.st_ticker, '1h', new_closest_day, date_listed)
 
                             if not data.empty:
                                 break
@@ -353,12 +352,7 @@ class IVAtmAndRealizedVolatility:
                         for i in range(0, 7):
                             day_closest_day = date_listed - pd.Timedelta(days=closest_day_series + i)
 
-                            data = yf.download(
-                                self.st_ticker, 
-                                start=day_closest_day.strftime('%Y-%m-%d'), 
-                                end=date_listed.strftime('%Y-%m-%d'),  
-                                interval='1h'
-                            )
+                            data = BarStore().get_bars(self.st_ticker, '1h', day_closest_day, date_listed)
 
                             if not data.empty:
                                 break
@@ -395,12 +389,7 @@ class IVAtmAndRealizedVolatility:
                 else:
                     day_closest_day = date_listed - pd.Timedelta(days=closest_day_series)
 
-                data = yf.download(
-                    self.st_ticker, 
-                    start=day_closest_day.strftime('%Y-%m-%d'), 
-                    end=date_listed.strftime('%Y-%m-%d'),  
-                    interval='1d'
-                )
+                data = BarStore().get_bars(self.st_ticker, '1d', day_closest_day, date_listed)
 
                 data.index = pd.to_datetime(data.index)
                 if data.index.tz is None:
@@ -444,21 +433,11 @@ class IVAtmAndRealizedVolatility:
                 if date_listed.date() != datetime.now().astimezone(pytz.timezone(UTC)):
                     new_date = date_listed + pd.Timedelta(days=1)
 
-                    data = yf.download(
-                        self.st_ticker, 
-                        start=day_30_date.strftime('%Y-%m-%d'), 
-                        end=new_date.strftime('%Y-%m-%d'),  
-                        interval='1h'
-                    )
+                    data = BarStore().get_bars(self.st_ticker, '1h', day_30_date, new_date)
 
                 else:
 
-                    data = yf.download(
-                        self.st_ticker, 
-                        start=day_30_date.strftime('%Y-%m-%d'), 
-                        end=date_listed.strftime('%Y-%m-%d'),  
-                        interval='1h'
-                    )
+                    data = BarStore().get_bars(self.st_ticker, '1h', day_30_date, date_listed)
 
 
                 data.index = pd.to_datetime(data.index)
@@ -485,12 +464,7 @@ class IVAtmAndRealizedVolatility:
             for i, date_listed in enumerate(second_df['datetime']):
                 day_30_date = date_listed - pd.Timedelta(days=30)
 
-                data = yf.download(
-                    self.st_ticker, 
-                    start=day_30_date.strftime('%Y-%m-%d'), 
-                    end=date_listed.strftime('%Y-%m-%d'),  
-                    interval='1d'
-                )
+                data = BarStore().get_bars(self.st_ticker, '1d', day_30_date, date_listed)
 
                 data.index = pd.to_datetime(data.index)
                 if data.index.tz is None:
@@ -595,7 +569,7 @@ class IVDeltaSkewAsymmetry:
 
     def filterOptions(self, df, option_type):
             
-        df_filtered = df[df['option_type'] == option_type].copy()
+        df_filtered = df[(df['option_type'] == option_type) & clean_mask(df, IV_FLAGS)].copy()
 
         return df_filtered
     
@@ -615,52 +589,50 @@ class IVDeltaSkewAsymmetry:
         
         return mean_iv
 
-    def getDeltaSkewOptions(self, indicator_exp='30', delta_targeted= 0.25, skew_type='classic', plot=True):
-        
-        iv_dict = {}
-
-        list_available_dates = self.class_IVAtmAndRealizedVolatility.loadHistory()
-        available_data = self.class_IVAtmAndRealizedVolatility.getAvailableDate(list_available_dates)
+    def deltaSkewSnapshot(self, df, key, element, indicator_exp='30', delta_targeted=0.25, skew_type='classic'):
+        """
+        [iv_skew, call_iv, put_iv, dte_1, dte_2] for one snapshot (run in the HistoryScan workers).
+        """
+        # Snapshot columns are typed by the chain schema (numeric, datetime64 expiration)
+        get_st = df.iloc[0]['underlying_price']
 
-        for key, item in available_data.items():
-         
-            for index, element in enumerate(item):
+        df_call = self.filterOptions(df, 'call')
+        df_put = self.filterOptions(df, 'put')
 
-                if element == 'close':  
-                    item[index] = CBOE_CLOSE_UTC 
+        if indicator_exp == '30':
+            
+            call_value, dte_1, dte_2= self.interpolateIVdeltaSkew(df_call, target_dte=30, delta_targeted=delta_targeted, option_type='call')
+            put_value, useless1, useless2 = self.interpolateIVdeltaSkew(df_put, target_dte=30, delta_targeted=delta_targeted, option_type='put')
 
-                df = LoadingData().get_data_csv(self.selected_option, key, item[index])
-                df['underlying_price'] = pd.to_numeric(df['underlying_price'], errors='coerce')
-                get_st = df.iloc[0]['underlying_price']
+        if skew_type == 'classic':
+            iv_skew = (call_value - put_value)
+        elif skew_type == 'butterfly':
 
-                df['expiration'] = pd.to_datetime(df['expiration'])
-                key_date = pd.to_datetime(key)
+            iv_atm = self.getIvATM(df, get_st, indicator_exp)
+            iv_skew = ((call_value + put_value) / 2) * iv_atm
 
-                df_call = self.filterOptions(df, 'call')
-                df_put = self.filterOptions(df, 'put')
+        return [float(iv_skew), call_value, put_value, dte_1, dte_2]
 
-                df_call['implied_volatility'] = pd.to_numeric(df_call['implied_volatility'], errors='coerce')
-                df_put['implied_volatility'] = pd.to_numeric(df_put['implied_volatility'], errors='coerce')
+    def getDeltaSkewOptions(self, indicator_exp='30', delta_targeted= 0.25, skew_type='classic', plot=True):
+        
+        iv_dict = {}
 
-                if indicator_exp == '30':
-                    
-                    call_value, dte_1, dte_2= self.interpolateIVdeltaSkew(df_call, target_dte=30, delta_targeted=delta_targeted, option_type='call')
-                    put_value, useless1, useless2 = self.interpolateIVdeltaSkew(df_put, target_dte=30, delta_targeted=delta_targeted, option_type='put')
+        list_available_dates = self.class_IVAtmAndRealizedVolatility.loadHistory()
+        available_data = self.class_IVAtmAndRealizedVolatility.getAvailableDate(list_available_dates)
 
-                if skew_type == 'classic':
-                    iv_skew = (call_value - put_value)
-                elif skew_type == 'butterfly':
+        scan_results = HistoryScan(self.selected_option, columns=HISTORY_COLUMNS).run(
+            available_data, self.deltaSkewSnapshot, indicator_exp=indicator_exp, delta_targeted=delta_targeted, skew_type=skew_type
+        )
 
-                    iv_atm = self.getIvATM(df, get_st, indicator_exp)
-                    iv_skew = ((call_value + put_value) / 2) * iv_atm
+        for key, element, values in scan_results:
 
-                date_time_str = f"{key} {item[index]}"
-                date_time_obj = datetime.strptime(date_time_str, "%Y-%m-%d %H_%M")
+            date_time_str = f"{key} {CBOE_CLOSE_UTC if element == 'close' else element}"
+            date_time_obj = datetime.strptime(date_time_str, "%Y-%m-%d %H_%M")
 
-                new_key = date_time_obj.strftime("%Y-%m-%d-%H-%M")
+            new_key = date_time_obj.strftime("%Y-%m-%d-%H-%M")
 
-                if new_key not in iv_dict:
-                    iv_dict[new_key] = [float(iv_skew), call_value, put_value, dte_1, dte_2]
+            if new_key not in iv_dict:
+                iv_dict[new_key] = values
 
         final_df = pd.DataFrame.from_dict(iv_dict, orient='index', columns=['iv_skew', 'call_iv', 'put_iv', 'dte_1', 'dte_2'])
         final_df.reset_index(inplace=True)  
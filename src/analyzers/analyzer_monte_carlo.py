@@ -1,10 +1,10 @@
-import yfinance as yf
 import numpy as np
 import pandas as pd
 
 import plotly.graph_objects as go
 
 from src.import_data.utils import LoadingData
+from src.import_data.bar_store import BarStore
 
 class GetDataAndCalculation:
 
@@ -16,7 +16,7 @@ class GetDataAndCalculation:
 
         st, change, quotation_type, quotation_value,lot_size = self.class_LoadingData.load_st_ticker_info_json(provider='search', selected_option=selected_option)
 
-        data = yf.download(st, start=start_date, end=end_date, interval='1d')
+        data = BarStore().get_bars(st, '1d', start_date, end_date)
 
         business_days = len(pd.date_range(start=start_date, end=end_date, freq='B'))
 
@@ -371,8 +371,10 @@ class PayoffFormula:
         return payoff
 
     def getLastSt(self):
-        st_data = yf.download(self.underlying, period='1d', interval='1m')
-        last_st = float(round(st_data['Close'].iloc[-1], 2))
+        last_st = BarStore().latest_price(self.underlying)
+
+        if last_st is None:
+            raise ValueError(f"PayoffFormula -> getLastSt : no price available for {self.underlying}")
 
         return last_st
 
@@ -4,10 +4,10 @@ from datetime import datetime
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import plotly.graph_objects as go
 
 from src.import_data.utils import LoadingData
+from src.import_data.bar_store import BarStore
 
 class MetricsUtils:
 
@@ -28,13 +28,16 @@ class MetricsUtils:
     def getStPrice(self, st_ticker):
         
         try:
-            st_data = yf.download(st_ticker, period='1d', interval='1m')
-            st_price = float(round(st_data['Close'].iloc[-1], 2))
+            st_price = BarStore().latest_price(st_ticker)
 
         except:
             print(f"Error: can't reach {st_ticker}")
             return 0
 
+        if st_price is None:
+            print(f"Error: no price available for {st_ticker}")
+            return 0
+
         return st_price
 
 
@@ -103,8 +106,8 @@ class VariationsOI:
 
         underlying_ticker = info_data['underlying_ticker']
 
-        self.st_date1 = LoadingData().get_st_price_hour(None, date1, selected_hour1, underlying_ticker)
-        self.st_date2 = LoadingData().get_st_price_hour(None, date1, selected_hour2, underlying_ticker)
+        self.st_date1 = LoadingData().get_spot(underlying_ticker, date1, selected_hour1, dataframe=df1)
+        self.st_date2 = LoadingData().get_spot(underlying_ticker, date2, selected_hour2, dataframe=df2)
     
     def get_closest_date(self, expiration_value):
  
@@ -259,7 +262,7 @@ class MetricsOI:
             MetricsUtils().getStInfo(self.info_data)
         )
 
-        self.st_price = LoadingData().get_st_price_hour(None, selected_date, selected_hour, self.st_ticker)
+        self.st_price = LoadingData().get_spot(self.st_ticker, selected_date, selected_hour, dataframe=df)
      
         self.col_exp = 'expiration'
 
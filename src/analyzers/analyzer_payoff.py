@@ -1,12 +1,13 @@
 import pandas as pd
-import yfinance as yf
 import re
 
 import plotly.graph_objects as go
 
 from src.import_data.utils import LoadingData
+from src.import_data.bar_store import BarStore
 
 from src.config.constant import PROVIDER_LIST
+from src.analyzers.payoff_engine import leg_arrays, payoff_grid, leg_payoffs, payoff_stats
 
 
 RANGE_UP_FACTOR = 1.8
@@ -66,7 +67,7 @@ class OptionInputConverteur:
 
         self.underlying, self.change, self.quotation_type, self.quotation_value, self.lot_size = self.class_LoadingData.load_st_ticker_info_json(provider='search', selected_option=selected_option)
 
-        self.last_st = LoadingData().get_st_price_hour(None, selected_date, selected_hour, self.underlying)
+        self.last_st = LoadingData().get_spot(self.underlying, selected_date, selected_hour, selected_option=selected_option)
 
         self.optionToList(list_options=list_options)
 
@@ -123,41 +124,50 @@ class Statistics:
         self.class_LoadingData = LoadingData()
        
         self.underlying, self.change, self.quotation_type, self.quotation_value, self.lot_size = self.class_LoadingData.load_st_ticker_info_json(provider='search', selected_option=selected_option)
-        st_data = yf.download(self.underlying, period='1d', interval='1m')
-        self.st_price = round(float(st_data['Close'].iloc[-1]), 2)
+        self.st_price = BarStore().latest_price(self.underlying)
+
+        # No live bar (offline, index without yFinance quote): spot of the selected snapshot
+        if not self.st_price:
+            self.st_price = self.InputConverteur.last_st
     
     def MultiPayoffStats(self):
 
-        df = self.InputConverteur.figure
-   
-        max_returns = f'{max(df["Global Payoff"]):,.0f} {self.change}'
-        max_losses = f'{min(df["Global Payoff"]):,.0f} {self.change}'
+        InputConverteur = self.InputConverteur
+        legs = leg_arrays(InputConverteur.type, InputConverteur.pos, InputConverteur.strike, InputConverteur.premium)
 
-        price_to_match = int(self.st_price)
-        if price_to_match in df.index:
-            value = df['Global Payoff'].loc[price_to_match]  
-          
-            if isinstance(value, pd.Series): 
-                pl_value = float(value.iloc[0]) 
-            else: 
-                pl_value = float(value)
-            pl = f'{pl_value:,.0f} {self.change}'
+        # Exact values from the kinks of the payoff (strikes), not from the chart grid
+        stats = payoff_stats(*legs)
+
+        if stats['unbounded_profit']:
+            max_returns = 'Unlimited'
         else:
-            pl = f'Not Found {self.change}'
+            max_returns = f'{stats["max_profit"]:,.0f} {self.change}'
 
-        break_even_list = []
+        if stats['unbounded_loss']:
+            max_losses = 'Unlimited'
+        else:
+            max_losses = f'{stats["max_loss"]:,.0f} {self.change}'
+
+        break_even_list = stats['breakevens']
+
+        if not self.st_price:
+            pl = 'N/A'
+        else:
+            pl_value = float(leg_payoffs([self.st_price], *legs).sum())
+            pl = f'{pl_value:,.0f} {self.change}'
 
-        for index, value in df['Global Payoff'].items():
-            if value == 0:
-                break_even_list.append(index)
+        if len(break_even_list) > 0 and not self.st_price:
+            closest_index = min(break_even_list)
+            break_even = f'{closest_index:,.2f} {self.quotation_type}'
+            st_var_list = ['N/A', '-- %']
 
-        if len(break_even_list) > 0:
+        elif len(break_even_list) > 0:
             closest_index = min(break_even_list, key=lambda x: abs(x - self.st_price))
 
             min_st_var = - (self.st_price - closest_index) / self.st_price
             min_st = - (self.st_price - closest_index)
-            st_var_list = [f'{round(min_st, 2):,.0f} {self.change}', f'({round(min_st_var * 100, 2)} %)']
-            break_even = f'{closest_index:,.0f} {self.quotation_type} (closest)'
+            st_var_list = [f'{round(min_st, 2):,.2f} {self.change}', f'({round(min_st_var * 100, 2)} %)']
+            break_even = f'{closest_index:,.2f} {self.quotation_type} (closest)'
         else:
             break_even = 'Beyond reach'
             st_var_list = ['Beyond reach', '-- %']
@@ -178,29 +188,23 @@ class OptionPayoffManager:
 
     def payoffCalculator(self, list_type, list_pos, list_strike, list_premium, list_maturity, st_price, change=None, stats=False):
 
-        df = pd.DataFrame()
-
         self.stats = stats
-        min_strike = min(list_strike)
-        max_strike = max(list_strike)
 
-        for i in range(len(list_type)):
+        call, sign, strike, premium = leg_arrays(list_type, list_pos, list_strike, list_premium)
 
-            if list_type[i] == 'call':
+        range_dw, range_up = self.calculate_ranges(st_price, strike.min(), strike.max())
+        grid = payoff_grid(strike, range_dw, range_up)
 
-                class_ = OptionSimplePayOff(list_pos[i], list_strike[i], list_premium[i], min_strike=min_strike, max_strike=max_strike, st_price=st_price, change=change)
-                payoff = class_.callOptions()
-                df[f'({i + 1}) {list_pos[i]} call "{list_strike[i]:,.0f}" {list_maturity[i]}'] = payoff
+        # All legs at once: (legs, prices)
+        payoffs = leg_payoffs(grid, call, sign, strike, premium)
 
-            elif list_type[i] == 'put':
-                class_ = OptionSimplePayOff(list_pos[i], list_strike[i], list_premium[i], min_strike=min_strike, max_strike=max_strike, st_price=st_price, change=change)
-                payoff = class_.putOptions()
-                df[f'({i + 1}) {list_pos[i]} put "{list_strike[i]:,.0f}" {list_maturity[i]}'] = payoff
-            
-            else:
-                raise ValueError("analyzer_payoff -> class OpenStrategie : Position must be 'call' or 'put'.")
+        columns = [
+            f'({i + 1}) {list_pos[i]} {list_type[i]} "{list_strike[i]:,.0f}" {list_maturity[i]}'
+            for i in range(len(list_type))
+        ]
 
-        df['Global Payoff'] = df.sum(axis=1)
+        df = pd.DataFrame(payoffs.T, index=grid, columns=columns)
+        df['Global Payoff'] = payoffs.sum(axis=0)
 
         if not self.stats:
             plotter = PlotPayoff()
@@ -210,83 +214,12 @@ class OptionPayoffManager:
         
         return df
 
-################################################################################
-###  Simple payoff formula
-################################################################################ 
-
-class OptionSimplePayOff:
-    def __init__(self, position, strike, premium, min_strike=None, max_strike=None, st_price=None, change=None):
-
-        self.st_price = st_price
-        self.change = change
-        self.position = position
-        self.strike = strike
-        self.premium = premium
-        self.enable_simple_stats = False
-        
-        self.range_dw, self.range_up = self.calculate_ranges(
-            st_price=st_price,
-            min_strike=min_strike,
-            max_strike=max_strike,
-        )
-        
-        self.payoff_series = None
-
-    def callOptions(self):
-
-        if self.position == 'Long':
-            payoff = [- self.premium + max(0, St - self.strike) for St in range(self.range_dw, self.range_up)]
-            name_ = 'Long Call Payoff'
-        elif self.position == 'Short':
-            payoff = [self.premium - max(0, St - self.strike) for St in range(self.range_dw, self.range_up)]
-            name_ = 'Short Call Payoff'
-        else:
-            raise ValueError("Position must be 'Long' or 'Short'.")
-        
-        self.series_payoff = pd.Series(payoff, index=range(self.range_dw, self.range_up), name=name_)
-
-        
-        return self.series_payoff
-
-    def putOptions(self):
-
-        if self.position == 'Long':
-            payoff = [- self.premium + max(0, self.strike - St) for St in range(self.range_dw, self.range_up)]
-            name_ = 'Long Put Payoff'
-        elif self.position == 'Short':
-            payoff = [self.premium - max(0, self.strike - St) for St in range(self.range_dw, self.range_up)]
-            name_ = 'Short Put Payoff'
-        else:
-            raise ValueError("Position must be 'long' or 'short'.")
-        
-        self.series_payoff = pd.Series(payoff, index=range(self.range_dw, self.range_up), name=name_)
-        
-        
-        return self.series_payoff
-    
     def calculate_ranges(self, st_price, min_strike, max_strike):
-     
-        if max_strike < st_price:
-
-            range_up = int(RANGE_UP_FACTOR * float(st_price))
-            range_dw = int(RANGE_DW_FACTOR * float(min_strike))
-
-            return range_dw, range_up
-
-        elif max_strike > st_price:
-
-            if min_strike > st_price:
-                range_up = int(RANGE_UP_FACTOR * float(max_strike))
-                range_dw = int(RANGE_DW_FACTOR * float(st_price))
-
-                return range_dw, range_up
-            
-            if min_strike < st_price:
 
-                range_up = int(RANGE_UP_FACTOR * float(max_strike))
-                range_dw = int(RANGE_DW_FACTOR * float(min_strike))
+        range_up = RANGE_UP_FACTOR * float(max(max_strike, st_price))
+        range_dw = RANGE_DW_FACTOR * float(min(min_strike, st_price))
 
-                return range_dw, range_up
+        return range_dw, range_up
 
 ################################################################################
 ###  Plot
@@ -0,0 +1,105 @@
+import numpy as np
+
+from scipy.special import ndtr
+
+
+GREEKS = ['price', 'delta', 'gamma', 'vega', 'theta', 'vanna', 'charm', 'vomma', 'speed', 'zomma']
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def is_call(option_type):
+    """
+    'call' / 'put' values (array or scalar) -> boolean array.
+    """
+    return np.char.lower(np.asarray(option_type, dtype=str)) == 'call'
+
+
+def bs_greeks(S, K, T, r, sigma, q=0.0, call=True, greeks=None):
+    """
+    Black-Scholes-Merton price and greeks for whole arrays at once (NumPy broadcasting).
+    S spot, K strike, T years, r rate and q dividend yield (continuous, decimal, scalar or per contract),
+    sigma volatility (decimal), call boolean (scalar or array, see is_call).
+    Returns {greek: array} for greeks (default: GREEKS). Per year / per 1.00 of volatility:
+    theta and charm per year, vega per 1.00 vol. Contracts with T <= 0 or sigma <= 0 get 0.
+    """
+    greeks = GREEKS if greeks is None else greeks
+
+    S, K, T, r, sigma, q = (np.asarray(value, dtype=np.float64) for value in (S, K, T, r, sigma, q))
+    call = np.asarray(call, dtype=bool)
+
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+
+    # Neutral values on invalid contracts, results zeroed at the end
+    T = np.where(valid, T, 1.0)
+    sigma = np.where(valid, sigma, 1.0)
+    S_safe = np.where(valid, S, 1.0)
+    K_safe = np.where(valid, K, 1.0)
+
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+
+    d1 = (np.log(S_safe / K_safe) + (r - q + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+
+    pdf_d1 = np.exp(-0.5 * d1 ** 2) / SQRT_2PI
+    discount_q = np.exp(-q * T)
+    discount_r = np.exp(-r * T)
+
+    sign = np.where(call, 1.0, -1.0)
+
+    # Cumulative normals only for the greeks that use them (gamma / vega profiles skip them)
+    if {'price', 'delta', 'theta', 'charm'} & set(greeks):
+        cdf_d1 = ndtr(sign * d1)
+        cdf_d2 = ndtr(sign * d2)
+
+    gamma = discount_q * pdf_d1 / (S_safe * vol_sqrt_T)
+    vega = S_safe * discount_q * pdf_d1 * sqrt_T
+
+    results = {}
+
+    for greek in greeks:
+
+        if greek == 'price':
+            value = sign * (S_safe * discount_q * cdf_d1 - K_safe * discount_r * cdf_d2)
+
+        elif greek == 'delta':
+            value = sign * discount_q * cdf_d1
+
+        elif greek == 'gamma':
+            value = gamma
+
+        elif greek == 'vega':
+            value = vega
+
+        elif greek == 'theta':
+            value = (
+                -S_safe * discount_q * pdf_d1 * sigma / (2 * sqrt_T)
+                - sign * r * K_safe * discount_r * cdf_d2
+                + sign * q * S_safe * discount_q * cdf_d1
+            )
+
+        elif greek == 'vanna':
+            value = -discount_q * pdf_d1 * d2 / sigma
+
+        elif greek == 'charm':
+            value = (
+                sign * q * discount_q * cdf_d1
+                - discount_q * pdf_d1 * (2 * (r - q) * T - d2 * vol_sqrt_T) / (2 * T * vol_sqrt_T)
+            )
+
+        elif greek == 'vomma':
+            value = vega * d1 * d2 / sigma
+
+        elif greek == 'speed':
+            value = -gamma / S_safe * (d1 / vol_sqrt_T + 1)
+
+        elif greek == 'zomma':
+            value = gamma * (d1 * d2 - 1) / sigma
+
+        else:
+            raise ValueError(f"Unknown greek: {greek}")
+
+        results[greek] = np.where(valid, value, 0.0)
+
+    return results
@@ -0,0 +1,153 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from scipy.optimize import brentq
+
+from src.config.constant import GEX_PROFILE_RANGE, GEX_PROFILE_POINTS, GEX_PROFILE_CHUNK_ELEMENTS, GEX_PROFILE_CACHE_SIZE, GREEKS_YEAR_DAYS
+from src.analyzers.bs_greeks import bs_greeks, is_call
+
+
+PROFILE_COLUMNS = ['strike', 'dte', 'implied_volatility', 'open_interest', 'option_type']
+PROFILE_CURVES = ['call_gex', 'put_gex', 'net_gex', 'abs_gex']
+
+# key -> profile DataFrame, least recently used first
+PROFILE_CACHE = OrderedDict()
+
+
+def snapshot_key(df):
+    """
+    SHA-256 of the columns the profile depends on: the same snapshot (or filtered chain) gives the same key.
+    """
+    digest = hashlib.sha256(','.join(PROFILE_COLUMNS).encode())
+    digest.update(pd.util.hash_pandas_object(df[PROFILE_COLUMNS], index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+def spot_grid(spot, width=GEX_PROFILE_RANGE, points=GEX_PROFILE_POINTS):
+
+    return float(spot) * np.linspace(1 - width, 1 + width, points)
+
+
+################################################################################
+###  GEX profile
+################################################################################
+
+class GexProfile:
+    """
+    Dealer gamma exposure of a chain at hypothetical spot levels: the gamma of every contract is
+    repriced (Black-Scholes, provider IV held constant) on a contracts x grid array, in chunks of
+    GEX_PROFILE_CHUNK_ELEMENTS. Same convention as GammaExposure: OI * gamma * lot_size * spot,
+    calls positive, puts negative.
+    """
+    def __init__(self, df, lot_size, r=0.0, q=0.0, year_days=GREEKS_YEAR_DAYS, chunk_elements=GEX_PROFILE_CHUNK_ELEMENTS):
+
+        K = df['strike'].to_numpy(dtype=float, na_value=np.nan)
+        T = df['dte'].to_numpy(dtype=float, na_value=np.nan) / year_days
+        sigma = df['implied_volatility'].to_numpy(dtype=float, na_value=np.nan)
+        oi = df['open_interest'].to_numpy(dtype=float, na_value=np.nan)
+        call = is_call(df['option_type'].to_numpy())
+
+        r = np.broadcast_to(np.asarray(r, dtype=np.float64), K.shape)
+        q = np.broadcast_to(np.asarray(q, dtype=np.float64), K.shape)
+
+        # Contracts without a gamma (expired, no IV, no OI) are dropped
+        valid = (K > 0) & (T > 0) & (sigma > 0) & (oi > 0) & np.isfinite(r) & np.isfinite(q)
+
+        self.K, self.T, self.sigma, self.r, self.q = (value[valid] for value in (K, T, sigma, r, q))
+
+        weight = oi[valid] * float(lot_size)
+        self.weights = np.vstack([np.where(call[valid], weight, 0.0), np.where(call[valid], 0.0, weight)])
+        self.chunk_elements = chunk_elements
+
+        digest = hashlib.sha256(snapshot_key(df).encode())
+        for value in (float(lot_size), float(year_days), r, q):
+            digest.update(np.asarray(value, dtype=np.float64).tobytes())
+        self.key = digest.hexdigest()
+
+    def exposures(self, spots):
+        """
+        (call, put) GEX at each spot level, shape (2, len(spots)), summed over the contracts chunk by chunk.
+        """
+        spots = np.asarray(spots, dtype=np.float64)
+        result = np.zeros((2, spots.size))
+
+        rows = max(1, self.chunk_elements // max(spots.size, 1))
+
+        for start in range(0, self.K.size, rows):
+            chunk = slice(start, start + rows)
+
+            gamma = bs_greeks(
+                S=spots[np.newaxis, :],
+                K=self.K[chunk, np.newaxis],
+                T=self.T[chunk, np.newaxis],
+                r=self.r[chunk, np.newaxis],
+                sigma=self.sigma[chunk, np.newaxis],
+                q=self.q[chunk, np.newaxis],
+                greeks=['gamma'],
+            )['gamma']
+
+            result += self.weights[:, chunk] @ gamma
+
+        return result * spots
+
+    def net_gex(self, spot):
+
+        call_gex, put_gex = self.exposures([spot])[:, 0]
+
+        return call_gex - put_gex
+
+    def profile(self, spots):
+        """
+        Net, absolute, call and put GEX curves vs spot (DataFrame indexed by spot), cached by snapshot content.
+        """
+        spots = np.asarray(spots, dtype=np.float64)
+        key = (self.key, hashlib.sha256(spots.tobytes()).hexdigest())
+
+        if key in PROFILE_CACHE:
+            PROFILE_CACHE.move_to_end(key)
+            return PROFILE_CACHE[key]
+
+        call_gex, put_gex = self.exposures(spots)
+
+        df_profile = pd.DataFrame({
+            'call_gex': call_gex,
+            'put_gex': -put_gex,
+            'net_gex': call_gex - put_gex,
+            'abs_gex': call_gex + put_gex,
+        }, index=pd.Index(spots, name='spot'))
+
+        PROFILE_CACHE[key] = df_profile
+        while len(PROFILE_CACHE) > GEX_PROFILE_CACHE_SIZE:
+            PROFILE_CACHE.popitem(last=False)
+
+        return df_profile
+
+    def zero_gamma_levels(self, df_profile):
+        """
+        Spots where the net GEX changes sign: sign changes of the profile, refined by brentq on the exact net GEX.
+        """
+        spots = df_profile.index.to_numpy()
+        net = df_profile['net_gex'].to_numpy()
+
+        levels = []
+        for i in np.flatnonzero(np.sign(net[:-1]) * np.sign(net[1:]) < 0):
+            levels.append(brentq(self.net_gex, spots[i], spots[i + 1], xtol=1e-6 * spots[i]))
+
+        levels += spots[net == 0].tolist()
+
+        return sorted(levels)
+
+    def zero_gamma(self, df_profile, spot):
+        """
+        Zero-gamma level closest to spot (None if the net GEX keeps the same sign on the whole grid).
+        """
+        levels = self.zero_gamma_levels(df_profile)
+
+        if not levels:
+            return None
+
+        return min(levels, key=lambda level: abs(level - spot))
@@ -0,0 +1,137 @@
+import os
+import threading
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.config.constant import CBOE_CLOSE_UTC, HISTORY_SCAN_WORKERS, HISTORY_SCAN_CHUNK_SIZE
+from src.import_data.utils import LoadingData
+from src.import_data.catalog import SnapshotCatalog
+from src.import_data.snapshot_dataset import SnapshotDataset
+
+
+def scan_chunk(selected_option, keys, columns, function, kwargs):
+    """
+    Worker: loads a chunk of snapshots (one dataset scan, then file by file for the missing ones)
+    and applies function(df, date, hour, **kwargs) to each. Only the results are sent back.
+    """
+    class_LoadingData = LoadingData()
+
+    available_data = {}
+    for date_str, hour in keys:
+        available_data.setdefault(date_str, []).append(hour)
+
+    history_data = class_LoadingData.get_history_data(selected_option, available_data, columns=columns)
+
+    results = []
+
+    for date_str, hour in keys:
+
+        df = history_data.pop((date_str, hour), None)
+        if df is None:
+            df = class_LoadingData.get_data_csv(selected_option, date_str, CBOE_CLOSE_UTC if hour == 'close' else hour, columns=columns)
+
+        results.append((date_str, hour, function(df, date_str, hour, **kwargs)))
+
+    return results
+
+
+# Workers are spawned, not forked: the Dash server is threaded and a forked child could inherit held locks
+SCAN_POOLS = {}
+SCAN_POOLS_LOCK = threading.Lock()
+
+
+def scan_pool(max_workers):
+    """
+    Spawned process pool shared by every scan with max_workers workers (started once, then reused).
+    """
+    with SCAN_POOLS_LOCK:
+        if max_workers not in SCAN_POOLS:
+            SCAN_POOLS[max_workers] = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+        return SCAN_POOLS[max_workers]
+
+
+def discard_scan_pool(max_workers):
+
+    with SCAN_POOLS_LOCK:
+        pool = SCAN_POOLS.pop(max_workers, None)
+
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+###############################################################
+###############################################################
+### Class -> Parallel history scan (one task per snapshot chunk)
+###############################################################
+###############################################################
+
+class HistoryScan:
+    """
+    Runs a per-snapshot function over {date: [hours]} in a process pool.
+    Snapshots are loaded inside the workers by chunks of chunk_size, so memory stays
+    bounded to max_workers chunks whatever the history length.
+    dedup: an alias (unchanged chain) gets the result of the snapshot it duplicates
+    instead of being loaded and computed again.
+    retention: same snapshots as the compacted dataset (older dates: the close only), so the
+    intraday snapshots dropped by the retention are not read file by file.
+    """
+    def __init__(self, selected_option, columns=None, max_workers=HISTORY_SCAN_WORKERS, chunk_size=HISTORY_SCAN_CHUNK_SIZE, dedup=True, retention=True):
+
+        self.selected_option = selected_option
+        self.columns = columns
+        self.dedup = dedup
+        self.retention = retention
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def sort_key(key):
+
+        date_str, hour = key
+        return (date_str, CBOE_CLOSE_UTC if hour == 'close' else hour)
+
+    def run(self, available_data, function, **kwargs):
+        """
+        function(df, date, hour, **kwargs) must be picklable (module function or method of a picklable object).
+        Returns [(date, hour, result)] in timestamp order.
+        """
+        if self.retention:
+            keys = SnapshotDataset().retained(available_data)
+        else:
+            keys = [(date_str, hour) for date_str, hours in available_data.items() for hour in hours]
+
+        keys = sorted(keys, key=self.sort_key)
+
+        alias_keys = SnapshotCatalog().alias_keys(self.selected_option) if self.dedup else {}
+
+        # Aliases whose target is scanned too are filled from its result
+        key_set = set(keys)
+        alias_keys = {key: target for key, target in alias_keys.items() if key in key_set and target in key_set}
+        scan_keys = [key for key in keys if key not in alias_keys]
+
+        chunks = [scan_keys[i:i + self.chunk_size] for i in range(0, len(scan_keys), self.chunk_size)]
+
+        if len(chunks) <= 1 or self.max_workers <= 1:
+            results = [scan_chunk(self.selected_option, chunk, self.columns, function, kwargs) for chunk in chunks]
+
+        else:
+            try:
+                results = list(scan_pool(self.max_workers).map(
+                    scan_chunk,
+                    [self.selected_option] * len(chunks),
+                    chunks,
+                    [self.columns] * len(chunks),
+                    [function] * len(chunks),
+                    [kwargs] * len(chunks),
+                ))
+            except BrokenProcessPool:
+                # A worker died: the next scan starts a new pool
+                discard_scan_pool(self.max_workers)
+                raise
+
+        scanned = {(date_str, hour): result for chunk_results in results for date_str, hour, result in chunk_results}
+
+        return [(date_str, hour, scanned[alias_keys.get((date_str, hour), (date_str, hour))]) for date_str, hour in keys]
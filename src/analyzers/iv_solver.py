@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from src.config.constant import IV_SOLVER_TOL, IV_SOLVER_MAX_ITER, GREEKS_YEAR_DAYS
+from src.analyzers.bs_greeks import bs_greeks, is_call
+
+
+MODELS = ['black-scholes', 'black-76']
+PRICE_SOURCES = ['mid', 'bid', 'ask', 'last']
+SOLVER_GREEKS = ['delta', 'gamma', 'vega', 'theta']
+
+SIGMA_MIN = 1e-4
+SIGMA_MAX = 10.0
+
+
+def implied_volatility(price, S, K, T, r=0.0, q=0.0, call=True, model='black-scholes', tol=IV_SOLVER_TOL, max_iter=IV_SOLVER_MAX_ITER):
+    """
+    Batched inversion of Black-Scholes-Merton (S spot, q dividend yield) or Black-76 (S forward, q ignored)
+    for whole arrays. Newton steps on vega, kept inside a [low, high] bracket updated at each iteration,
+    bisection when the Newton step leaves the bracket. Converged when the volatility error estimated from
+    the price error, |model price - price| / vega, is <= tol.
+    Returns the volatilities (NaN: price outside the no-arbitrage bounds, T <= 0, missing input,
+    or a price not precise enough to give the volatility within tol).
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model} ({', '.join(MODELS)})")
+
+    price, S, K, T, r, q = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (price, S, K, T, r, q)))
+    call = np.broadcast_to(np.asarray(call, dtype=bool), price.shape)
+
+    # Black-76 = Black-Scholes on the forward with q = r
+    if model == 'black-76':
+        q = r
+
+    price, S, K, T, r, q, call = (np.ravel(value) for value in (price, S, K, T, r, q, call))
+
+    discount_S = S * np.exp(-q * T)
+    discount_K = K * np.exp(-r * T)
+
+    lower = np.where(call, np.maximum(discount_S - discount_K, 0.0), np.maximum(discount_K - discount_S, 0.0))
+    upper = np.where(call, discount_S, discount_K)
+
+    resolution = 4 * np.finfo(np.float64).eps * (discount_S + discount_K)
+
+    sigma = np.full(price.shape, np.nan)
+    active = np.flatnonzero((T > 0) & (S > 0) & (K > 0) & (price > lower) & (price < upper))
+
+    # Brenner-Subrahmanyam guess around the money, clipped to the bracket
+    guess = np.sqrt(2 * np.pi / np.where(T > 0, T, 1.0)) * price / np.where(discount_S > 0, discount_S, 1.0)
+    sigma[active] = np.clip(guess[active], 0.05, 3.0)
+
+    low = np.full(price.shape, SIGMA_MIN)
+    high = np.full(price.shape, SIGMA_MAX)
+
+    for _ in range(max_iter):
+
+        if active.size == 0:
+            break
+
+        values = bs_greeks(S[active], K[active], T[active], r[active], sigma[active], q[active], call[active], greeks=['price', 'vega'])
+        diff = values['price'] - price[active]
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            # Also needs vega large enough for the price rounding (S - K cancellation) to stay below tol
+            converged = (np.abs(diff) <= tol * values['vega']) & (resolution[active] <= tol * values['vega'])
+            newton = sigma[active] - diff / values['vega']
+
+        too_high = diff > 0
+
+        high[active] = np.where(too_high, sigma[active], high[active])
+        low[active] = np.where(too_high, low[active], sigma[active])
+
+        bisection = (low[active] + high[active]) / 2
+        inside = np.isfinite(newton) & (newton > low[active]) & (newton < high[active])
+
+        sigma[active] = np.where(converged, sigma[active], np.where(inside, newton, bisection))
+
+        # Bracket collapsed before the tolerance: price too flat in sigma (deep ITM / OTM), no IV
+        collapsed = ~converged & ((high[active] - low[active]) <= 1e-12)
+        sigma[active[collapsed]] = np.nan
+
+        active = active[~(converged | collapsed)]
+
+    # Not converged within max_iter
+    sigma[active] = np.nan
+
+    return sigma
+
+
+def quote_prices(df, price='mid'):
+    """
+    Option prices of a chain: mid ((bid + ask) / 2 on two-sided, not crossed quotes), bid, ask or last.
+    """
+    if price not in PRICE_SOURCES:
+        raise ValueError(f"Unknown price source: {price} ({', '.join(PRICE_SOURCES)})")
+
+    bid = df['bid'].to_numpy(dtype=float, na_value=np.nan)
+    ask = df['ask'].to_numpy(dtype=float, na_value=np.nan)
+
+    if price == 'mid':
+        return np.where((bid > 0) & (ask >= bid), (bid + ask) / 2, np.nan)
+    if price == 'bid':
+        return np.where(bid > 0, bid, np.nan)
+    if price == 'ask':
+        return np.where(ask > 0, ask, np.nan)
+
+    last = df['last_trade_price'].to_numpy(dtype=float, na_value=np.nan)
+
+    return np.where(last > 0, last, np.nan)
+
+
+def solve_chain(df, spot=None, price='mid', r=0.0, q=0.0, model='black-scholes', greeks=SOLVER_GREEKS, year_days=GREEKS_YEAR_DAYS, tol=IV_SOLVER_TOL):
+    """
+    IV of every contract of a chain from its quotes, at the snapshot's underlying_price or at `spot`
+    (forward for Black-76), T = dte / year_days, r / q scalars or per contract (e.g. RateCurve.rate(dte)).
+    Returns a DataFrame aligned on df.index: iv and the matching greeks (NaN where no IV).
+    """
+    S = df['underlying_price'].to_numpy(dtype=float, na_value=np.nan) if spot is None else spot
+    K = df['strike'].to_numpy(dtype=float, na_value=np.nan)
+    T = df['dte'].to_numpy(dtype=float, na_value=np.nan) / year_days
+    call = is_call(df['option_type'].to_numpy())
+
+    sigma = implied_volatility(quote_prices(df, price), S, K, T, r, q, call, model, tol)
+
+    result = {'iv': sigma}
+
+    if greeks:
+        values = bs_greeks(S, K, T, r, np.nan_to_num(sigma), r if model == 'black-76' else q, call, greeks=list(greeks))
+        solved = np.isfinite(sigma)
+
+        for greek in greeks:
+            result[greek] = np.where(solved, values[greek], np.nan)
+
+    return pd.DataFrame(result, index=df.index)
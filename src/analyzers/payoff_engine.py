@@ -0,0 +1,90 @@
+import numpy as np
+
+from src.config.constant import PAYOFF_GRID_POINTS, PAYOFF_STRIKE_BAND, PAYOFF_STRIKE_POINTS
+
+
+def leg_arrays(list_type, list_pos, list_strike, list_premium):
+    """
+    Option legs -> (call, sign, strike, premium) arrays. sign +1 Long, -1 Short.
+    """
+    call = np.array([option_type == 'call' for option_type in list_type])
+
+    for option_type in list_type:
+        if option_type not in ('call', 'put'):
+            raise ValueError("payoff_engine -> leg_arrays : Position must be 'call' or 'put'.")
+
+    for position in list_pos:
+        if position not in ('Long', 'Short'):
+            raise ValueError("Position must be 'Long' or 'Short'.")
+
+    sign = np.array([1.0 if position == 'Long' else -1.0 for position in list_pos])
+
+    return call, sign, np.asarray(list_strike, dtype=np.float64), np.asarray(list_premium, dtype=np.float64)
+
+
+def payoff_grid(strikes, range_dw, range_up, points=PAYOFF_GRID_POINTS, band=PAYOFF_STRIKE_BAND, strike_points=PAYOFF_STRIKE_POINTS):
+    """
+    Underlying prices of the payoff chart: `points` evenly spaced over [range_dw, range_up], denser
+    within +/- band of each strike, and the strikes themselves (exact kinks of the payoff).
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+
+    uniform = np.linspace(range_dw, range_up, points)
+    dense = (strikes[:, np.newaxis] * np.linspace(1 - band, 1 + band, strike_points)[np.newaxis, :]).ravel()
+
+    grid = np.unique(np.concatenate([uniform, dense, strikes]))
+
+    return grid[(grid >= range_dw) & (grid <= range_up)]
+
+
+def leg_payoffs(prices, call, sign, strike, premium):
+    """
+    Payoff of every leg at every price, one broadcasted array of shape (legs, prices).
+    """
+    prices = np.asarray(prices, dtype=np.float64)[np.newaxis, :]
+
+    intrinsic = np.where(
+        call[:, np.newaxis],
+        np.maximum(prices - strike[:, np.newaxis], 0.0),
+        np.maximum(strike[:, np.newaxis] - prices, 0.0),
+    )
+
+    return sign[:, np.newaxis] * (intrinsic - premium[:, np.newaxis])
+
+
+def payoff_stats(call, sign, strike, premium):
+    """
+    Exact statistics of the strategy at expiration. The total payoff is piecewise linear with kinks at the
+    strikes, so its extremes are at 0, at a strike or at infinity (slope of the last segment) and the
+    breakevens are the zeros of the linear pieces.
+    Returns {'max_profit', 'max_loss' (+/- inf when unbounded), 'unbounded_profit', 'unbounded_loss', 'breakevens'}.
+    """
+    kinks = np.unique(np.concatenate([[0.0], strike[strike > 0]]))
+    values = leg_payoffs(kinks, call, sign, strike, premium).sum(axis=0)
+
+    # Slope above the highest strike: +1 per long call, -1 per short call
+    slope_up = float(sign[call].sum())
+
+    unbounded_profit = slope_up > 0
+    unbounded_loss = slope_up < 0
+
+    max_profit = np.inf if unbounded_profit else float(values.max())
+    max_loss = -np.inf if unbounded_loss else float(values.min())
+
+    breakevens = kinks[values == 0].tolist()
+
+    # Zero crossings inside each segment between kinks
+    crossing = np.flatnonzero(values[:-1] * values[1:] < 0)
+    breakevens += (kinks[crossing] - values[crossing] * (kinks[crossing + 1] - kinks[crossing]) / (values[crossing + 1] - values[crossing])).tolist()
+
+    # Last segment, towards infinity
+    if slope_up != 0 and values[-1] * slope_up < 0:
+        breakevens.append(float(kinks[-1] - values[-1] / slope_up))
+
+    return {
+        'max_profit': max_profit,
+        'max_loss': max_loss,
+        'unbounded_profit': unbounded_profit,
+        'unbounded_loss': unbounded_loss,
+        'breakevens': sorted(set(breakevens)),
+    }
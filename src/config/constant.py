@@ -6,6 +6,78 @@ PROVIDER_LIST = ['CBOE', 'Barchart']
 
 PERSISTENCE_TYPE = 'session'  #session, local
 
+#Storage config
+
+SNAPSHOT_FORMAT = 'parquet'  #parquet, csv
+PARQUET_COMPRESSION = 'zstd'  #zstd, snappy, gzip
+PARQUET_ROW_GROUP_SIZE = 2048  #rows sorted by expiration/strike, small groups allow row group pruning
+SNAPSHOT_DELTA_ENCODING = True  #intraday snapshots stored as deltas against the first snapshot of the day
+SNAPSHOT_DEDUP = True  #an unchanged chain (same content hash as the previous snapshot) is stored as an alias
+
+QUALITY_STALE_TRADE_H = 24  #last trade older than this (vs the chain's latest trade) is flagged stale
+QUALITY_IV_OUTLIER_FACTOR = 2.0  #IV more than x2 (or less than /2) the median of its neighbor strikes is flagged
+QUALITY_IV_NEIGHBORS = 2  #strikes on each side used for the IV neighbor median
+
+GREEKS_YEAR_DAYS = 365  #T = dte / GREEKS_YEAR_DAYS (dte in calendar days): recomputed IVs, GEX profile and VEX vanna
+
+IV_SOLVER_TOL = 1e-8  #volatility error (price error / vega) at which the batched IV solver stops
+IV_SOLVER_MAX_ITER = 50  #Newton / bisection iterations before a contract is left without IV
+
+GEX_PROFILE_RANGE = 0.1  #GEX profile spot grid: +/- 10% around the spot
+GEX_PROFILE_POINTS = 201  #spot levels of the GEX profile grid
+GEX_PROFILE_CHUNK_ELEMENTS = 25_000  #contracts x grid gammas repriced at once (small chunks stay in the CPU cache, ~4 MB peak)
+GEX_PROFILE_CACHE_SIZE = 16  #GEX profiles kept in memory, keyed by snapshot content
+
+PAYOFF_GRID_POINTS = 400  #evenly spaced underlying prices of the payoff chart
+PAYOFF_STRIKE_BAND = 0.02  #extra points within +/- 2% of each strike
+PAYOFF_STRIKE_POINTS = 40  #points added in each strike band
+
+HOT_TIER_ENABLED = True  #memory-mapped Arrow IPC copies of recently viewed snapshots
+HOT_TIER_MAX_SIZE_MB = 512
+
+DATASET_COMPACTION_INTERVAL_H = 6  #background compaction into data/dataset, 0 to disable
+DATASET_INTRADAY_RETENTION_DAYS = 30  #older dates only keep the close (or last) snapshot in the dataset
+
+HISTORY_SCAN_WORKERS = None  #process pool size for the IV history indicators, None = all cores
+HISTORY_SCAN_CHUNK_SIZE = 8  #snapshots loaded per task, bounds the memory of each worker
+
+#Market data config
+
+MARKET_DATA_OFFLINE = False  #True: underlying bars only read from the local bar store (data/cache/bars), no network call
+BAR_STORE_LIVE_TTL_S = 60  #today's bars are refreshed after this delay
+RATE_CURVE_TICKERS = {'^IRX': 91, '^FVX': 1826, '^TNX': 3652, '^TYX': 10957}  #Treasury yield tickers -> tenor (days)
+RATE_CURVE_TTL_H = 24  #curve of the current day refreshed after this delay
+RISK_FREE_RATE_FALLBACK = 0.0  #% when no Treasury quote is available
+SPOT_POLICY = 'snapshot'  #snapshot: underlying_price captured with the chain, network: yFinance bars at the snapshot hour
+
+#Network config
+
+HTTP_POOL_SIZE = 16  #keep-alive connections per host of the shared requests.Session
+HTTP_TIMEOUT_S = 30
+CBOE_DIRECTORY_TTL_H = 24  #CBOE company / index directories served from data/cache/http, revalidated after this delay
+CBOE_SYMBOL_LIST_TTL_H = 24  #cone-all-series.csv
+IMPORT_MAX_CONCURRENCY = 8  #chains downloaded at the same time by the watchlist import
+IMPORT_HOST_RATE_PER_S = 10  #max requests per second and per host
+IMPORT_TRANSFORM_WORKERS = 4  #threads transforming / writing the downloaded chains
+
+#Capture scheduler config
+
+CAPTURE_MARKET_TZ = 'America/New_York'
+CAPTURE_MARKET_OPEN = '09:30'
+CAPTURE_MARKET_CLOSE = '16:00'
+CAPTURE_INTERVAL_MIN = 5  #intraday snapshots every N minutes during market hours
+CAPTURE_CLOSE_DELAY_MIN = 15  #close snapshot taken N minutes after the close
+CAPTURE_JITTER_S = 20  #random delay added to each run
+CAPTURE_RETRIES = 3  #failed symbols retried with exponential backoff
+CAPTURE_BACKOFF_S = 10
+CAPTURE_LOCK_STALE_S = 900  #lock file of a dead scheduler ignored after this delay
+CAPTURE_HEARTBEAT_S = 60  #lock file refreshed every N seconds while held (well below CAPTURE_LOCK_STALE_S)
+
+BARCHART_TZ = 'America/Chicago'  #time zone of the "as of" footer of Barchart exports
+BARCHART_INGEST_WORKERS = 4  #Barchart CSV files parsed in parallel (processes)
+BARCHART_INDEX_TICKERS = {'SPX': '^SPX', 'SPXW': '^SPX', 'XSP': '^XSP', 'NDX': '^NDX', 'NDXP': '^NDX', 'RUT': '^RUT', 'RUTW': '^RUT', 'VIX': '^VIX', 'VIXW': '^VIX', 'DJX': '^DJI', 'OEX': '^OEX', 'XEO': '^OEX'}  #index option roots -> yFinance ticker of the underlying
+BARCHART_FUTURES_ROOTS = ['ES', 'NQ', 'RTY', 'YM', 'CL', 'NG', 'GC', 'SI', 'HG', 'ZB', 'ZN', 'ZC', 'ZS', 'ZW']  #futures option roots (ES, ESH25) -> <root>=F, yFinance continuous contract
+
 #UTC config
 CBOE_CLOSE_UTC = '21_59'
 UTC = 'Etc/GMT-1'
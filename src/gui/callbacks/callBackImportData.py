@@ -4,6 +4,8 @@ from dash.exceptions import PreventUpdate
 
 from import_data.import_data import ImportOptionSymbol, OptionsDataFetcher
 from import_data.utils import CheckFileAndData, LoadingData
+from import_data.chain_import import ChainImporter
+from import_data.provider.barchart.bar_chart import BarchartImporter
 
 
 from src.config.constant import PROVIDER_LIST
@@ -349,6 +351,82 @@ class SetDataCallBack:
 
         return False, color, '', dash.no_update, refresh_imported_options
     
+##########################################################################################
+###    CALL-BACK IMPORT WATCHLIST
+##########################################################################################
+
+    @dash.callback(
+        Output('import-msgbox', 'is_open', allow_duplicate=True),
+        Output('import-msgbox', 'color', allow_duplicate=True),
+        Output('import-msgbox', 'children', allow_duplicate=True),
+
+        Output("import-loading-data3", "children"),
+
+        Input('import-watchlist-button', 'n_clicks'),
+        prevent_initial_call=True
+    )
+    def download_buttonImportWatchlist(n_clicks):
+
+        if not n_clicks:
+            raise PreventUpdate
+
+        report = ChainImporter().import_watchlist()
+
+        if not report['imported'] and not report['failed']:
+
+            message = 'Watchlist is empty, add symbols to user_config/watchlist.json or import a symbol first'
+            color = 'warning'
+
+            return True, color, message, dash.no_update
+
+        message = f"{len(report['imported'])} chain(s) imported in {report['elapsed_s']}s ({report['chains_per_min']} chains/min)"
+        color = 'success'
+
+        if report['failed']:
+            message = f"{message}, failed: {', '.join(report['failed'])}"
+            color = 'warning'
+
+        return True, color, message, dash.no_update
+
+##########################################################################################
+###    CALL-BACK IMPORT BARCHART FILES
+##########################################################################################
+
+    @dash.callback(
+        Output('import-msgbox', 'is_open', allow_duplicate=True),
+        Output('import-msgbox', 'color', allow_duplicate=True),
+        Output('import-msgbox', 'children', allow_duplicate=True),
+
+        Output("import-loading-data4", "children"),
+
+        Input('import-barchart-button', 'n_clicks'),
+        prevent_initial_call=True
+    )
+    def download_buttonImportBarchart(n_clicks):
+
+        if not n_clicks:
+            raise PreventUpdate
+
+        class_BarchartImporter = BarchartImporter()
+        report = class_BarchartImporter.ingest()
+
+        if not report['files']:
+
+            message = f'No Barchart export found, drop the CSV files in {class_BarchartImporter.drop_dir}'
+            color = 'warning'
+
+            return True, color, message, dash.no_update
+
+        message = (f"{report['files']} file(s) ingested in {report['elapsed_s']}s ({report['files_per_s']} files/s, "
+                   f"{report['rows_per_s']} contracts/s): {', '.join(report['imported']) or 'no symbol'}")
+        color = 'success'
+
+        if report['failed']:
+            message = f"{message}, failed: {', '.join(report['failed'])}"
+            color = 'warning'
+
+        return True, color, message, dash.no_update
+
 ##########################################################################################
 ###    CALL-BACK UPDATE INFO FILE
 ##########################################################################################
@@ -12,7 +12,7 @@ from import_data.utils import LoadingData, ConvertData
 
 from src.analyzers.analyzer_oi import MetricsOI, VariationsOI, VolumesExpirations
 from src.analyzers.analyzer_iv import IVSmileByStrike, IVDeltaSkewAsymmetry, ImpliedVolatilitySurface, IVAtmAndRealizedVolatility
-from src.analyzers.analyzer_greeks import GammaExposure, DeltaExposure, VannaCumulative
+from src.analyzers.analyzer_greeks import GreeksExposure
 from src.config.constant import PROVIDER_LIST
 
 
@@ -122,7 +122,7 @@ class GlobalSetUpLayoutCallBack:
                 )
             )    
 
-            df = LoadingData().get_data_csv(selected_option, selected_date, selected_hour)
+            df = LoadingData().get_data_csv(selected_option, selected_date, selected_hour, compact=False)
 
             df['expiration_bis'] = df['expiration']
         
@@ -983,7 +983,7 @@ class OIVariationCallback:
         if selected_date2 and selected_hour2:
 
             df1 = pd.DataFrame(stored_data) 
-            df2 = LoadingData().get_data_csv(selected_option, selected_date2, selected_hour2) 
+            df2 = LoadingData().get_data_csv(selected_option, selected_date2, selected_hour2, compact=False) 
 
             function = ConvertData().convert_expiration_to_day(df2, selected_date2, False)
             df2['expiration_bis'] = df2['expiration']
@@ -1527,7 +1527,7 @@ class IVSmileStrikeLayoutCallBack:
 
         if selected_option and selected_date and selected_hour:
 
-            df = LoadingData().get_data_csv(selected_option, selected_date, selected_hour)
+            df = LoadingData().get_data_csv(selected_option, selected_date, selected_hour, compact=False)
 
             df['expiration_bis'] = df['expiration']
         
@@ -2199,7 +2199,7 @@ class GreeksGEXLayoutCallBack:
                 min_strike = float(min(listed))
                 max_strike = float(max(listed))
 
-                last_st = LoadingData().get_last_st(info, True, selected_date)
+                last_st = LoadingData().get_spot(info['underlying_ticker'], selected_date, dataframe=df)
     
                 c = 4  
                 f = c / (last_st ** 0.5)
@@ -2278,18 +2278,12 @@ class GreeksGEXLayoutCallBack:
         if not df.empty and exp_type and strike_range:
 
             if not exp_selected and exp_type in ['Specific', 'Peak']:
-                return fig_net_gex, fig_abs_gex, fig_vex
+                return fig_net_gex, fig_abs_gex, fig_dex, fig_vex
 
             strike_dw, strike_up = strike_range  
-            gamma_exposure = GammaExposure(selected_date, selected_hour, info, selected_show_day)
-            delta_exposure = DeltaExposure(selected_date, selected_hour, info, selected_show_day)
-            vanna_exposure = VannaCumulative(selected_date, selected_hour, info, selected_show_day)
+            greeks_exposure = GreeksExposure(selected_date, selected_hour, info, selected_show_day, dataframe=df)
 
-            fig_net_gex = gamma_exposure.gammaExposureCalcul(df, 'net', vol_type, strike_dw, strike_up, exp_type, exp_selected, plot=True) 
-            fig_abs_gex = gamma_exposure.gammaExposureCalcul(df, 'abs', vol_type, strike_dw, strike_up, exp_type, exp_selected, plot=True)  
-
-            fig_dex = delta_exposure.getDeltaExposure(df, strike_dw, strike_up, exp_type, exp_selected, plot=True)
-
-            fig_vex = vanna_exposure.getVannaExposure(df, strike_dw, strike_up, exp_type, exp_selected, plot=True)
+            # One filter and one grouped reduction for the four figures
+            fig_net_gex, fig_abs_gex, fig_dex, fig_vex = greeks_exposure.exposureFigures(df, vol_type, strike_dw, strike_up, exp_type, exp_selected)
 
         return fig_net_gex, fig_abs_gex, fig_dex, fig_vex
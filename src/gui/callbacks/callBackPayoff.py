@@ -8,6 +8,7 @@ import plotly.graph_objects as go
 
 from src.gui.pages.payoff import SetOptions
 from src.import_data.utils import LoadingData, ConvertData
+from src.import_data.quality_flags import clean_mask, QUALITY_COLUMN, QUOTE_FLAGS
 
 from src.analyzers.analyzer_monte_carlo import Simulation, GetDataAndCalculation
 from src.analyzers.analyzer_payoff import Statistics, OptionInputConverteur, StratManager
@@ -148,7 +149,13 @@ class SetOptionsCallBack:
 
         if selected_date and selected_option and selected_hour:
 
-            MAIN_DF = LoadingData().get_data_csv(selected_option, selected_date, selected_hour)
+            MAIN_DF = LoadingData().get_data_csv(
+                selected_option, 
+                selected_date, 
+                selected_hour, 
+                columns=['option_type', 'strike', 'ask', 'bid', 'expiration', 'implied_volatility', QUALITY_COLUMN],
+                compact=False
+            )
             
             selected_strategy = selected_strategy.lower()
             className = 'adapt_drop_down'
@@ -163,9 +170,8 @@ class SetOptionsCallBack:
                 function = ConvertData().convert_expiration_to_day(MAIN_DF, selected_date)
                 MAIN_DF['expiration'] = function
 
-            FILTRED_DF = MAIN_DF.loc[:, ['option_type', 'strike', 'ask', 'bid', 'expiration', 'implied_volatility']]
-
-            FILTRED_DF = FILTRED_DF[(FILTRED_DF['ask'] != 0) & (FILTRED_DF['bid'] != 0)]
+            # Tradable quotes only: no zero bid, no crossed market (quality flags)
+            FILTRED_DF = MAIN_DF.loc[clean_mask(MAIN_DF, QUOTE_FLAGS), ['option_type', 'strike', 'ask', 'bid', 'expiration', 'implied_volatility']]
             FILTRED_DF = FILTRED_DF.reset_index()
 
             store_data = FILTRED_DF.to_dict('records')
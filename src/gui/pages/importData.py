@@ -197,9 +197,29 @@ class ParamInfoJson:
                 dbc.Row( 
                     [
                         dbc.Col(self.buttonImportData(), width="auto", className="p-0 m-0"),  
+                        dbc.Col(
+                            [
+                                self.buttonImportWatchlist(),
+                                dbc.Tooltip(
+                                "Imports a new snapshot of every symbol of user_config/watchlist.json (default: all imported CBOE symbols)", 
+                                target="import-watchlist-button",
+                                ),
+                            ],
+                            width="auto", className="p-0 m-0"
+                        ),
+                        dbc.Col(
+                            [
+                                self.buttonImportBarchart(),
+                                dbc.Tooltip(
+                                "Ingests the Barchart options-chain CSV exports dropped in data/drop/Barchart", 
+                                target="import-barchart-button",
+                                ),
+                            ],
+                            width="auto", className="p-0 m-0"
+                        ),
                         dbc.Col(
                             dcc.Loading(
-                                children=[html.Div(id="import-loading-data"), html.Div(id="import-loading-data1"), html.Div(id="import-loading-data2")],
+                                children=[html.Div(id="import-loading-data"), html.Div(id="import-loading-data1"), html.Div(id="import-loading-data2"), html.Div(id="import-loading-data3"), html.Div(id="import-loading-data4")],
                                 custom_spinner=dbc.Spinner(color="info"),
                             ),
                             width="1",
@@ -369,6 +389,26 @@ class ParamInfoJson:
 
         return button
     
+    def buttonImportWatchlist(self):
+        button = html.Button(
+            'Import Watchlist',
+            id='import-watchlist-button',
+            n_clicks=0,
+            className='classic_button'
+        )
+
+        return button
+
+    def buttonImportBarchart(self):
+        button = html.Button(
+            'Import Barchart Files',
+            id='import-barchart-button',
+            n_clicks=0,
+            className='classic_button'
+        )
+
+        return button
+
     def buttonUpdateInfo(self):
         button = html.Button(
             'Update Info Only',
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+import yfinance as yf
+
+from src.config.constant import MARKET_DATA_OFFLINE, BAR_STORE_LIVE_TTL_S
+from system.file_paths import get_data_dir_cache
+
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# yfinance request limits (days per request)
+INTERVAL_MAX_DAYS = {'1m': 7, '2m': 59, '5m': 59, '15m': 59, '30m': 59, '1h': 729}
+
+# An empty answer for a whole request may be a network error, it is retried after this delay
+EMPTY_RETRY_S = 24 * 3600
+
+
+###############################################################
+###############################################################
+### Class -> Local OHLC bar store (yfinance, filled incrementally)
+###############################################################
+###############################################################
+
+class BarStore:
+    """
+    On-disk bars by ticker and interval: data/cache/bars/<ticker>/<interval>.parquet (UTC index)
+    plus a <interval>.json coverage file listing the days already fetched.
+    Only the missing days are downloaded. Past days are final, today is refreshed
+    after BAR_STORE_LIVE_TTL_S. Offline mode never calls the network.
+    """
+    def __init__(self, offline=MARKET_DATA_OFFLINE):
+
+        self.bars_dir = get_data_dir_cache() / 'bars'
+        self.offline = offline
+
+    def _paths(self, ticker, interval):
+
+        ticker_dir = self.bars_dir / ticker.replace('/', '_')
+
+        return ticker_dir / f'{interval}.parquet', ticker_dir / f'{interval}.json'
+
+    ###############################################################
+    ### Load / Save
+    ###############################################################
+
+    def _load(self, ticker, interval):
+
+        bars_path, coverage_path = self._paths(ticker, interval)
+
+        try:
+            bars = pd.read_parquet(bars_path)
+        except (FileNotFoundError, OSError, ValueError):
+            bars = pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], tz='UTC'))
+
+        try:
+            with open(coverage_path, 'r') as f:
+                coverage = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            coverage = {}
+
+        return bars, coverage
+
+    def _save(self, ticker, interval, bars, coverage):
+
+        bars_path, coverage_path = self._paths(ticker, interval)
+        bars_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_bars = bars_path.with_name(f'{bars_path.name}.{os.getpid()}.tmp')
+        tmp_coverage = coverage_path.with_name(f'{coverage_path.name}.{os.getpid()}.tmp')
+
+        bars.to_parquet(tmp_bars)
+        with open(tmp_coverage, 'w') as f:
+            json.dump(coverage, f)
+
+        os.replace(tmp_bars, bars_path)
+        os.replace(tmp_coverage, coverage_path)
+
+    ###############################################################
+    ### Download
+    ###############################################################
+
+    @staticmethod
+    def _to_utc(data):
+
+        data = data.copy()
+        data.index = pd.to_datetime(data.index)
+
+        if data.index.tz is None:
+            data.index = data.index.tz_localize('UTC')
+        else:
+            data.index = data.index.tz_convert('UTC')
+
+        return data[[col for col in BAR_COLUMNS if col in data.columns]]
+
+    def _download(self, ticker, interval, start_day, end_day):
+
+        try:
+            data = yf.download(
+                ticker,
+                start=start_day.strftime('%Y-%m-%d'),
+                end=(end_day + timedelta(days=1)).strftime('%Y-%m-%d'),
+                interval=interval,
+                multi_level_index=False,
+                progress=False
+            )
+        except Exception as e:
+            print(f"Download failed for {ticker} ({interval}): {e}")
+            return None
+
+        if data is None or data.empty:
+            return None
+
+        return self._to_utc(data)
+
+    @staticmethod
+    def _runs(days, max_days=None):
+        """
+        Contiguous runs of days, split at max_days.
+        """
+        runs = []
+
+        for day in days:
+            if runs and day - runs[-1][-1] == timedelta(days=1) and (max_days is None or len(runs[-1]) < max_days):
+                runs[-1].append(day)
+            else:
+                runs.append([day])
+
+        return [(run[0], run[-1]) for run in runs]
+
+    ###############################################################
+    ### Get bars
+    ###############################################################
+
+    def get_bars(self, ticker, interval, start, end):
+        """
+        Bars between start (included) and end (excluded), like yf.download. Index in UTC.
+        """
+        start_day = pd.Timestamp(start).date()
+        end_day = pd.Timestamp(end).date()
+
+        bars, coverage = self._load(ticker, interval)
+
+        if not self.offline:
+
+            now = time.time()
+            today = datetime.now(pytz.timezone('UTC')).date()
+
+            missing = []
+            day = start_day
+            while day < end_day and day <= today:
+
+                expires = coverage.get(day.strftime('%Y-%m-%d'), 0)
+                if expires is not None and expires <= now:
+                    missing.append(day)
+
+                day += timedelta(days=1)
+
+            if missing:
+
+                for run_start, run_end in self._runs(missing, INTERVAL_MAX_DAYS.get(interval)):
+
+                    data = self._download(ticker, interval, run_start, run_end)
+
+                    if data is not None:
+                        kept = bars[(bars.index.date < run_start) | (bars.index.date > run_end)]
+                        bars = pd.concat([kept, data]) if not kept.empty else data
+
+                    day = run_start
+                    while day <= run_end:
+                        if day >= today:
+                            coverage[day.strftime('%Y-%m-%d')] = now + BAR_STORE_LIVE_TTL_S
+                        elif data is None:
+                            coverage[day.strftime('%Y-%m-%d')] = now + EMPTY_RETRY_S
+                        else:
+                            coverage[day.strftime('%Y-%m-%d')] = None
+                        day += timedelta(days=1)
+
+                bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+
+                try:
+                    self._save(ticker, interval, bars, coverage)
+                except OSError as e:
+                    print(f"Bar store write error ({ticker}): {e}")
+
+        dates = bars.index.date
+        return bars[(dates >= start_day) & (dates < end_day)]
+
+    def latest_price(self, ticker, interval='1m', days=5):
+        """
+        Last close over the past days (same as yf.download(period='1d')['Close'].iloc[-1]).
+        None when no bar is available (offline, unknown ticker).
+        """
+        today = datetime.now(pytz.timezone('UTC')).date()
+        bars = self.get_bars(ticker, interval, today - timedelta(days=days), today + timedelta(days=1))
+
+        if bars.empty:
+            return None
+
+        return round(float(bars['Close'].iloc[-1]), 2)
@@ -0,0 +1,300 @@
+import os
+import time
+import random
+import argparse
+import threading
+
+from datetime import datetime, timedelta
+
+import pytz
+
+from src.config.constant import (
+    UTC, CAPTURE_MARKET_TZ, CAPTURE_MARKET_OPEN, CAPTURE_MARKET_CLOSE, CAPTURE_INTERVAL_MIN, CAPTURE_CLOSE_DELAY_MIN,
+    CAPTURE_JITTER_S, CAPTURE_RETRIES, CAPTURE_BACKOFF_S, CAPTURE_LOCK_STALE_S, CAPTURE_HEARTBEAT_S
+)
+from system.file_paths import get_data_dir_cache
+from src.import_data.chain_import import ChainImporter
+
+
+###############################################################
+###############################################################
+### Class -> Headless snapshot capture scheduler
+###############################################################
+###############################################################
+
+class CaptureScheduler:
+    """
+    Captures the watchlist every CAPTURE_INTERVAL_MIN minutes during market hours (weekdays,
+    CAPTURE_MARKET_TZ), plus the close CAPTURE_CLOSE_DELAY_MIN minutes after the bell.
+    Snapshots are labelled from the schedule ('HH:MM' of the slot or 'close') instead of the wall clock.
+    Only one scheduler runs at a time (lock file refreshed by a heartbeat thread while held),
+    slots missed during a long run are skipped.
+    """
+    def __init__(self, watchlist=None, importer=None, interval_min=CAPTURE_INTERVAL_MIN, jitter_s=CAPTURE_JITTER_S,
+                 retries=CAPTURE_RETRIES, backoff_s=CAPTURE_BACKOFF_S, heartbeat_s=CAPTURE_HEARTBEAT_S):
+
+        self.watchlist = watchlist
+        self.importer = importer or ChainImporter()
+        self.interval_min = interval_min
+        self.jitter_s = jitter_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.heartbeat_s = heartbeat_s
+
+        self.market_tz = pytz.timezone(CAPTURE_MARKET_TZ)
+        self.lock_path = get_data_dir_cache() / 'capture.lock'
+        self.lock_owner = str(os.getpid())
+
+        self.heartbeat_stop = threading.Event()
+        self.heartbeat_thread = None
+
+    ###############################################################
+    ### Schedule
+    ###############################################################
+
+    def day_slots(self, day):
+        """
+        [(datetime, 'intraday' | 'close')] of a market day (date in CAPTURE_MARKET_TZ), empty on week-ends.
+        """
+        if day.weekday() >= 5:
+            return []
+
+        open_time = self.market_tz.localize(datetime.combine(day, datetime.strptime(CAPTURE_MARKET_OPEN, '%H:%M').time()))
+        close_time = self.market_tz.localize(datetime.combine(day, datetime.strptime(CAPTURE_MARKET_CLOSE, '%H:%M').time()))
+
+        slots = []
+
+        slot = open_time
+        while slot < close_time:
+            slots.append((slot, 'intraday'))
+            slot += timedelta(minutes=self.interval_min)
+
+        slots.append((close_time + timedelta(minutes=CAPTURE_CLOSE_DELAY_MIN), 'close'))
+
+        return slots
+
+    def next_slot(self, now):
+        """
+        First slot strictly after now.
+        """
+        day = now.astimezone(self.market_tz).date()
+
+        for offset in range(8):
+            for slot, kind in self.day_slots(day + timedelta(days=offset)):
+                if slot > now:
+                    return slot, kind
+
+        return None, None
+
+    @staticmethod
+    def slot_label(slot, kind):
+        """
+        (date_str, hour_time) of the snapshot files, in the UTC setting of the app.
+        """
+        local_slot = slot.astimezone(pytz.timezone(UTC))
+
+        return local_slot.strftime('%Y-%m-%d'), 'close' if kind == 'close' else local_slot.strftime('%H:%M')
+
+    ###############################################################
+    ### Lock (one scheduler at a time)
+    ###############################################################
+
+    def acquire_lock(self):
+
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(self.lock_owner)
+
+            except FileExistsError:
+                if self.remove_stale_lock():
+                    continue
+                return False
+
+            self.start_heartbeat()
+            return True
+
+        return False
+
+    def remove_stale_lock(self):
+        """
+        Moves a stale lock aside (atomic rename) before deleting it, so only the file found stale is removed.
+        If another scheduler took it over in between, the lock moved aside is fresh and is put back.
+        True if the lock can be created again.
+        """
+        stale_path = self.lock_path.with_name(f'{self.lock_path.name}.{self.lock_owner}.stale')
+
+        try:
+            if time.time() - self.lock_path.stat().st_mtime <= CAPTURE_LOCK_STALE_S:
+                return False
+            os.replace(self.lock_path, stale_path)
+        except FileNotFoundError:
+            return True
+
+        if time.time() - stale_path.stat().st_mtime <= CAPTURE_LOCK_STALE_S:
+            try:
+                os.link(stale_path, self.lock_path)
+            except FileExistsError:
+                pass
+            stale_path.unlink()
+            return False
+
+        print(f"Stale capture lock removed: {self.lock_path}")
+        stale_path.unlink()
+
+        return True
+
+    def owns_lock(self):
+
+        try:
+            return self.lock_path.read_text().strip() == self.lock_owner
+        except OSError:
+            return False
+
+    def heartbeat(self):
+        """
+        Refreshes the lock, False if it is now held by another scheduler.
+        """
+        if not self.owns_lock():
+            print(f"Capture lock lost: {self.lock_path}")
+            return False
+
+        try:
+            os.utime(self.lock_path)
+        except OSError:
+            pass
+
+        return True
+
+    def start_heartbeat(self):
+        """
+        Refreshes the lock every heartbeat_s seconds from a daemon thread, a long import included.
+        """
+        def run():
+            while not self.heartbeat_stop.wait(self.heartbeat_s) and self.heartbeat():
+                pass
+
+        self.heartbeat_stop.clear()
+        self.heartbeat_thread = threading.Thread(target=run, name='CaptureLockHeartbeat', daemon=True)
+        self.heartbeat_thread.start()
+
+    def release_lock(self):
+
+        if self.heartbeat_thread is not None:
+            self.heartbeat_stop.set()
+            self.heartbeat_thread.join()
+            self.heartbeat_thread = None
+
+        # Never delete the lock of another scheduler
+        if not self.owns_lock():
+            return
+
+        try:
+            self.lock_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    ###############################################################
+    ### Capture
+    ###############################################################
+
+    def capture(self, date_str, hour_time):
+        """
+        Imports the watchlist, failed symbols are retried with exponential backoff.
+        Returns the symbols still failing.
+        """
+        pending = self.watchlist if self.watchlist is not None else self.importer.load_watchlist()
+
+        for attempt in range(self.retries + 1):
+
+            if not pending:
+                break
+
+            if attempt:
+                delay = self.backoff_s * 2 ** (attempt - 1)
+                print(f"Capture retry {attempt}/{self.retries} in {delay}s: {', '.join(pending)}")
+                time.sleep(delay)
+
+            pending = self.importer.import_watchlist(pending, date_str, hour_time)['failed']
+
+        if pending:
+            print(f"Capture {date_str} {hour_time} failed for: {', '.join(pending)}")
+
+        return pending
+
+    def wait_until(self, target):
+
+        while True:
+            remaining = (target - datetime.now(pytz.utc)).total_seconds()
+
+            if remaining <= 0:
+                return
+
+            time.sleep(min(remaining, 60))
+
+    def run(self, max_runs=None):
+        """
+        Blocking loop (max_runs for tests). Returns False if another scheduler holds the lock.
+        """
+        if not self.acquire_lock():
+            print(f"Another capture scheduler is running ({self.lock_path})")
+            return False
+
+        runs = 0
+
+        try:
+            while max_runs is None or runs < max_runs:
+
+                slot, kind = self.next_slot(datetime.now(pytz.utc))
+
+                if slot is None:
+                    return True
+
+                date_str, hour_time = self.slot_label(slot, kind)
+                print(f"Next capture: {date_str} {hour_time} at {slot.strftime('%Y-%m-%d %H:%M %Z')}")
+
+                self.wait_until(slot + timedelta(seconds=random.uniform(0, self.jitter_s)))
+
+                self.capture(date_str, hour_time)
+                runs += 1
+
+        finally:
+            self.release_lock()
+
+        return True
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Capture the watchlist on a schedule during market hours.')
+    parser.add_argument('symbols', nargs='*', help='Option symbols (default: user_config/watchlist.json, else the imported symbols).')
+    parser.add_argument('--interval', type=int, default=CAPTURE_INTERVAL_MIN, help='Minutes between intraday snapshots.')
+    parser.add_argument('--provider-url', default=None, help='Base URL of a mock provider (<url>/symboldir.csv, <url>/indices.json, <url>/options/<symbol>.json).')
+    parser.add_argument('--once', choices=['intraday', 'close'], default=None, help='Capture once now and exit.')
+    args = parser.parse_args()
+
+    importer = ChainImporter()
+    if args.provider_url:
+        base_url = args.provider_url.rstrip('/')
+        importer = ChainImporter(
+            quotes_url=f'{base_url}/options/{{symbol}}.json',
+            company_url=f'{base_url}/symboldir.csv',
+            index_url=f'{base_url}/indices.json'
+        )
+
+    class_CaptureScheduler = CaptureScheduler(args.symbols or None, importer, interval_min=args.interval)
+
+    if args.once:
+        if class_CaptureScheduler.acquire_lock():
+            try:
+                date_str, hour_time = class_CaptureScheduler.slot_label(datetime.now(pytz.utc), args.once)
+                class_CaptureScheduler.capture(date_str, hour_time)
+            finally:
+                class_CaptureScheduler.release_lock()
+        else:
+            print(f"Another capture scheduler is running ({class_CaptureScheduler.lock_path})")
+    else:
+        class_CaptureScheduler.run()
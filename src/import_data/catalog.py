@@ -0,0 +1,392 @@
+import json
+import sqlite3
+import threading
+
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.config.constant import CBOE_CLOSE_UTC
+from system.file_paths import get_data_dir_cache, get_data_dir_imported
+from src.import_data.snapshot_delta import SnapshotDelta
+from src.import_data.chain_schema import ChainSchema
+
+
+SNAPSHOT_PATTERNS = ['*/*/*/*.parquet', '*/*/*/*.csv']
+
+# Unchanged re-import: <stem>.alias (JSON) pointing to the snapshot file it duplicates
+ALIAS_EXTENSION = '.alias'
+ALIAS_PATTERN = f'*/*/*/*{ALIAS_EXTENSION}'
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        provider TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        date TEXT NOT NULL,
+        hour TEXT NOT NULL,
+        utc TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        row_count INTEGER,
+        strike_min REAL,
+        strike_max REAL,
+        expiry_min TEXT,
+        expiry_max TEXT,
+        file_path TEXT NOT NULL,
+        content_hash TEXT,
+        alias_of TEXT,
+        PRIMARY KEY (provider, symbol, date, hour, utc)
+    )
+"""
+CREATE_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_snapshots_symbol_ts ON snapshots (symbol, timestamp)"
+
+# Catalog files whose schema was checked by this process (once, not on every SnapshotCatalog())
+CHECKED_CATALOGS = set()
+CATALOG_LOCK = threading.Lock()
+
+CATALOG_COLUMNS = [
+    'provider',
+    'symbol',
+    'date',
+    'hour',
+    'utc',
+    'timestamp',
+    'row_count',
+    'strike_min',
+    'strike_max',
+    'expiry_min',
+    'expiry_max',
+    'file_path',
+    'content_hash',
+    'alias_of',
+]
+
+
+###############################################################
+###############################################################
+### Class -> Snapshot catalog (SQLite index of data/imported)
+###############################################################
+###############################################################
+
+class SnapshotCatalog:
+    """
+    Index of every imported snapshot, kept up to date by the importer.
+    Listing, existence and nearest-snapshot queries are index lookups
+    instead of directory scans. Rebuilt from disk if the file is missing.
+    """
+    def __init__(self, db_path=None):
+
+        self.current_dir = Path(get_data_dir_imported()).resolve()
+        self.db_path = Path(db_path) if db_path else get_data_dir_cache() / 'catalog.sqlite'
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with CATALOG_LOCK:
+            if self.db_path not in CHECKED_CATALOGS:
+                self.check_schema()
+                CHECKED_CATALOGS.add(self.db_path)
+
+    def check_schema(self):
+        """
+        Rebuilds the catalog from disk if it is missing or was created before the UTC offset was part of the key.
+        """
+        with closing(self._connect()) as conn:
+            key = {row[1] for row in conn.execute("PRAGMA table_info(snapshots)") if row[5]}
+
+        if 'utc' not in key:
+            self.rebuild()
+
+    def _connect(self):
+
+        return sqlite3.connect(str(self.db_path), timeout=10)
+
+    ###############################################################
+    ### Entry from a snapshot file
+    ###############################################################
+
+    def parse_path(self, file_path):
+        """
+        <provider>/<symbol>/<date>/<date>_<hour>_<utc>_<symbol>.<ext>
+        Returns None for files outside data/imported.
+        """
+        file_path = Path(file_path).resolve()
+
+        try:
+            provider, symbol, date_str, file_name = file_path.relative_to(self.current_dir).parts
+        except ValueError:
+            return None
+
+        stem = Path(file_name).stem
+
+        if not stem.startswith(date_str) or not stem.endswith(f'_{symbol}'):
+            return None
+
+        hour = stem[11:16]
+        utc = stem[17:len(stem) - len(symbol) - 1]
+        hour_time = CBOE_CLOSE_UTC if hour == 'close' else hour
+
+        return {
+            'provider': provider,
+            'symbol': symbol,
+            'date': date_str,
+            'hour': hour,
+            'utc': utc,
+            'timestamp': f"{date_str} {hour_time.replace('_', ':')}",
+            'file_path': str(file_path),
+        }
+
+    def read_alias(self, alias_path):
+        """
+        (target file path, content hash) of an alias file.
+        """
+        alias = json.loads(Path(alias_path).read_text())
+
+        return (self.current_dir / alias['alias_of']).resolve(), alias.get('content_hash')
+
+    def write_alias(self, alias_path, target_path, content_hash):
+
+        alias_path = Path(alias_path)
+        alias_path.parent.mkdir(parents=True, exist_ok=True)
+
+        alias_path.write_text(json.dumps({
+            'alias_of': Path(target_path).resolve().relative_to(self.current_dir).as_posix(),
+            'content_hash': content_hash,
+        }))
+
+    def entry_from_file(self, file_path, df=None, content_hash=None):
+
+        entry = self.parse_path(file_path)
+
+        if entry is None:
+            return None
+
+        alias_of = None
+        data_path = Path(file_path)
+
+        if data_path.suffix == ALIAS_EXTENSION:
+            data_path, alias_hash = self.read_alias(file_path)
+            alias_of = str(data_path)
+            content_hash = content_hash or alias_hash
+
+        elif content_hash is None and data_path.suffix == '.parquet':
+            content_hash = ChainSchema.stored_hash(pq.read_schema(data_path))
+
+        if df is None:
+            if data_path.suffix == '.parquet':
+                df = SnapshotDelta().read_table(data_path, columns=['strike', 'expiration']).to_pandas()
+            else:
+                df = pd.read_csv(data_path, usecols=['strike', 'expiration'])
+
+        strikes = pd.to_numeric(df['strike'], errors='coerce')
+        expirations = pd.to_datetime(df['expiration'], errors='coerce')
+
+        entry.update({
+            'row_count': int(len(df)),
+            'strike_min': float(strikes.min()) if strikes.notna().any() else None,
+            'strike_max': float(strikes.max()) if strikes.notna().any() else None,
+            'expiry_min': expirations.min().strftime('%Y-%m-%d') if expirations.notna().any() else None,
+            'expiry_max': expirations.max().strftime('%Y-%m-%d') if expirations.notna().any() else None,
+            'content_hash': content_hash,
+            'alias_of': alias_of,
+        })
+
+        return entry
+
+    ###############################################################
+    ### Update
+    ###############################################################
+
+    def register(self, file_path, df=None, content_hash=None):
+
+        entry = self.entry_from_file(file_path, df, content_hash)
+
+        if entry is None:
+            return False
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO snapshots ({', '.join(CATALOG_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))})",
+                [entry[col] for col in CATALOG_COLUMNS]
+            )
+
+        return True
+
+    def unregister(self, file_path):
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM snapshots WHERE file_path = ?", (str(Path(file_path).resolve()),))
+
+    def rebuild(self):
+
+        entries = {}
+
+        # Parquet first, a CSV or an alias with the same key does not replace it
+        for pattern in SNAPSHOT_PATTERNS + [ALIAS_PATTERN]:
+            for file_path in sorted(self.current_dir.glob(pattern)):
+
+                try:
+                    entry = self.entry_from_file(file_path)
+                except Exception as e:
+                    print(f"Catalog: skipped {file_path}: {e}")
+                    continue
+
+                if entry is not None:
+                    key = (entry['provider'], entry['symbol'], entry['date'], entry['hour'], entry['utc'])
+                    entries.setdefault(key, entry)
+
+        # One write transaction: readers see the old or the new table, never an empty one, and concurrent
+        # rebuilds (other threads / processes) run one after the other. Dropped rather than emptied:
+        # an older catalog may have a different primary key.
+        with closing(sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)) as conn:
+
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                conn.execute("DROP TABLE IF EXISTS snapshots")
+                conn.execute(CREATE_TABLE_SQL)
+                conn.execute(CREATE_INDEX_SQL)
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO snapshots ({', '.join(CATALOG_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))})",
+                    [[entry[col] for col in CATALOG_COLUMNS] for entry in entries.values()]
+                )
+                conn.execute("COMMIT")
+
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        print(f"Catalog rebuilt: {len(entries)} snapshot(s)")
+
+        return len(entries)
+
+    ###############################################################
+    ### Queries
+    ###############################################################
+
+    def _query(self, sql, params=()):
+
+        with closing(self._connect()) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def list_symbols(self):
+
+        return [row[0] for row in self._query("SELECT DISTINCT symbol FROM snapshots ORDER BY symbol")]
+
+    def list_dates(self, symbol):
+
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT date FROM snapshots WHERE symbol = ? ORDER BY date", (symbol,)
+        )]
+
+    def list_hours(self, symbol, date_str):
+
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT hour FROM snapshots WHERE symbol = ? AND date = ? ORDER BY hour", (symbol, date_str)
+        )]
+
+    def list_snapshots(self, symbol, date_from=None, date_to=None):
+        """
+        {date: [hours]} for all snapshots between date_from and date_to (included).
+        """
+        rows = self._query(
+            "SELECT date, hour FROM snapshots WHERE symbol = ? AND date >= ? AND date <= ? ORDER BY timestamp",
+            (symbol, date_from or '0000-00-00', date_to or '9999-99-99')
+        )
+
+        available_data = {}
+        for date_str, hour in rows:
+            available_data.setdefault(date_str, [])
+            if hour not in available_data[date_str]:
+                available_data[date_str].append(hour)
+
+        return available_data
+
+    def find(self, symbol, date_str, hour, resolve_alias=True, utc=None):
+        """
+        File holding the snapshot (the target file for an alias, the .alias file with resolve_alias=False).
+        utc ('UTC+01_00'): snapshot taken under that UTC setting first, else any UTC.
+        """
+        rows = self._query(
+            f"SELECT {'coalesce(alias_of, file_path)' if resolve_alias else 'file_path'} FROM snapshots "
+            "WHERE symbol = ? AND date = ? AND hour = ? "
+            "ORDER BY utc = ? DESC, file_path LIKE '%.parquet' DESC LIMIT 1",
+            (symbol, date_str, hour, utc)
+        )
+
+        return Path(rows[0][0]) if rows else None
+
+    def exists(self, symbol, date_str=None):
+
+        if date_str is None:
+            rows = self._query("SELECT 1 FROM snapshots WHERE symbol = ? LIMIT 1", (symbol,))
+        else:
+            rows = self._query("SELECT 1 FROM snapshots WHERE symbol = ? AND date = ? LIMIT 1", (symbol, date_str))
+
+        return len(rows) > 0
+
+    def nearest(self, symbol, timestamp):
+        """
+        Snapshot closest in time to timestamp, as a dict (None if the symbol has no snapshot).
+        """
+        target = pd.Timestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+        rows = self._query(
+            f"SELECT {', '.join(CATALOG_COLUMNS)} FROM snapshots WHERE symbol = ? "
+            "ORDER BY abs(julianday(timestamp) - julianday(?)) LIMIT 1",
+            (symbol, target)
+        )
+
+        return dict(zip(CATALOG_COLUMNS, rows[0])) if rows else None
+
+    ###############################################################
+    ### De-duplication
+    ###############################################################
+
+    def previous(self, file_path):
+        """
+        Latest snapshot of the same provider / symbol at or before file_path's timestamp, as a dict.
+        """
+        entry = self.parse_path(file_path)
+
+        if entry is None:
+            return None
+
+        rows = self._query(
+            f"SELECT {', '.join(CATALOG_COLUMNS)} FROM snapshots WHERE provider = ? AND symbol = ? AND timestamp <= ? "
+            "ORDER BY timestamp DESC LIMIT 1",
+            (entry['provider'], entry['symbol'], entry['timestamp'])
+        )
+
+        return dict(zip(CATALOG_COLUMNS, rows[0])) if rows else None
+
+    def aliases_of(self, file_path):
+        """
+        Alias files pointing to file_path.
+        """
+        rows = self._query("SELECT file_path FROM snapshots WHERE alias_of = ?", (str(Path(file_path).resolve()),))
+
+        return [Path(row[0]) for row in rows]
+
+    def alias_keys(self, symbol):
+        """
+        {(date, hour): (date, hour) of the snapshot it duplicates} for the aliases of symbol.
+        """
+        rows = self._query(
+            "SELECT date, hour, alias_of FROM snapshots WHERE symbol = ? AND alias_of IS NOT NULL", (symbol,)
+        )
+
+        alias_keys = {}
+        for date_str, hour, alias_of in rows:
+            target = self.parse_path(alias_of)
+            if target is not None:
+                alias_keys[(date_str, hour)] = (target['date'], target['hour'])
+
+        return alias_keys
+
+
+if __name__ == '__main__':
+
+    SnapshotCatalog().rebuild()
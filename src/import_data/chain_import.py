@@ -0,0 +1,201 @@
+import json
+import time
+import asyncio
+import argparse
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.config.constant import HTTP_TIMEOUT_S, IMPORT_MAX_CONCURRENCY, IMPORT_HOST_RATE_PER_S, IMPORT_TRANSFORM_WORKERS
+from system.file_paths import get_global_dir, get_data_dir_imported
+from src.import_data.provider.cboe.cboe_data import GetCboeData, CBOE_COMPANY_URL, CBOE_INDEX_URL, CBOE_QUOTES_URL, transform_options
+from src.import_data.provider.cboe.cboe_stream import CboeQuotesParser, STREAM_CHUNK_SIZE
+from src.import_data.import_data import OptionsDataFetcher
+
+
+###############################################################
+###############################################################
+### Class -> Per-host rate limiter (asyncio)
+###############################################################
+###############################################################
+
+class HostRateLimiter:
+    """
+    Spaces the requests sent to a same host by at least 1 / rate_per_s seconds.
+    """
+    def __init__(self, rate_per_s=IMPORT_HOST_RATE_PER_S):
+
+        self.interval = 1 / rate_per_s if rate_per_s else 0
+        self.next_slot = {}
+        self.locks = {}
+
+    async def wait(self, url):
+
+        if not self.interval:
+            return
+
+        host = urlsplit(url).netloc
+        lock = self.locks.setdefault(host, asyncio.Lock())
+
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+###############################################################
+###############################################################
+### Class -> Concurrent chain import (watchlist)
+###############################################################
+###############################################################
+
+class ChainImporter:
+    """
+    Imports the CBOE chains of a watchlist in parallel: quotes are downloaded with aiohttp
+    (pooled connections, max_concurrency requests in flight, rate limited per host),
+    transform + snapshot write run in a thread pool while the other downloads go on.
+    """
+    def __init__(self, max_concurrency=IMPORT_MAX_CONCURRENCY, rate_per_s=IMPORT_HOST_RATE_PER_S,
+                 transform_workers=IMPORT_TRANSFORM_WORKERS, quotes_url=CBOE_QUOTES_URL,
+                 company_url=CBOE_COMPANY_URL, index_url=CBOE_INDEX_URL):
+
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = HostRateLimiter(rate_per_s)
+        self.transform_workers = transform_workers
+        self.quotes_url = quotes_url
+        self.company_url = company_url
+        self.index_url = index_url
+
+    @staticmethod
+    def load_watchlist():
+        """
+        Symbols of user_config/watchlist.json, else every symbol already imported from CBOE.
+        """
+        watchlist_path = get_global_dir() / 'user_config' / 'watchlist.json'
+
+        try:
+            with open(watchlist_path, 'r') as f:
+                watchlist = json.load(f)
+            if isinstance(watchlist, list):
+                return [str(symbol) for symbol in watchlist]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Watchlist error ({watchlist_path}): {e}")
+
+        cboe_dir = Path(get_data_dir_imported()) / 'CBOE'
+
+        return sorted(path.name for path in cboe_dir.iterdir() if path.is_dir()) if cboe_dir.exists() else []
+
+    ###############################################################
+    ### Fetch / Save
+    ###############################################################
+
+    async def fetch_quotes(self, session, url, executor=None):
+        """
+        Quotes payload parsed while it downloads (CboeQuotesParser). Chunks are parsed in executor,
+        not on the event loop, so the other downloads go on meanwhile.
+        """
+        await self.rate_limiter.wait(url)
+
+        loop = asyncio.get_running_loop()
+
+        async with session.get(url) as response:
+            response.raise_for_status()
+
+            parser = CboeQuotesParser(response.content_length)
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                await loop.run_in_executor(executor, parser.feed, chunk)
+
+        parser.close()
+
+        return parser
+
+    @staticmethod
+    def save_chain(symbol, parser, date_str=None, hour_time=None):
+
+        df, now_ = transform_options(parser.to_frame(), parser.current_price)
+
+        return OptionsDataFetcher().save_snapshot('CBOE', symbol, df, now_, date_str, hour_time)
+
+    async def import_symbol(self, session, semaphore, executor, symbol, indexes, listed_symbols, date_str=None, hour_time=None):
+
+        url = GetCboeData.quotes_url(symbol, indexes, listed_symbols, base_url=self.quotes_url)
+
+        if url is None:
+            return symbol, None
+
+        try:
+            async with semaphore:
+                parser = await self.fetch_quotes(session, url, executor)
+
+            file_path = await asyncio.get_running_loop().run_in_executor(executor, self.save_chain, symbol, parser, date_str, hour_time)
+
+        except Exception as e:
+            print(f"Import error ({symbol}): {e}")
+            return symbol, None
+
+        return symbol, file_path
+
+    async def import_watchlist_async(self, watchlist, date_str=None, hour_time=None):
+
+        class_GetCboeData = GetCboeData(self.company_url, self.index_url)
+
+        # Directories come from the HTTP cache, one lookup for the whole watchlist
+        indexes, listed_symbols = await asyncio.gather(
+            class_GetCboeData.get_index_directory(),
+            class_GetCboeData.get_company_directory(),
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_S)
+
+        with ThreadPoolExecutor(max_workers=self.transform_workers) as executor:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+                return await asyncio.gather(*[
+                    self.import_symbol(session, semaphore, executor, symbol, indexes, listed_symbols, date_str, hour_time)
+                    for symbol in dict.fromkeys(watchlist)
+                ])
+
+    def import_watchlist(self, watchlist=None, date_str=None, hour_time=None):
+        """
+        Imports a snapshot of each symbol (labelled date_str / hour_time if given). Returns a report:
+        {'imported': {symbol: file_path}, 'failed': [symbols], 'elapsed_s', 'chains_per_min'}
+        """
+        watchlist = self.load_watchlist() if watchlist is None else watchlist
+
+        start = time.perf_counter()
+        results = asyncio.run(self.import_watchlist_async(watchlist, date_str, hour_time)) if watchlist else []
+        elapsed = time.perf_counter() - start
+
+        imported = {symbol: file_path for symbol, file_path in results if file_path is not None}
+
+        report = {
+            'imported': imported,
+            'failed': [symbol for symbol, file_path in results if file_path is None],
+            'elapsed_s': round(elapsed, 2),
+            'chains_per_min': round(len(imported) / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        }
+
+        print(f"Imported {len(imported)}/{len(results)} chain(s) in {report['elapsed_s']}s ({report['chains_per_min']} chains/min)")
+
+        return report
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Import a snapshot of every symbol of the watchlist (CBOE).')
+    parser.add_argument('symbols', nargs='*', help='Option symbols (default: user_config/watchlist.json, else the imported symbols).')
+    parser.add_argument('--concurrency', type=int, default=IMPORT_MAX_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=IMPORT_HOST_RATE_PER_S, help='Max requests per second and per host.')
+    args = parser.parse_args()
+
+    ChainImporter(max_concurrency=args.concurrency, rate_per_s=args.rate).import_watchlist(args.symbols or None)
@@ -0,0 +1,208 @@
+import hashlib
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.import_data.quality_flags import quality_flags, QUALITY_COLUMN, QUALITY_INPUT_COLUMNS, QUALITY_TIME_COLUMN
+
+
+# Bump when a column is added / retyped, the version is stored in each snapshot's metadata
+CHAIN_SCHEMA_VERSION = 3
+SCHEMA_VERSION_KEY = b'chain_schema_version'
+CONTENT_HASH_KEY = b'content_hash'
+
+CHAIN_SCHEMA = pa.schema([
+    ('underlying_symbol', pa.string()),
+    ('underlying_price', pa.float64()),
+    ('contract_symbol', pa.string()),
+    ('expiration', pa.string()),
+    ('dte', pa.int64()),
+    ('strike', pa.float64()),
+    ('option_type', pa.string()),
+    ('open_interest', pa.int64()),
+    ('volume', pa.int64()),
+    ('theoretical_price', pa.float64()),
+    ('last_trade_price', pa.float64()),
+    ('last_trade_time', pa.string()),
+    ('tick', pa.string()),
+    ('bid', pa.float64()),
+    ('bid_size', pa.int64()),
+    ('ask', pa.float64()),
+    ('ask_size', pa.int64()),
+    ('open', pa.float64()),
+    ('high', pa.float64()),
+    ('low', pa.float64()),
+    ('prev_close', pa.float64()),
+    ('change', pa.float64()),
+    ('change_percent', pa.float64()),
+    ('implied_volatility', pa.float64()),
+    ('delta', pa.float64()),
+    ('gamma', pa.float64()),
+    ('theta', pa.float64()),
+    ('vega', pa.float64()),
+    ('rho', pa.float64()),
+    (QUALITY_COLUMN, pa.int32()),
+])
+
+# A row without these is not a usable contract
+REQUIRED_COLUMNS = ['contract_symbol', 'expiration', 'strike', 'option_type']
+OPTION_TYPES = ['call', 'put']
+
+
+###############################################################
+###############################################################
+### Class -> Versioned chain schema (write-time enforcement)
+###############################################################
+###############################################################
+
+class ChainSchema:
+    """
+    Every snapshot goes through enforce() before it is written: CHAIN_SCHEMA types,
+    expiration as 'YYYY-MM-DD', last_trade_time as 'YYYY-MM-DDTHH:MM:SS', option_type in call/put, positive strike, one row per contract,
+    quality_flags computed (see quality_flags.py).
+    Tables read back are guaranteed to have the CHAIN_SCHEMA types (conform() for older files),
+    so the analyzers don't need to convert the columns again.
+    """
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def version(table_or_schema):
+
+        schema = table_or_schema.schema if isinstance(table_or_schema, pa.Table) else table_or_schema
+        value = (schema.metadata or {}).get(SCHEMA_VERSION_KEY)
+
+        return int(value) if value else None
+
+    @staticmethod
+    def stamp(table):
+        """
+        Adds the schema version to the table metadata (other keys are kept).
+        """
+        metadata = dict(table.schema.metadata or {})
+        metadata[SCHEMA_VERSION_KEY] = str(CHAIN_SCHEMA_VERSION).encode()
+
+        return table.replace_schema_metadata(metadata)
+
+    @staticmethod
+    def expiration_dates(values):
+        """
+        datetime64 expirations: returned as is when already typed, else parsed with the
+        schema format ('YYYY-MM-DD', no per-value format inference).
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+
+        try:
+            return pd.to_datetime(values, format='%Y-%m-%d')
+        except (ValueError, TypeError):
+            return pd.to_datetime(values)
+
+    @staticmethod
+    def content_hash(table):
+        """
+        SHA-256 of an enforced table (column names + values, chunking and metadata ignored):
+        two imports of an unchanged feed give the same hash.
+        """
+        digest = hashlib.sha256(','.join(table.column_names).encode())
+        digest.update(pd.util.hash_pandas_object(table.to_pandas(), index=False).to_numpy().tobytes())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def stored_hash(table_or_schema):
+
+        schema = table_or_schema.schema if isinstance(table_or_schema, pa.Table) else table_or_schema
+        value = (schema.metadata or {}).get(CONTENT_HASH_KEY)
+
+        return value.decode() if value else None
+
+    def enforce(self, df):
+        """
+        DataFrame from a provider -> validated pa.Table (CHAIN_SCHEMA, versioned).
+        """
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Chain schema: missing column(s) {', '.join(missing)}")
+
+        df = df.copy()
+
+        # Provider chain: flags computed once here (stored snapshots read back keep theirs)
+        compute_flags = QUALITY_COLUMN not in df.columns
+
+        for field in CHAIN_SCHEMA:
+
+            if field.name not in df.columns:
+                df[field.name] = None
+
+            if pa.types.is_integer(field.type):
+                df[field.name] = pd.to_numeric(df[field.name], errors='coerce').fillna(0).astype('int64')
+
+            elif pa.types.is_floating(field.type):
+                df[field.name] = pd.to_numeric(df[field.name], errors='coerce').astype('float64')
+
+            else:
+                df[field.name] = df[field.name].astype(object).where(df[field.name].notna(), None)
+
+        expiration = pd.to_datetime(df['expiration'], errors='coerce')
+        df['expiration'] = expiration.dt.strftime('%Y-%m-%d').astype(object).where(expiration.notna(), None)
+
+        trade_time = pd.to_datetime(df['last_trade_time'], errors='coerce')
+        df['last_trade_time'] = trade_time.dt.strftime('%Y-%m-%dT%H:%M:%S').astype(object).where(trade_time.notna(), None)
+        df['option_type'] = df['option_type'].where(df['option_type'].isna(), df['option_type'].astype(str).str.lower())
+
+        valid = (
+            df['contract_symbol'].notna()
+            & df['expiration'].notna()
+            & (df['strike'] > 0)
+            & df['option_type'].isin(OPTION_TYPES)
+        )
+        valid &= ~df['contract_symbol'].where(valid).duplicated(keep='last')
+
+        dropped = int((~valid).sum())
+        if dropped:
+            print(f"Chain schema: {dropped} invalid or duplicated row(s) dropped")
+
+        df = df.loc[valid]
+
+        if compute_flags:
+            df[QUALITY_COLUMN] = quality_flags(df)
+
+        table = pa.Table.from_pandas(df[CHAIN_SCHEMA.names], schema=CHAIN_SCHEMA, preserve_index=False)
+
+        return self.stamp(table)
+
+    def conform(self, table):
+        """
+        Read side: casts the columns of a table written with another (or no) schema version.
+        """
+        if self.version(table) == CHAIN_SCHEMA_VERSION:
+            return table
+
+        for i, name in enumerate(table.column_names):
+
+            index = CHAIN_SCHEMA.get_field_index(name)
+            if index < 0 or table.schema.field(i).type == CHAIN_SCHEMA.field(index).type:
+                continue
+
+            target = CHAIN_SCHEMA.field(index).type
+            column = table.column(i)
+
+            if pa.types.is_string(target):
+                column = pc.cast(column, target)
+            else:
+                column = pa.chunked_array([pa.array(pd.to_numeric(column.to_pandas(), errors='coerce'), from_pandas=True).cast(target, safe=False)])
+
+            table = table.set_column(i, name, column)
+
+        # Written before the quality flags (version 1): same rules as enforce(), STALE_TRADE from
+        # last_trade_time when the file has it (else from last_trade_price, see quality_flags)
+        if QUALITY_COLUMN not in table.column_names and all(col in table.column_names for col in QUALITY_INPUT_COLUMNS):
+            inputs = QUALITY_INPUT_COLUMNS + [QUALITY_TIME_COLUMN] * (QUALITY_TIME_COLUMN in table.column_names)
+            table = table.append_column(
+                pa.field(QUALITY_COLUMN, pa.int32()),
+                pa.array(quality_flags(table.select(inputs).to_pandas()), pa.int32())
+            )
+
+        return table
@@ -0,0 +1,125 @@
+import os
+
+from pathlib import Path
+
+import pyarrow as pa
+
+from src.config.constant import HOT_TIER_MAX_SIZE_MB
+from system.file_paths import get_data_dir_cache, get_data_dir_imported
+
+
+###############################################################
+###############################################################
+### Class -> Hot tier, memory-mapped Arrow IPC (Feather v2)
+###############################################################
+###############################################################
+
+class SnapshotHotTier:
+    """
+    Uncompressed Arrow IPC copies of recently loaded snapshots.
+    Files are opened with memory mapping, so repeated loads are zero-copy
+    and the pages are shared between processes through the OS cache.
+    """
+    def __init__(self, max_size_mb=HOT_TIER_MAX_SIZE_MB):
+
+        self.hot_dir = get_data_dir_cache() / 'hot'
+        self.imported_dir = Path(get_data_dir_imported()).resolve()
+        self.max_size = max_size_mb * 1024 * 1024
+
+    ###############################################################
+    ### Hot file path (mirror of data/imported layout)
+    ###############################################################
+
+    def hot_path(self, source_path):
+
+        source_path = Path(source_path).resolve()
+
+        try:
+            relative = source_path.relative_to(self.imported_dir)
+        except ValueError:
+            relative = Path(source_path.parent.name) / source_path.name
+
+        return (self.hot_dir / relative).with_suffix('.arrow')
+
+    ###############################################################
+    ### Get / Put
+    ###############################################################
+
+    def get(self, source_path):
+        """
+        Returns the memory-mapped Table, or None if missing or older than the source file.
+        """
+        hot_path = self.hot_path(source_path)
+
+        try:
+            if hot_path.stat().st_mtime < Path(source_path).stat().st_mtime:
+                return None
+
+            table = pa.ipc.open_file(pa.memory_map(str(hot_path), 'r')).read_all()
+
+        except (FileNotFoundError, pa.ArrowInvalid, OSError):
+            return None
+
+        try:
+            os.utime(hot_path)
+        except OSError:
+            pass
+
+        return table
+
+    def put(self, source_path, table):
+
+        hot_path = self.hot_path(source_path)
+        hot_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = hot_path.with_name(f'{hot_path.name}.{os.getpid()}.tmp')
+
+        try:
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            os.replace(tmp_path, hot_path)
+
+        except OSError as e:
+            print(f"Hot tier write error ({hot_path}): {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        self.evict()
+
+    ###############################################################
+    ### Eviction (least recently used first)
+    ###############################################################
+
+    def evict(self):
+
+        files = []
+
+        for hot_path in self.hot_dir.rglob('*.arrow'):
+            try:
+                stat = hot_path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, hot_path))
+
+        total_size = sum(size for _, size, _ in files)
+
+        for _, size, hot_path in sorted(files):
+
+            if total_size <= self.max_size:
+                break
+
+            try:
+                hot_path.unlink()
+                total_size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+
+        for hot_path in self.hot_dir.rglob('*.arrow'):
+            try:
+                hot_path.unlink()
+            except OSError:
+                pass
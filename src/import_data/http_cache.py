@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from src.config.constant import HTTP_POOL_SIZE, HTTP_TIMEOUT_S
+from system.file_paths import get_data_dir_cache
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session():
+    """
+    requests.Session shared by the process (keep-alive connection pool).
+    """
+    global _SESSION
+
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=2)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _SESSION = session
+
+    return _SESSION
+
+
+###############################################################
+###############################################################
+### Class -> HTTP response cache (TTL + ETag / Last-Modified)
+###############################################################
+###############################################################
+
+class HttpCache:
+    """
+    Cached GET for slow-changing endpoints (symbol directories).
+    Fresh responses (younger than ttl) are served from data/cache/http without any request.
+    Stale ones are revalidated with If-None-Match / If-Modified-Since (304 = body reused).
+    If the server can't be reached, the stale body is returned.
+    """
+    def __init__(self, session=None):
+
+        self.cache_dir = get_data_dir_cache() / 'http'
+        self.session = session or get_session()
+
+    def _paths(self, url):
+
+        key = hashlib.sha1(url.encode()).hexdigest()
+
+        return self.cache_dir / f'{key}.body', self.cache_dir / f'{key}.json'
+
+    def _read(self, url):
+
+        body_path, meta_path = self._paths(url)
+
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (FileNotFoundError, OSError, ValueError):
+            return None, None
+
+        return body, meta
+
+    def _write(self, url, body, meta):
+
+        body_path, meta_path = self._paths(url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        tmp_suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        try:
+            if body is not None:
+                with open(f'{body_path}{tmp_suffix}', 'wb') as f:
+                    f.write(body)
+                os.replace(f'{body_path}{tmp_suffix}', body_path)
+
+            with open(f'{meta_path}{tmp_suffix}', 'w') as f:
+                json.dump(meta, f)
+            os.replace(f'{meta_path}{tmp_suffix}', meta_path)
+
+        except OSError as e:
+            print(f"HTTP cache write error ({url}): {e}")
+
+    def get(self, url, ttl):
+        """
+        Response body (bytes) of url, at most ttl seconds old when the server is reachable.
+        """
+        body, meta = self._read(url)
+
+        if body is not None and time.time() - meta['fetched_at'] < ttl:
+            return body
+
+        headers = {}
+        if body is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT_S)
+
+            if response.status_code == 304 and body is not None:
+                meta['fetched_at'] = time.time()
+                self._write(url, None, meta)
+                return body
+
+            response.raise_for_status()
+
+        except requests.exceptions.RequestException as e:
+            if body is not None:
+                print(f"HTTP error ({url}): {e}, cached response used")
+                return body
+            raise
+
+        self._write(url, response.content, {
+            'url': url,
+            'fetched_at': time.time(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        })
+
+        return response.content
@@ -10,9 +10,11 @@ from pathlib import Path
 import pandas as pd
 import pytz
 
-from src.config.constant import CBOE_URL, PROVIDER_LIST, UTC, UTC_NAME
+from src.config.constant import CBOE_URL, CBOE_SYMBOL_LIST_TTL_H, PROVIDER_LIST, UTC, UTC_NAME
 from system.file_paths import get_data_dir_imported, get_data_dir
-from src.import_data.provider.cboe.cboe_data import GetCboeData, transform_data
+from src.import_data.provider.cboe.cboe_data import GetCboeData, transform_options
+from src.import_data.snapshot_store import SnapshotStore
+from src.import_data.http_cache import HttpCache
 
 ###############################################################
 ###############################################################
@@ -37,10 +39,9 @@ class ImportOptionSymbol:
 
     def download_csv(self):
         try:
-            response = requests.get(CBOE_URL, stream=True)
-            response.raise_for_status() 
-            
-            return pd.read_csv(BytesIO(response.content))
+            content = HttpCache().get(CBOE_URL, ttl=CBOE_SYMBOL_LIST_TTL_H * 3600)
+
+            return pd.read_csv(BytesIO(content))
         except requests.exceptions.RequestException as e:
             print(f"Error -> downloading: {e}")
             return pd.DataFrame()
@@ -212,7 +213,7 @@ class OptionsDataFetcher:
 
         async def run_cboe_data_process(ticker):
             cboe_data = GetCboeData()
-            result = await cboe_data.cboe_request(ticker)  
+            result = await cboe_data.cboe_request_stream(ticker)  
             return result
 
         try:
@@ -222,35 +223,46 @@ class OptionsDataFetcher:
             if not os.path.exists(ticker_dir):
                 os.makedirs(ticker_dir)
         
-            json_data = asyncio.run(run_cboe_data_process(self.options_ticker))
+            parser = asyncio.run(run_cboe_data_process(self.options_ticker))
 
-            df, now_ = transform_data(json_data)
+            df, now_ = transform_options(parser.to_frame(), parser.current_price)
     
           
         except Exception as e:
             pass
         
         if self.boolean_save:
-      
-            now = now_.astimezone(pytz.timezone(UTC))
+
+            self.save_snapshot('CBOE', self.options_ticker, df, now_)
+        
+        else:
+            return df
+
+    def save_snapshot(self, provider, options_ticker, df, now_, date_str=None, hour_time=None):
+        """
+        Writes a transformed chain as the snapshot of its date / hour, returns the file path.
+        date_str / hour_time ('HH:MM' or 'close') are guessed from the time when not given.
+        """
+        ticker_dir = (Path(self.current_dir) / provider / options_ticker).resolve()
+
+        now = now_.astimezone(pytz.timezone(UTC))
+
+        if date_str is None or hour_time is None:
             date_str, hour_time, df_filtered = self.create_daily_folder(now, ticker_dir, df)
+        else:
+            df['dte'] = (pd.to_datetime(df['expiration']).dt.tz_localize('UTC').dt.tz_convert(UTC) - now).dt.days + 1
+            df_filtered = df
 
-            utc_value = UTC_NAME[UTC]
+        utc_value = UTC_NAME[UTC]
 
-            utc_value = utc_value.replace(':', '_')
-            hour_time = hour_time.replace(':', '_')
-            
-            file_path = Path(ticker_dir) / date_str / f'{date_str}_{hour_time}_{utc_value}_{self.options_ticker}.csv'
-            
-            print(f"Saving to path: {file_path}")
-            
-            if file_path.exists():
-                file_path.unlink()  
-                
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            df_filtered.to_csv(file_path)
-            print(f"Data saved successfully to {file_path}")
+        stem = SnapshotStore.snapshot_stem(date_str, hour_time, utc_value, options_ticker)
         
-        else:
-            return df_filtered
+        file_path = SnapshotStore().snapshot_path(provider, options_ticker, date_str, stem)
+        
+        print(f"Saving to path: {file_path}")
+        
+        # Path of the previous snapshot if the chain is unchanged (alias)
+        file_path = SnapshotStore().write_snapshot(df_filtered, file_path)
+        print(f"Data saved successfully to {file_path}")
+
+        return file_path
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+# <root><YYMMDD><C|P><strike x 1000 on 8 digits>, the root has a variable length
+OCC_TAIL_LENGTH = 15
+
+ZERO = ord('0')
+CALL = ord('C')
+PUT = ord('P')
+
+
+def decode_occ_symbols(symbols):
+    """
+    Vectorized decoding of OCC-style contract symbols (e.g. NDXP250212C18200000, _NDX250221P18000000).
+    The fixed-width tail is read on a NumPy byte matrix aligned on each symbol's end.
+    Returns a DataFrame: underlying_symbol, expiration (datetime64[D]), option_type ('call' / 'put'), strike.
+    The root is returned without the '_' index prefix and the trailing digits of adjusted series.
+    Malformed symbols give NaT / None / NaN.
+    """
+    encoded = np.asarray(symbols)
+
+    if encoded.dtype.kind != 'S':
+        try:
+            encoded = encoded.astype('U').astype('S')
+        except UnicodeEncodeError:
+            encoded = np.array([str(value).encode('ascii', 'replace') for value in encoded], dtype=bytes)
+
+    n = len(encoded)
+    width = max(encoded.dtype.itemsize, OCC_TAIL_LENGTH)
+    encoded = encoded.astype(f'S{width}')
+
+    matrix = encoded.view(np.uint8).reshape(n, width)
+    lengths = np.char.str_len(encoded)
+
+    valid = lengths > OCC_TAIL_LENGTH
+    tail_start = np.where(valid, lengths - OCC_TAIL_LENGTH, 0)
+
+    tail = matrix[np.arange(n)[:, None], tail_start[:, None] + np.arange(OCC_TAIL_LENGTH)]
+
+    digits = tail.astype(np.int64) - ZERO
+    digit_columns = np.r_[0:6, 7:15]
+    valid &= ((digits[:, digit_columns] >= 0) & (digits[:, digit_columns] <= 9)).all(axis=1)
+
+    flag = tail[:, 6]
+    valid &= (flag == CALL) | (flag == PUT)
+
+    # Expiration
+    year = 2000 + digits[:, 0] * 10 + digits[:, 1]
+    month = digits[:, 2] * 10 + digits[:, 3]
+    day = digits[:, 4] * 10 + digits[:, 5]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    expiration = months.astype('datetime64[D]') + np.where(valid, day - 1, 0).astype('timedelta64[D]')
+    expiration[~valid] = np.datetime64('NaT')
+
+    # Strike (same arithmetic as the former regex decoder, strike * (1 / 1000))
+    strike = (digits[:, 7:15] @ (10 ** np.arange(7, -1, -1))).astype(np.float64) * (1 / 1000)
+    strike[~valid] = np.nan
+
+    option_type = np.where(flag == CALL, 'call', 'put').astype(object)
+    option_type[~valid] = None
+
+    # Root: bytes before the tail, cleaned once per distinct root
+    root_matrix = np.where(np.arange(width) < tail_start[:, None], matrix, 0).astype(np.uint8)
+    roots = np.ascontiguousarray(root_matrix).view(f'S{width}').ravel()
+
+    unique_roots, inverse = np.unique(roots, return_inverse=True)
+    clean_roots = np.array([root.decode('ascii').lstrip('_').rstrip('0123456789') for root in unique_roots], dtype=object)
+
+    underlying_symbol = clean_roots[inverse.ravel()]
+    underlying_symbol[~valid] = None
+
+    return pd.DataFrame({
+        'underlying_symbol': underlying_symbol,
+        'expiration': expiration,
+        'option_type': option_type,
+        'strike': strike,
+    })
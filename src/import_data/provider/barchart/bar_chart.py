@@ -1,2 +1,452 @@
-#ticker to import : GC, SQ (SOFR), ZN (10Years), ZB (30Y US T-Bonds)
+import re
+import json
+import time
+import shutil
+import argparse
+import multiprocessing
 
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.compute as pc
+import pytz
+
+from src.config.constant import BARCHART_TZ, BARCHART_INGEST_WORKERS, BARCHART_INDEX_TICKERS, BARCHART_FUTURES_ROOTS
+from system.file_paths import get_data_dir_drop, get_data_dir_imported
+from src.import_data.import_data import OptionsDataFetcher
+
+
+PROVIDER = 'Barchart'
+
+# Barchart export header (lower case) -> chain column, the other columns are not decoded
+BARCHART_COLUMN_MAP = {
+    'symbol': 'barchart_symbol',
+    'price~': 'underlying_price',
+    'underlying price': 'underlying_price',
+    'exp date': 'expiration',
+    'expiration': 'expiration',
+    'expiration date': 'expiration',
+    'type': 'option_type',
+    'option type': 'option_type',
+    'strike': 'strike',
+    'strike price': 'strike',
+    'bid': 'bid',
+    'bid size': 'bid_size',
+    'ask': 'ask',
+    'ask size': 'ask_size',
+    'last': 'last_trade_price',
+    'last price': 'last_trade_price',
+    'change': 'change',
+    '%change': 'change_percent',
+    '% change': 'change_percent',
+    'open': 'open',
+    'high': 'high',
+    'low': 'low',
+    'prev close': 'prev_close',
+    'volume': 'volume',
+    'open int': 'open_interest',
+    'open interest': 'open_interest',
+    'iv': 'implied_volatility',
+    'imp vol': 'implied_volatility',
+    'theoretical': 'theoretical_price',
+    'theo': 'theoretical_price',
+    'delta': 'delta',
+    'gamma': 'gamma',
+    'theta': 'theta',
+    'vega': 'vega',
+    'rho': 'rho',
+    'last trade': 'last_trade_time',
+    'time': 'last_trade_time',
+}
+
+STRING_COLUMNS = ['barchart_symbol', 'expiration', 'option_type', 'last_trade_time']
+PERCENT_COLUMNS = ['implied_volatility', 'change_percent']
+
+# "1,234", "+0.50", "23.45%" -> number, "N/A", "unch" -> null
+NUMBER_CLEANUP = r'[,%+\s]'
+NUMBER_PATTERN = r'^-?(\d+\.?\d*|\.\d+)$'
+
+# spx-options-exp-2025-02-21-monthly-show-all-stacked-02-14-2025.csv
+FILE_NAME_PATTERN = re.compile(
+    r'^[$^]?(?P<symbol>[a-z0-9._]+?)-options(?:-exp-(?P<expiration>\d{4}-\d{2}-\d{2}))?.*?(?:-(?P<date>\d{2}-\d{2}-\d{4}))?$',
+    re.IGNORECASE
+)
+# "Downloaded from Barchart.com as of 02-14-2025 04:15pm CST"
+FOOTER_PATTERN = re.compile(r'as of (?P<date>\d{2}-\d{2}-\d{4})(?: (?P<time>\d{1,2}:\d{2}[ap]m))?', re.IGNORECASE)
+FOOTER_SIZE = 512
+
+# ESH25: root + month code + year
+FUTURES_SYMBOL_PATTERN = re.compile(r'^(?P<root>[A-Z]{1,3}?)(?:[FGHJKMNQUVXZ]\d{1,2})?$')
+
+
+###############################################################
+### Parsing (runs in the worker processes)
+###############################################################
+
+def read_export_info(file_path):
+    """
+    Symbol, expiration (if one per file) and export time (aware datetime) of a Barchart export,
+    from the file name and the "Downloaded from Barchart.com as of ..." footer (file time if none).
+    """
+    file_path = Path(file_path)
+    match = FILE_NAME_PATTERN.match(file_path.stem)
+
+    with open(file_path, 'rb') as f:
+        f.seek(max(file_path.stat().st_size - FOOTER_SIZE, 0))
+        footer = FOOTER_PATTERN.search(f.read().decode('utf-8', 'replace'))
+
+    market_tz = pytz.timezone(BARCHART_TZ)
+
+    if footer:
+        as_of = market_tz.localize(datetime.strptime(f"{footer['date']} {footer['time'] or '11:59pm'}", '%m-%d-%Y %I:%M%p'))
+    elif match and match['date']:
+        as_of = market_tz.localize(datetime.strptime(f"{match['date']} 23:59", '%m-%d-%Y %H:%M'))
+    else:
+        as_of = datetime.fromtimestamp(file_path.stat().st_mtime, pytz.utc)
+
+    return {
+        'symbol': match['symbol'].upper() if match else None,
+        'expiration': match['expiration'] if match else None,
+        'as_of': as_of,
+    }
+
+
+def read_export_table(file_path):
+    """
+    Mapped columns of an export as strings, read with the Arrow CSV reader (footer rows skipped).
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        header = f.readline()
+
+    mapped = {}
+    for name in header.rstrip('\r\n').split(','):
+        name = name.strip().strip('"')
+        column = BARCHART_COLUMN_MAP.get(name.lower())
+        if column and column not in mapped.values():
+            mapped[name] = column
+
+    table = pv.read_csv(
+        file_path,
+        parse_options=pv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+        convert_options=pv.ConvertOptions(
+            include_columns=list(mapped),
+            column_types={name: pa.string() for name in mapped},
+            strings_can_be_null=True,
+        ),
+    )
+
+    return table.rename_columns([mapped[name] for name in table.column_names])
+
+
+def to_numbers(column):
+
+    column = pc.replace_substring_regex(column, NUMBER_CLEANUP, '')
+    column = pc.if_else(pc.match_substring_regex(column, NUMBER_PATTERN), column, pa.scalar(None, pa.string()))
+
+    return pc.cast(column, pa.float64())
+
+
+def trade_times(values, as_of):
+    """
+    'MM/DD/YY' dates, or 'HH:MM ET' times of the export day.
+    """
+    values = values.str.replace(r'\s*[A-Za-z]{1,3}$', '', regex=True)
+    time_only = values.str.match(r'^\d{1,2}:\d{2}').fillna(False)
+
+    values = values.where(~time_only, as_of.strftime('%Y-%m-%d ') + values)
+
+    return pd.to_datetime(values, errors='coerce', format='mixed')
+
+
+def yfinance_ticker(symbol):
+    """
+    yFinance ticker of the underlying of a Barchart option symbol: ^ index (SPX, SPXW -> ^SPX),
+    continuous future (ES, ESH25 -> ES=F), else the symbol itself (stocks, ETFs).
+    """
+    if symbol in BARCHART_INDEX_TICKERS:
+        return BARCHART_INDEX_TICKERS[symbol]
+
+    match = FUTURES_SYMBOL_PATTERN.match(symbol)
+
+    if match and match['root'] in BARCHART_FUTURES_ROOTS:
+        return f"{match['root']}=F"
+
+    return symbol
+
+
+def implied_spot(df):
+    """
+    Underlying price from put-call parity (K + C - P) at the strike where call and put mids are
+    the closest, on the nearest expiration. Used when the export has no underlying price.
+    """
+    mid = ((df['bid'] + df['ask']) / 2).where((df['bid'] > 0) & (df['ask'] > 0), df['last_trade_price'])
+
+    pivot = pd.DataFrame({
+        'expiration': df['expiration'], 'strike': df['strike'], 'option_type': df['option_type'], 'mid': mid
+    }).pivot_table(index=['expiration', 'strike'], columns='option_type', values='mid')
+
+    if 'call' not in pivot.columns or 'put' not in pivot.columns:
+        return np.nan
+
+    pivot = pivot.dropna(subset=['call', 'put'])
+    if pivot.empty:
+        return np.nan
+
+    nearest = pivot.loc[pivot.index.get_level_values('expiration') == pivot.index.get_level_values('expiration').min()]
+    expiration, strike = (nearest['call'] - nearest['put']).abs().idxmin()
+
+    return float(strike + nearest.loc[(expiration, strike), 'call'] - nearest.loc[(expiration, strike), 'put'])
+
+
+def normalize_export(table, info):
+    """
+    Export table -> chain DataFrame (CBOE column names, OCC contract symbols).
+    """
+    columns = {}
+    for name in table.column_names:
+
+        column = table.column(name)
+
+        if name not in STRING_COLUMNS:
+            column = to_numbers(column)
+            if name in PERCENT_COLUMNS:
+                column = pc.divide(column, 100.0)
+
+        columns[name] = column
+
+    df = pa.table(columns).to_pandas()
+
+    # AAPL|20250221|230.00C when the export has no expiration / type / strike columns
+    if 'barchart_symbol' in df.columns:
+        parts = df['barchart_symbol'].str.extract(r'^(?P<root>[^|]+)\|(?P<date>\d{8})\|(?P<strike>[\d.]+)(?P<type>[CP])$')
+        if 'expiration' not in df.columns:
+            df['expiration'] = parts['date']
+        if 'strike' not in df.columns:
+            df['strike'] = pd.to_numeric(parts['strike'], errors='coerce')
+        if 'option_type' not in df.columns:
+            df['option_type'] = parts['type']
+
+    if 'expiration' not in df.columns:
+        df['expiration'] = info['expiration']
+
+    df['expiration'] = pd.to_datetime(df['expiration'], errors='coerce', format='mixed').dt.normalize()
+    df['option_type'] = df['option_type'].str.strip().str.lower().str[0].map({'c': 'call', 'p': 'put'})
+    df['underlying_symbol'] = info['symbol']
+
+    if 'last_trade_time' in df.columns:
+        df['last_trade_time'] = trade_times(df['last_trade_time'], info['as_of'])
+
+    for column in ('bid', 'ask', 'last_trade_price'):
+        if column not in df.columns:
+            df[column] = np.nan
+
+    valid = df['expiration'].notna() & df['option_type'].notna() & (df['strike'] > 0)
+    df = df.loc[valid].reset_index(drop=True)
+
+    df['contract_symbol'] = (
+        info['symbol']
+        + df['expiration'].dt.strftime('%y%m%d')
+        + df['option_type'].str[0].str.upper()
+        + (df['strike'] * 1000).round().astype('int64').astype(str).str.zfill(8)
+    )
+    df['expiration'] = df['expiration'].dt.strftime('%Y-%m-%d')
+
+    return df.drop(columns=['barchart_symbol'], errors='ignore')
+
+
+def parse_file(file_path):
+    """
+    One export -> (file_path, symbol, export time, chain DataFrame, error).
+    """
+    try:
+        info = read_export_info(file_path)
+
+        if not info['symbol']:
+            raise ValueError("symbol not found in the file name (<symbol>-options-...csv)")
+
+        df = normalize_export(read_export_table(file_path), info)
+
+        if df.empty:
+            raise ValueError("no option row")
+
+        return str(file_path), info['symbol'], info['as_of'], df, None
+
+    except Exception as e:
+        return str(file_path), None, None, None, f"{type(e).__name__}: {e}"
+
+
+###############################################################
+###############################################################
+### Class -> Barchart bulk file ingestion
+###############################################################
+###############################################################
+
+class BarchartImporter:
+    """
+    Ingests Barchart options-chain CSV exports (one or many expirations per file) given as paths,
+    or everything dropped in data/drop/Barchart. Files are parsed in a process pool, the files
+    of a same symbol and export day are merged into one snapshot, written like the CBOE ones.
+    Ingested drop-folder files are moved to processed/ (failed/ if they can't be read).
+    """
+    def __init__(self, drop_dir=None, workers=BARCHART_INGEST_WORKERS, archive=True):
+
+        self.drop_dir = Path(drop_dir) if drop_dir else get_data_dir_drop() / PROVIDER
+        self.workers = workers
+        self.archive = archive
+
+    def find_files(self, paths=None):
+
+        paths = [self.drop_dir] if not paths else [Path(path) for path in paths]
+
+        files = []
+        for path in paths:
+            if path.is_dir():
+                files.extend(sorted(path.glob('*.csv')))
+            elif path.suffix.lower() == '.csv' and path.exists():
+                files.append(path)
+
+        return list(dict.fromkeys(files))
+
+    def parse_files(self, files):
+
+        if len(files) <= 1 or self.workers <= 1:
+            return [parse_file(file_path) for file_path in files]
+
+        # Spawned, not forked: ingest runs from Dash callbacks and a forked child could inherit held locks
+        context = multiprocessing.get_context('spawn')
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(files)), mp_context=context) as executor:
+            return list(executor.map(parse_file, files, chunksize=max(len(files) // (4 * self.workers), 1)))
+
+    @staticmethod
+    def write_info(symbol):
+        """
+        Default <symbol>_info.json (USD, direct quote, lot of 100) for a symbol imported from Barchart only.
+        The underlying ticker is the yFinance one (yfinance_ticker), an info file written with the raw
+        option root by an earlier import is corrected.
+        """
+        info_path = Path(get_data_dir_imported()) / PROVIDER / symbol / f'{symbol}_info.json'
+        underlying_ticker = yfinance_ticker(symbol)
+
+        if info_path.exists():
+
+            with open(info_path, 'r', encoding='utf-8') as f:
+                dict_info = json.load(f)
+
+            if dict_info.get('provider') != PROVIDER or dict_info.get('underlying_ticker') != symbol or underlying_ticker == symbol:
+                return
+
+            dict_info['underlying_ticker'] = underlying_ticker
+
+        else:
+            dict_info = {
+                'provider': PROVIDER,
+                'market_place': PROVIDER,
+                'option_ticker': symbol,
+                'underlying_ticker': underlying_ticker,
+                'change': 'USD',
+                'quotation_type': 'direct_quote',
+                'quotation_type_value': '1',
+                'lot_size': '100',
+            }
+
+        info_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(info_path, 'w', encoding='utf-8') as f:
+            json.dump(dict_info, f, ensure_ascii=False, indent=4)
+
+    def move(self, file_path, folder):
+
+        file_path = Path(file_path)
+
+        if not self.archive or file_path.parent.resolve() != self.drop_dir.resolve():
+            return
+
+        (self.drop_dir / folder).mkdir(parents=True, exist_ok=True)
+        shutil.move(str(file_path), str(self.drop_dir / folder / file_path.name))
+
+    def ingest(self, paths=None):
+        """
+        Returns a report: {'imported': {symbol: [file_path]}, 'failed': {file name: error},
+        'files', 'rows', 'elapsed_s', 'files_per_s', 'rows_per_s'}
+        """
+        start = time.perf_counter()
+
+        files = self.find_files(paths)
+        results = self.parse_files(files)
+
+        failed = {}
+        chains = {}
+
+        for file_path, symbol, as_of, df, error in results:
+
+            if error:
+                print(f"Barchart: skipped {Path(file_path).name} ({error})")
+                failed[Path(file_path).name] = error
+                self.move(file_path, 'failed')
+                continue
+
+            chains.setdefault((symbol, as_of.date()), []).append((as_of, file_path, df))
+
+        imported = {}
+        rows = 0
+
+        class_OptionsDataFetcher = OptionsDataFetcher()
+
+        for (symbol, _), parts in sorted(chains.items()):
+
+            # Latest export last, its rows are kept for contracts found in several files
+            parts.sort(key=lambda part: part[0])
+            df = pd.concat([part[2] for part in parts], ignore_index=True)
+
+            if 'underlying_price' not in df.columns or df['underlying_price'].isna().all():
+                df['underlying_price'] = implied_spot(df)
+
+            try:
+                self.write_info(symbol)
+                file_path = class_OptionsDataFetcher.save_snapshot(PROVIDER, symbol, df, parts[-1][0])
+
+            except Exception as e:
+                print(f"Barchart: {symbol} not saved ({e})")
+                for part in parts:
+                    failed[Path(part[1]).name] = str(e)
+                continue
+
+            imported.setdefault(symbol, []).append(file_path)
+            rows += len(df)
+
+            for part in parts:
+                self.move(part[1], 'processed')
+
+        elapsed = time.perf_counter() - start
+
+        report = {
+            'imported': imported,
+            'failed': failed,
+            'files': len(files),
+            'rows': rows,
+            'elapsed_s': round(elapsed, 2),
+            'files_per_s': round(len(files) / elapsed, 1) if elapsed > 0 else 0.0,
+            'rows_per_s': round(rows / elapsed) if elapsed > 0 else 0,
+        }
+
+        print(f"Barchart: {len(files)} file(s), {rows} contract(s) in {report['elapsed_s']}s "
+              f"({report['files_per_s']} files/s, {report['rows_per_s']} contracts/s)")
+
+        return report
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Ingest Barchart options-chain CSV exports.')
+    parser.add_argument('paths', nargs='*', help='CSV files or folders (default: data/drop/Barchart).')
+    parser.add_argument('--workers', type=int, default=BARCHART_INGEST_WORKERS, help='Files parsed in parallel.')
+    parser.add_argument('--keep', action='store_true', help="Don't move the drop-folder files to processed/ and failed/.")
+    args = parser.parse_args()
+
+    BarchartImporter(workers=args.workers, archive=not args.keep).ingest(args.paths or None)
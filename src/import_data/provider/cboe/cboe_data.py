@@ -1,10 +1,16 @@
+import numpy as np
 import pandas as pd
-import requests
+import json
 from io import BytesIO
 import asyncio
 
 from datetime import datetime
 
+from src.config.constant import CBOE_DIRECTORY_TTL_H, HTTP_TIMEOUT_S
+from src.import_data.http_cache import HttpCache, get_session
+from src.import_data.provider.cboe.cboe_stream import CboeQuotesParser, STREAM_CHUNK_SIZE
+from src.import_data.occ_symbol import decode_occ_symbols
+
 """
 The source code below has been taken from the open source library openbb and adapted to the needs of this program.
 """
@@ -13,6 +19,7 @@ The source code below has been taken from the open source library openbb and ada
 
 CBOE_COMPANY_URL = "https://www.cboe.com/us/options/symboldir/equity_index_options/?download=csv"
 CBOE_INDEX_URL = "https://cdn.cboe.com/api/global/us_indices/definitions/all_indices.json"
+CBOE_QUOTES_URL = "https://cdn.cboe.com/api/global/delayed_quotes/options/{symbol}.json"
 
 TICKER_EXCEPTIONS = ["NDX", "RUT"]
 
@@ -28,6 +35,7 @@ COLUMNS_ORDER = [
         'volume',
         'theoretical_price',
         'last_trade_price',
+        'last_trade_time',
         'tick',
         'bid',
         'bid_size',
@@ -48,16 +56,18 @@ COLUMNS_ORDER = [
         ]
 
 class GetCboeData:
-    def __init__(self):
-        pass
+    def __init__(self, company_url=CBOE_COMPANY_URL, index_url=CBOE_INDEX_URL):
+
+        self.http_cache = HttpCache()
+        self.company_url = company_url
+        self.index_url = index_url
 
     async def get_company_directory(self) -> pd.DataFrame:
-        
-        response = requests.get(CBOE_COMPANY_URL)
-        if response.status_code != 200:
-            raise Exception()
 
-        directory = pd.read_csv(BytesIO(response.content))
+        # HttpCache is blocking (requests), run outside the event loop
+        content = await asyncio.to_thread(self.http_cache.get, self.company_url, ttl=CBOE_DIRECTORY_TTL_H * 3600)
+
+        directory = pd.read_csv(BytesIO(content))
 
         directory = directory.rename(
             columns={
@@ -75,11 +85,10 @@ class GetCboeData:
 
     async def get_index_directory(self) -> pd.DataFrame:
 
-        response = requests.get(CBOE_INDEX_URL)
-        if response.status_code != 200:
-            raise Exception(f"CBOE error: {response.status_code}")
+        # HttpCache is blocking (requests), run outside the event loop
+        content = await asyncio.to_thread(self.http_cache.get, self.index_url, ttl=CBOE_DIRECTORY_TTL_H * 3600)
 
-        results = response.json()
+        results = json.loads(content)
 
         for result in results:
             for key in ["featured", "featured_order", "display"]:
@@ -92,26 +101,55 @@ class GetCboeData:
         return results.set_index("index_symbol")
 
 
+    @staticmethod
+    def quotes_url(selected_symbol, indexes, listed_symbols, base_url=CBOE_QUOTES_URL):
+        """
+        Delayed quotes URL of a symbol (indexes are prefixed with '_'), None if it isn't listed.
+        """
+        if selected_symbol not in listed_symbols.index:
+            print(f"{selected_symbol} not found in CBOE symbols directory")
+            return None
+
+        if selected_symbol in indexes.index or selected_symbol in TICKER_EXCEPTIONS:
+            return base_url.format(symbol=f"_{selected_symbol}")
+
+        return base_url.format(symbol=selected_symbol)
+
     async def cboe_request(self, selected_symbol: str):
 
         
         indexes = await self.get_index_directory()
         listed_symbols = await self.get_company_directory()
 
-        if selected_symbol not in listed_symbols.index:
-            print(f"{selected_symbol} not found in CBOE symbols directory")
+        quotes_url = self.quotes_url(selected_symbol, indexes, listed_symbols)
+
+        if quotes_url is None:
             return None
 
-        quotes_url = (
-            f"https://cdn.cboe.com/api/global/delayed_quotes/options/_{selected_symbol}.json"
-            if selected_symbol in indexes.index or selected_symbol in TICKER_EXCEPTIONS
-            else f"https://cdn.cboe.com/api/global/delayed_quotes/options/{selected_symbol}.json"
-        )
+        response = get_session().get(quotes_url, timeout=HTTP_TIMEOUT_S)
 
-        response = requests.get(quotes_url) 
-        
         return response.json()
 
+    async def cboe_request_stream(self, selected_symbol: str):
+        """
+        Same request as cboe_request, the payload is parsed while it downloads (CboeQuotesParser).
+        """
+        indexes = await self.get_index_directory()
+        listed_symbols = await self.get_company_directory()
+
+        quotes_url = self.quotes_url(selected_symbol, indexes, listed_symbols)
+
+        if quotes_url is None:
+            return None
+
+        with get_session().get(quotes_url, timeout=HTTP_TIMEOUT_S, stream=True) as response:
+            response.raise_for_status()
+
+            return CboeQuotesParser.parse_chunks(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                expected_size=response.headers.get('Content-Length')
+            )
+
 
 async def run_cboe_data_process(options_ticker):
     cboe_data = GetCboeData()
@@ -121,12 +159,22 @@ async def run_cboe_data_process(options_ticker):
 
 def transform_data(data):
    
-    from pandas import DataFrame, DatetimeIndex, Series, to_datetime
-    from datetime import datetime
+    from pandas import DataFrame
 
     options = data.get("data", {}).pop("options", [])
     
     options_df = DataFrame.from_records(options)
+
+    return transform_options(options_df, data.get("data", {}).get("current_price"))
+
+
+def transform_options(options_df, current_price=None):
+    """
+    Options records (CBOE field names) -> chain DataFrame in COLUMNS_ORDER, plus the import time.
+    """
+    from pandas import DatetimeIndex, to_datetime
+    from datetime import datetime
+
     options_df = options_df.rename(
         columns={
             "option": "contract_symbol",
@@ -137,38 +185,15 @@ def transform_data(data):
         }
     )
     
-    option_df_index = options_df["contract_symbol"].str.extractall(
-        r"^(?P<Ticker>\D*)(?P<expiration>\d*)(?P<option_type>\D*)(?P<strike>\d*)"
-    )
-    option_df_index = option_df_index.reset_index().drop(
-        columns=["match", "level_0"]
-    )
-    
-    option_df_index.option_type = option_df_index.option_type.str.replace(
-        "C", "call"
-    ).str.replace("P", "put")
-    
-    option_df_index.strike = [ele.lstrip("0") for ele in option_df_index.strike]
-    option_df_index.strike = Series(option_df_index.strike).astype(float)
-    option_df_index.strike = option_df_index.strike * (1 / 1000)
-    option_df_index.strike = option_df_index.strike.to_list()
-    
-    option_df_index.expiration = [
-        ele.lstrip("1") for ele in option_df_index.expiration
-    ]
-    option_df_index.expiration = DatetimeIndex(
-        option_df_index.expiration, yearfirst=True
-    ).astype(str)
-    
-    option_df_index = option_df_index.rename(
-        columns={"Ticker": "underlying_symbol"}
-    )
+    option_df_index = decode_occ_symbols(options_df["contract_symbol"].to_numpy())
+
+    expiration_dates = DatetimeIndex(option_df_index.expiration)
+    option_df_index.expiration = np.datetime_as_string(option_df_index.expiration.to_numpy(), unit='D').astype(object)
     
     quotes = option_df_index.join(options_df)
     
     now = datetime.now()
-    temp = DatetimeIndex(quotes.expiration)
-    temp_ = (temp - now).days + 1
+    temp_ = (expiration_dates - now).days + 1
     quotes["dte"] = temp_
     
     quotes["last_trade_time"] = (
@@ -181,8 +206,8 @@ def transform_data(data):
         keys=["expiration", "strike", "option_type"]
     ).sort_index()
     
-    if data.get("data", {}).get("current_price"):
-        quotes["underlying_price"] = data["data"]["current_price"]
+    if current_price:
+        quotes["underlying_price"] = current_price
     
     quotes["open_interest"] = quotes["open_interest"].astype("int64")
     quotes["volume"] = quotes["volume"].astype("int64")
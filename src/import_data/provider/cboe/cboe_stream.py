@@ -0,0 +1,199 @@
+import json
+import codecs
+
+import numpy as np
+import pandas as pd
+
+
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Bytes per contract in the delayed-quotes JSON, used to pre-size the columns from Content-Length
+RECORD_SIZE_HINT = 400
+
+FLOAT_FIELDS = [
+    'bid', 'ask', 'iv', 'delta', 'gamma', 'theta', 'vega', 'rho', 'theo', 'change',
+    'open', 'high', 'low', 'last_trade_price', 'percent_change', 'prev_day_close',
+]
+INT_FIELDS = ['bid_size', 'ask_size', 'open_interest', 'volume']
+STR_FIELDS = ['option', 'tick', 'last_trade_time']
+
+WHITESPACE = ' \t\n\r,'
+
+
+###############################################################
+###############################################################
+### Class -> Incremental parser of the CBOE delayed-quotes JSON
+###############################################################
+###############################################################
+
+class CboeQuotesParser:
+    """
+    Feeds the quotes JSON chunk by chunk: each contract of data.options is decoded on its own
+    and written into pre-allocated column arrays, so the raw payload and the list of record dicts
+    are never held in memory. The rest of the payload (current_price, ...) ends up in self.meta.
+    """
+    def __init__(self, expected_size=None):
+
+        capacity = max(int(expected_size or 0) // RECORD_SIZE_HINT, 1024)
+
+        self.size = 0
+        self.floats = {field: np.empty(capacity, dtype=np.float64) for field in FLOAT_FIELDS}
+        self.ints = {field: np.empty(capacity, dtype=np.int64) for field in INT_FIELDS}
+        self.strings = {field: [] for field in STR_FIELDS}
+
+        self.meta = None
+        self.state = 'head'
+        self.head = ''
+        self.tail = []
+        self.buffer = ''
+
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+
+    def _grow(self):
+
+        capacity = 2 * len(self.floats[FLOAT_FIELDS[0]])
+
+        for columns in (self.floats, self.ints):
+            for field, array in columns.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                columns[field] = grown
+
+    def _append(self, record):
+
+        if self.size == len(self.floats[FLOAT_FIELDS[0]]):
+            self._grow()
+
+        i = self.size
+
+        for field in FLOAT_FIELDS:
+            value = record.get(field)
+            self.floats[field][i] = np.nan if value is None else value
+
+        for field in INT_FIELDS:
+            self.ints[field][i] = record.get(field) or 0
+
+        for field in STR_FIELDS:
+            self.strings[field].append(record.get(field))
+
+        self.size += 1
+
+    def _parse_head(self):
+
+        key = self.buffer.find('"options"')
+        if key < 0:
+            # Keep the end in case the key is split between two chunks
+            cut = max(len(self.buffer) - 16, 0)
+            self.head += self.buffer[:cut]
+            self.buffer = self.buffer[cut:]
+            return False
+
+        start = self.buffer.find('[', key)
+        if start < 0:
+            return False
+
+        self.head += self.buffer[:start]
+        self.buffer = self.buffer[start + 1:]
+        self.state = 'array'
+
+        return True
+
+    def _parse_array(self):
+
+        buffer = self.buffer
+        pos = 0
+        length = len(buffer)
+
+        while True:
+
+            while pos < length and buffer[pos] in WHITESPACE:
+                pos += 1
+
+            if pos >= length:
+                break
+
+            if buffer[pos] == ']':
+                self.state = 'tail'
+                self.tail.append(buffer[pos + 1:])
+                self.buffer = ''
+                return
+
+            try:
+                record, pos = self.json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Contract cut by the chunk boundary, completed by the next feed
+                break
+
+            self._append(record)
+
+        self.buffer = buffer[pos:]
+
+    def feed(self, chunk):
+
+        text = self.text_decoder.decode(chunk)
+
+        if self.state == 'tail':
+            self.tail.append(text)
+            return
+
+        self.buffer += text
+
+        if self.state == 'head' and not self._parse_head():
+            return
+
+        self._parse_array()
+
+    def close(self):
+        """
+        End of the payload: parses the non-options part into self.meta.
+        """
+        self.buffer += self.text_decoder.decode(b'', final=True)
+
+        if self.state == 'array':
+            self._parse_array()
+
+        if self.state == 'head':
+            self.meta = json.loads(self.head + self.buffer)
+        elif self.state == 'tail':
+            self.meta = json.loads(self.head + '[]' + ''.join(self.tail))
+        else:
+            raise ValueError("Truncated CBOE quotes payload (options array not closed)")
+
+        self.tail = []
+
+        return self.meta
+
+    def to_frame(self):
+        """
+        Options as a DataFrame with the CBOE field names (input of transform_options).
+        """
+        columns = {}
+
+        for field in STR_FIELDS[:1]:
+            columns[field] = self.strings[field]
+        for field in FLOAT_FIELDS:
+            columns[field] = self.floats[field][:self.size]
+        for field in INT_FIELDS:
+            columns[field] = self.ints[field][:self.size]
+        for field in STR_FIELDS[1:]:
+            columns[field] = self.strings[field]
+
+        return pd.DataFrame(columns, copy=False)
+
+    @property
+    def current_price(self):
+
+        return ((self.meta or {}).get('data') or {}).get('current_price')
+
+    @classmethod
+    def parse_chunks(cls, chunks, expected_size=None):
+
+        parser = cls(expected_size)
+
+        for chunk in chunks:
+            parser.feed(chunk)
+
+        parser.close()
+
+        return parser
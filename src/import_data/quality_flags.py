@@ -0,0 +1,115 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.config.constant import QUALITY_STALE_TRADE_H, QUALITY_IV_OUTLIER_FACTOR, QUALITY_IV_NEIGHBORS
+
+
+QUALITY_COLUMN = 'quality_flags'
+
+# Bits of the quality_flags column (0 = clean row)
+ZERO_BID = 1
+CROSSED_MARKET = 2
+STALE_TRADE = 4
+IV_OUTLIER = 8
+ZERO_OI = 16
+
+# Usual selections
+QUOTE_FLAGS = ZERO_BID | CROSSED_MARKET
+IV_FLAGS = IV_OUTLIER
+ALL_FLAGS = ZERO_BID | CROSSED_MARKET | STALE_TRADE | IV_OUTLIER | ZERO_OI
+
+# Columns needed to compute the flags
+QUALITY_INPUT_COLUMNS = ['expiration', 'strike', 'option_type', 'bid', 'ask', 'last_trade_price', 'implied_volatility', 'open_interest']
+
+# Used for STALE_TRADE when available (stored since chain schema version 3)
+QUALITY_TIME_COLUMN = 'last_trade_time'
+
+
+def neighbor_iv_median(iv, expiration, option_type, strike, neighbors=QUALITY_IV_NEIGHBORS):
+    """
+    Median IV of the `neighbors` strikes on each side, same expiration and option type.
+    Non-positive IVs are not used as neighbors.
+    """
+    n = len(iv)
+    order = np.lexsort((strike, option_type, expiration))
+
+    sorted_iv = np.where(iv[order] > 0, iv[order], np.nan)
+    group = np.r_[0, np.cumsum((expiration[order][1:] != expiration[order][:-1]) | (option_type[order][1:] != option_type[order][:-1]))]
+
+    shifted = np.full((2 * neighbors, n), np.nan)
+    for row, offset in enumerate([k for k in range(-neighbors, neighbors + 1) if k != 0]):
+
+        source = np.arange(n) + offset
+        inside = (source >= 0) & (source < n)
+        inside[inside] &= group[source[inside]] == group[inside]
+
+        shifted[row, inside] = sorted_iv[source[inside]]
+
+    # All-NaN slices (isolated strikes) give NaN, no outlier test for them
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        sorted_median = np.nanmedian(shifted, axis=0)
+
+    median = np.empty(n)
+    median[order] = sorted_median
+
+    return median
+
+
+def quality_flags(df):
+    """
+    quality_flags bitmask of a chain, computed in one vectorized pass:
+    ZERO_BID, CROSSED_MARKET (bid above ask), STALE_TRADE (no trade, or last trade more than
+    QUALITY_STALE_TRADE_H before the chain's latest; when the chain has no trade time, e.g. version 1
+    files or providers without it, only 'no trade': last_trade_price not positive),
+    IV_OUTLIER (missing / non-positive IV, or QUALITY_IV_OUTLIER_FACTOR away from the neighbor strikes), ZERO_OI.
+    """
+    def column(name):
+        values = df[name] if name in df.columns else pd.Series(np.nan, index=df.index)
+        return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+    bid = column('bid')
+    ask = column('ask')
+    iv = column('implied_volatility')
+
+    with np.errstate(invalid='ignore'):
+
+        zero_bid = ~(bid > 0)
+        crossed = (bid > 0) & ~(ask >= bid)
+
+        trade_time = pd.to_datetime(df[QUALITY_TIME_COLUMN], errors='coerce') if QUALITY_TIME_COLUMN in df.columns else None
+
+        if trade_time is not None and trade_time.notna().any():
+            stale = (trade_time.isna() | (trade_time < trade_time.max() - pd.Timedelta(hours=QUALITY_STALE_TRADE_H))).to_numpy()
+        else:
+            stale = ~(column('last_trade_price') > 0)
+
+        median = neighbor_iv_median(
+            iv,
+            np.asarray(df['expiration'].astype(str), dtype=str),
+            np.asarray(df['option_type'].astype(str), dtype=str),
+            column('strike'),
+        )
+        iv_outlier = ~(iv > 0) | (iv > median * QUALITY_IV_OUTLIER_FACTOR) | (iv < median / QUALITY_IV_OUTLIER_FACTOR)
+
+        zero_oi = ~(column('open_interest') > 0)
+
+    return (
+        zero_bid * ZERO_BID
+        | crossed * CROSSED_MARKET
+        | stale * STALE_TRADE
+        | iv_outlier * IV_OUTLIER
+        | zero_oi * ZERO_OI
+    ).astype(np.int32)
+
+
+def clean_mask(df, flags=ALL_FLAGS):
+    """
+    Boolean mask of the rows with none of `flags` set (all True for snapshots without the column).
+    """
+    if QUALITY_COLUMN not in df.columns:
+        return np.ones(len(df), dtype=bool)
+
+    return (df[QUALITY_COLUMN].to_numpy(dtype=np.int64, na_value=0) & flags) == 0
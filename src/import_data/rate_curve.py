@@ -0,0 +1,119 @@
+import os
+import json
+import time
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from src.config.constant import MARKET_DATA_OFFLINE, RATE_CURVE_TICKERS, RATE_CURVE_TTL_H, RISK_FREE_RATE_FALLBACK
+from system.file_paths import get_data_dir_cache
+from src.import_data.bar_store import BarStore
+
+
+###############################################################
+###############################################################
+### Class -> Risk-free rate curve (Treasury yields, by DTE)
+###############################################################
+###############################################################
+
+class RateCurve:
+    """
+    Treasury yield curve at a date (RATE_CURVE_TICKERS: yFinance ticker -> tenor in days),
+    interpolated linearly per contract DTE, flat beyond the first and last tenors.
+    Curves are kept in data/cache/rates/treasury_curve.json: past dates are final,
+    the current date is refreshed after RATE_CURVE_TTL_H.
+    """
+    def __init__(self, selected_date=None, offline=MARKET_DATA_OFFLINE):
+
+        self.curve_path = get_data_dir_cache() / 'rates' / 'treasury_curve.json'
+        self.offline = offline
+
+        now = datetime.now(pytz.timezone('UTC'))
+        self.selected_date = pd.Timestamp(selected_date if selected_date is not None else now.date()).strftime('%Y-%m-%d')
+
+        self.tenors, self.rates = self.load_curve(self.selected_date)
+
+    ###############################################################
+    ### Load / Fetch
+    ###############################################################
+
+    def _read_cache(self):
+
+        try:
+            with open(self.curve_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            return {}
+
+    def _write_cache(self, cache):
+
+        self.curve_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.curve_path.with_name(f'{self.curve_path.name}.{os.getpid()}.tmp')
+
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.curve_path)
+        except OSError as e:
+            print(f"Rate curve write error: {e}")
+
+    def fetch_curve(self, date_str):
+        """
+        {tenor_days: rate in %}, last close of each Treasury ticker on or before date_str.
+        """
+        class_BarStore = BarStore(offline=self.offline)
+
+        end_date = pd.Timestamp(date_str) + pd.Timedelta(days=1)
+        start_date = end_date - pd.Timedelta(days=10)
+
+        curve = {}
+
+        for ticker, tenor in RATE_CURVE_TICKERS.items():
+
+            bars = class_BarStore.get_bars(ticker, '1d', start_date, end_date)
+
+            if not bars.empty and pd.notna(bars['Close'].iloc[-1]):
+                curve[str(tenor)] = float(bars['Close'].iloc[-1])
+
+        return curve
+
+    def load_curve(self, date_str):
+
+        cache = self._read_cache()
+        entry = cache.get(date_str)
+
+        fresh = entry is not None and (entry['expires'] is None or entry['expires'] > time.time())
+
+        if not fresh and not self.offline:
+
+            curve = self.fetch_curve(date_str)
+
+            if curve:
+                today = datetime.now(pytz.timezone('UTC')).strftime('%Y-%m-%d')
+                final = date_str < today and len(curve) == len(RATE_CURVE_TICKERS)
+
+                entry = {'curve': curve, 'expires': None if final else time.time() + RATE_CURVE_TTL_H * 3600}
+                cache[date_str] = entry
+                self._write_cache(cache)
+
+        if entry is None:
+            # Closest earlier curve, else a flat fallback rate
+            earlier = [key for key in cache if key <= date_str]
+            entry = cache[max(earlier)] if earlier else {'curve': {'0': RISK_FREE_RATE_FALLBACK}}
+
+        points = sorted((int(tenor), rate) for tenor, rate in entry['curve'].items())
+
+        return np.array([tenor for tenor, _ in points], dtype=float), np.array([rate for _, rate in points], dtype=float)
+
+    ###############################################################
+    ### Rates
+    ###############################################################
+
+    def rate(self, dte):
+        """
+        Risk-free rate (decimal) for a DTE or an array of DTE.
+        """
+        return np.interp(np.asarray(dte, dtype=float), self.tenors, self.rates) / 100
@@ -0,0 +1,299 @@
+import os
+import time
+import argparse
+import threading
+
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.config.constant import CBOE_CLOSE_UTC, PARQUET_COMPRESSION, PARQUET_ROW_GROUP_SIZE, DATASET_COMPACTION_INTERVAL_H, DATASET_INTRADAY_RETENTION_DAYS
+from system.file_paths import get_data_dir_dataset
+from src.import_data.catalog import SnapshotCatalog
+from src.import_data.snapshot_store import SnapshotStore
+from src.import_data.chain_schema import ChainSchema, CHAIN_SCHEMA, CHAIN_SCHEMA_VERSION, SCHEMA_VERSION_KEY
+
+
+SNAPSHOT_COLUMNS = ['snapshot_date', 'snapshot_hour', 'snapshot_ts']
+SNAPSHOTS_METADATA = b'snapshots'
+
+DATASET_SCHEMA = pa.schema(list(CHAIN_SCHEMA) + [
+    pa.field('snapshot_date', pa.string()),
+    pa.field('snapshot_hour', pa.string()),
+    pa.field('snapshot_ts', pa.timestamp('s')),
+])
+
+
+###############################################################
+###############################################################
+### Class -> Compacted per-symbol dataset (symbol/year/month)
+###############################################################
+###############################################################
+
+class SnapshotDataset:
+    """
+    Hive-partitioned copy of the imported snapshots: data/dataset/symbol=<symbol>/year=<y>/month=<m>/part-0.parquet
+    One file per month with snapshot_date / snapshot_hour / snapshot_ts columns, so history
+    scans are a single dataset read instead of one file per snapshot.
+    """
+    def __init__(self, retention_days=DATASET_INTRADAY_RETENTION_DAYS):
+
+        self.dataset_dir = get_data_dir_dataset()
+        self.retention_days = retention_days
+
+    def partition_path(self, symbol, year, month):
+
+        return self.dataset_dir / f'symbol={symbol}' / f'year={year}' / f'month={month}' / 'part-0.parquet'
+
+    @staticmethod
+    def partition_snapshots(partition_path):
+        """
+        (date, hour) keys stored in a partition file, none if it was written with another chain schema
+        version (then rebuilt by the next compaction, snapshots read from their files meanwhile).
+        """
+        schema = pq.read_schema(partition_path)
+
+        if ChainSchema.version(schema) != CHAIN_SCHEMA_VERSION:
+            return set()
+
+        metadata = schema.metadata or {}
+        snapshots = metadata.get(SNAPSHOTS_METADATA, b'').decode()
+
+        return {tuple(key.split(' ')) for key in snapshots.split(',') if key}
+
+    ###############################################################
+    ### Retention (intraday snapshots kept N days, then the close only)
+    ###############################################################
+
+    def retained(self, available_data, today=None):
+        """
+        available_data: {date: [hours]} -> list of kept (date, hour).
+        Older than retention_days: the close, or the last snapshot of the day if there is no close.
+        """
+        today = today or datetime.now().date()
+        limit = (today - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+
+        kept = []
+
+        for date_str, hours in available_data.items():
+
+            if self.retention_days is None or date_str >= limit or len(hours) == 1:
+                kept.extend((date_str, hour) for hour in hours)
+
+            else:
+                kept.append((date_str, 'close' if 'close' in hours else max(hours)))
+
+        return kept
+
+    ###############################################################
+    ### Compaction
+    ###############################################################
+
+    @staticmethod
+    def partition_table(table, date_str, hour):
+        """
+        Snapshot table -> DATASET_SCHEMA rows (columns missing from older chain schema versions filled with nulls).
+        """
+        timestamp = datetime.strptime(f"{date_str} {CBOE_CLOSE_UTC if hour == 'close' else hour}", '%Y-%m-%d %H_%M')
+
+        columns = [
+            table.column(field.name).cast(field.type) if field.name in table.column_names else pa.nulls(len(table), field.type)
+            for field in CHAIN_SCHEMA
+        ]
+        columns += [
+            pa.array([date_str] * len(table), pa.string()),
+            pa.array([hour] * len(table), pa.string()),
+            pa.array([timestamp] * len(table), pa.timestamp('s')),
+        ]
+
+        return pa.Table.from_arrays(columns, schema=DATASET_SCHEMA)
+
+    def compact_symbol(self, symbol, prune_imported=False):
+
+        class_SnapshotCatalog = SnapshotCatalog()
+        class_SnapshotStore = SnapshotStore()
+
+        available_data = class_SnapshotCatalog.list_snapshots(symbol)
+        kept = self.retained(available_data)
+
+        months = {}
+        for date_str, hour in kept:
+            months.setdefault((int(date_str[:4]), int(date_str[5:7])), []).append((date_str, hour))
+
+        for (year, month), keys in months.items():
+
+            partition_path = self.partition_path(symbol, year, month)
+            source_paths = [class_SnapshotCatalog.find(symbol, date_str, hour) for date_str, hour in keys]
+
+            if partition_path.exists():
+                up_to_date = (
+                    self.partition_snapshots(partition_path) == set(keys)
+                    and max(path.stat().st_mtime for path in source_paths) <= partition_path.stat().st_mtime
+                )
+                if up_to_date:
+                    continue
+
+            schema = DATASET_SCHEMA.with_metadata({
+                SNAPSHOTS_METADATA: ','.join(f'{date_str} {hour}' for date_str, hour in keys).encode(),
+                SCHEMA_VERSION_KEY: str(CHAIN_SCHEMA_VERSION).encode(),
+            })
+
+            partition_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = partition_path.with_name(f'{partition_path.name}.{os.getpid()}.tmp')
+
+            # Streamed one snapshot at a time: a month of intraday snapshots is never held in memory
+            try:
+                with pq.ParquetWriter(tmp_path, schema, compression=PARQUET_COMPRESSION) as writer:
+                    for (date_str, hour), source_path in zip(keys, source_paths):
+                        table = class_SnapshotStore.read_table(source_path)
+                        writer.write_table(self.partition_table(table, date_str, hour), row_group_size=PARQUET_ROW_GROUP_SIZE)
+
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+            os.replace(tmp_path, partition_path)
+
+            print(f"Compacted: {symbol} {year}-{month:02d} ({len(keys)} snapshot(s))")
+
+        # Months without snapshot anymore
+        for partition_path in (self.dataset_dir / f'symbol={symbol}').glob('year=*/month=*/part-0.parquet'):
+
+            year = int(partition_path.parent.parent.name.split('=')[1])
+            month = int(partition_path.parent.name.split('=')[1])
+
+            if (year, month) not in months:
+                partition_path.unlink()
+
+        if prune_imported:
+            self.prune_imported(symbol, available_data, kept)
+
+    def prune_imported(self, symbol, available_data, kept):
+        """
+        Deletes the imported snapshots dropped by the retention policy (already compacted).
+        """
+        class_SnapshotCatalog = SnapshotCatalog()
+        class_SnapshotStore = SnapshotStore()
+
+        kept = set(kept)
+
+        for date_str, hours in available_data.items():
+            for hour in hours:
+
+                if (date_str, hour) in kept:
+                    continue
+
+                # An alias only removes its .alias file, a pruned target first gives its aliases their own copy
+                file_path = class_SnapshotCatalog.find(symbol, date_str, hour, resolve_alias=False)
+
+                if file_path is None or not file_path.exists():
+                    continue
+
+                class_SnapshotStore.materialize_aliases(file_path)
+
+                if file_path.suffix == '.parquet':
+                    class_SnapshotStore.expand_dependents(file_path)
+
+                file_path.unlink()
+                class_SnapshotCatalog.unregister(file_path)
+
+                print(f"Pruned: {file_path.name}")
+
+    def compact(self, symbol=None, prune_imported=False):
+
+        symbols = [symbol] if symbol else SnapshotCatalog().list_symbols()
+
+        for symbol in symbols:
+            try:
+                self.compact_symbol(symbol, prune_imported)
+            except Exception as e:
+                print(f"Compaction error ({symbol}): {e}")
+
+    ###############################################################
+    ### Read
+    ###############################################################
+
+    def load(self, symbol, keys, columns=None, compact=True):
+        """
+        {(date, hour): DataFrame} for the keys found in an up-to-date partition.
+        Keys missing from the dataset (not compacted yet, re-imported since) are not returned.
+        """
+        class_SnapshotCatalog = SnapshotCatalog()
+
+        found = []
+        partitions = []
+
+        for year, month in sorted({(int(date_str[:4]), int(date_str[5:7])) for date_str, _ in keys}):
+
+            partition_path = self.partition_path(symbol, year, month)
+
+            if not partition_path.exists():
+                continue
+
+            contained = self.partition_snapshots(partition_path)
+            partition_mtime = partition_path.stat().st_mtime
+
+            for date_str, hour in keys:
+
+                if (date_str, hour) not in contained:
+                    continue
+
+                source_path = class_SnapshotCatalog.find(symbol, date_str, hour)
+
+                if source_path is None or not source_path.exists() or source_path.stat().st_mtime <= partition_mtime:
+                    found.append((date_str, hour))
+
+            partitions.append(str(partition_path))
+
+        if not found:
+            return {}
+
+        read_columns = list(dict.fromkeys(columns + ['snapshot_date', 'snapshot_hour'])) if columns else None
+        key_filter = pc.field('snapshot_date').isin(sorted({date_str for date_str, _ in found}))
+
+        table = ds.dataset(partitions, format='parquet').to_table(columns=read_columns, filter=key_filter)
+        df = SnapshotStore.to_dataframe(table, compact)
+
+        found = set(found)
+        history = {}
+
+        for (date_str, hour), group in df.groupby(['snapshot_date', 'snapshot_hour'], sort=False, observed=True):
+
+            if (date_str, hour) in found:
+                history[(date_str, hour)] = group.drop(columns=[col for col in SNAPSHOT_COLUMNS if col in group.columns]).reset_index(drop=True)
+
+        return history
+
+    ###############################################################
+    ### Background job
+    ###############################################################
+
+    def start_background(self, interval_h=DATASET_COMPACTION_INTERVAL_H):
+        """
+        Compacts every symbol now, then every interval_h hours (daemon thread).
+        """
+        if not interval_h:
+            return None
+
+        def run():
+            while True:
+                self.compact()
+                time.sleep(interval_h * 3600)
+
+        thread = threading.Thread(target=run, name='SnapshotCompaction', daemon=True)
+        thread.start()
+
+        return thread
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Compact imported snapshots into the per-symbol dataset.')
+    parser.add_argument('--symbol', default=None, help='Only compact this option symbol (default: all).')
+    parser.add_argument('--prune-imported', action='store_true', help='Delete imported snapshots dropped by the retention policy.')
+    args = parser.parse_args()
+
+    SnapshotDataset().compact(args.symbol, prune_imported=args.prune_imported)
@@ -0,0 +1,153 @@
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+DELTA_KEY = 'contract_symbol'
+DELTA_MASK = 'delta_mask'
+DELTA_BASE_METADATA = b'delta_base'
+DELTA_COLUMNS_METADATA = b'delta_columns'
+
+
+###############################################################
+###############################################################
+### Class -> Intraday delta snapshots
+###############################################################
+###############################################################
+
+class SnapshotDelta:
+    """
+    Later snapshots of a day stored against the first one (the base), keyed by contract_symbol.
+    A delta file has the chain columns plus delta_mask: bit i set = column i unchanged,
+    value taken from the base (stored as null). New contracts are stored in full.
+    """
+
+    ###############################################################
+    ### Metadata
+    ###############################################################
+
+    @staticmethod
+    def base_name(file_path):
+        """
+        File name of the base snapshot, None if file_path is a full snapshot.
+        """
+        file_path = Path(file_path)
+
+        if file_path.suffix != '.parquet':
+            return None
+
+        metadata = pq.read_schema(file_path).metadata or {}
+        base_name = metadata.get(DELTA_BASE_METADATA)
+
+        return base_name.decode() if base_name else None
+
+    @staticmethod
+    def is_delta(file_path):
+
+        return SnapshotDelta.base_name(file_path) is not None
+
+    def dependents(self, base_path):
+        """
+        Delta snapshots of the same directory built on base_path.
+        """
+        base_path = Path(base_path)
+
+        return [
+            file_path for file_path in sorted(base_path.parent.glob('*.parquet'))
+            if file_path != base_path and self.base_name(file_path) == base_path.name
+        ]
+
+    ###############################################################
+    ### Encode / Decode
+    ###############################################################
+
+    def encode(self, base_table, table, base_name):
+        """
+        Returns the delta Table, or None if the key is not usable (duplicated contracts).
+        """
+        base_keys = base_table.column(DELTA_KEY).combine_chunks()
+        keys = table.column(DELTA_KEY).combine_chunks()
+
+        if pc.count_distinct(base_keys).as_py() != len(base_keys) or pc.count_distinct(keys).as_py() != len(keys):
+            return None
+
+        base_index = pc.index_in(keys, value_set=base_keys)
+        matched = base_index.is_valid().to_numpy(zero_copy_only=False)
+
+        value_columns = [name for name in table.column_names if name != DELTA_KEY]
+
+        columns = {name: keys if name == DELTA_KEY else None for name in table.column_names}
+        mask = np.zeros(len(table), dtype=np.int32)
+
+        for bit, name in enumerate(value_columns):
+
+            value = table.column(name).combine_chunks()
+            base_value = base_table.column(name).combine_chunks().take(base_index)
+
+            both_null = value.is_null().to_numpy(zero_copy_only=False) & base_value.is_null().to_numpy(zero_copy_only=False)
+            same = pc.fill_null(pc.equal(value, base_value), False).to_numpy(zero_copy_only=False)
+            same = (same | both_null) & matched
+
+            columns[name] = pc.if_else(pa.array(same), pa.nulls(len(table), value.type), value)
+            mask |= same.astype(np.int32) << bit
+
+        columns[DELTA_MASK] = pa.array(mask, pa.int32())
+
+        delta_table = pa.table(columns)
+
+        return delta_table.replace_schema_metadata({
+            DELTA_BASE_METADATA: base_name.encode(),
+            DELTA_COLUMNS_METADATA: ','.join(value_columns).encode(),
+        })
+
+    def decode(self, base_table, delta_table, columns=None):
+
+        # bit order of delta_mask, kept in the metadata so partial reads can be decoded
+        value_columns = delta_table.schema.metadata[DELTA_COLUMNS_METADATA].decode().split(',')
+
+        keys = delta_table.column(DELTA_KEY).combine_chunks()
+        base_index = pc.index_in(keys, value_set=base_table.column(DELTA_KEY).combine_chunks())
+        mask = delta_table.column(DELTA_MASK).to_numpy()
+
+        names = columns if columns else [name for name in delta_table.column_names if name != DELTA_MASK]
+        arrays = []
+
+        for name in names:
+
+            if name == DELTA_KEY:
+                arrays.append(keys)
+                continue
+
+            bit = value_columns.index(name)
+            from_base = pa.array(((mask >> bit) & 1).astype(bool))
+            base_value = base_table.column(name).combine_chunks().take(base_index)
+
+            arrays.append(pc.if_else(from_base, base_value, delta_table.column(name).combine_chunks()))
+
+        return pa.table(arrays, names=names)
+
+    ###############################################################
+    ### Read
+    ###############################################################
+
+    def read_table(self, file_path, columns=None):
+        """
+        Full snapshot of file_path, rebuilt from its base if it is a delta.
+        """
+        file_path = Path(file_path)
+        base_name = self.base_name(file_path)
+
+        if base_name is None:
+            return pq.read_table(file_path, columns=columns)
+
+        read_columns = None
+        if columns:
+            read_columns = list(dict.fromkeys([DELTA_KEY] + columns))
+
+        delta_table = pq.read_table(file_path, columns=read_columns + [DELTA_MASK] if read_columns else None)
+        base_table = pq.read_table(file_path.parent / base_name, columns=read_columns)
+
+        return self.decode(base_table, delta_table, columns)
@@ -0,0 +1,441 @@
+import os
+import argparse
+import threading
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import dask.dataframe as dd
+
+from src.config.constant import PROVIDER_LIST, SNAPSHOT_FORMAT, PARQUET_COMPRESSION, PARQUET_ROW_GROUP_SIZE, HOT_TIER_ENABLED, SNAPSHOT_DELTA_ENCODING, SNAPSHOT_DEDUP
+from system.file_paths import get_data_dir_imported
+from src.import_data.hot_tier import SnapshotHotTier
+from src.import_data.catalog import SnapshotCatalog, ALIAS_EXTENSION
+from src.import_data.snapshot_delta import SnapshotDelta
+from src.import_data.chain_schema import ChainSchema, CHAIN_SCHEMA, CHAIN_SCHEMA_VERSION, CONTENT_HASH_KEY
+from src.import_data.quality_flags import QUALITY_COLUMN, QUALITY_INPUT_COLUMNS, QUALITY_TIME_COLUMN
+
+
+SNAPSHOT_EXTENSIONS = ['.parquet', '.csv']
+
+# In-memory dtypes applied at load time (strike and underlying_price stay float64)
+CATEGORY_COLUMNS = ['underlying_symbol', 'option_type', 'tick']
+INT32_COLUMNS = ['dte', 'open_interest', 'volume', 'bid_size', 'ask_size']
+FLOAT32_COLUMNS = [
+    'theoretical_price',
+    'last_trade_price',
+    'bid',
+    'ask',
+    'open',
+    'high',
+    'low',
+    'prev_close',
+    'change',
+    'change_percent',
+    'implied_volatility',
+    'delta',
+    'gamma',
+    'theta',
+    'vega',
+    'rho',
+]
+
+
+###############################################################
+###############################################################
+### Class -> Snapshot files (Parquet / CSV)
+###############################################################
+###############################################################
+
+class SnapshotStore:
+    def __init__(self):
+
+        self.current_dir = get_data_dir_imported()
+
+    ###############################################################
+    ### Snapshot paths
+    ###############################################################
+
+    @staticmethod
+    def snapshot_stem(selected_date, hour_time, utc_value, selected_option):
+        """
+        File name without extension: <date>_<hour>_<utc>_<symbol>
+        """
+        utc_value = utc_value.replace(':', '_')
+        hour_time = hour_time.replace(':', '_')
+
+        return f'{selected_date}_{hour_time}_{utc_value}_{selected_option}'
+
+    def snapshot_path(self, provider, selected_option, selected_date, stem, file_format=SNAPSHOT_FORMAT):
+
+        return (Path(self.current_dir) / provider / selected_option / selected_date / f'{stem}.{file_format}').resolve()
+
+    def find_snapshot(self, selected_option, selected_date, stem):
+        """
+        Returns the first existing snapshot for all providers, Parquet is preferred over CSV.
+        """
+        for provider in PROVIDER_LIST:
+
+            symbol_dir = (Path(self.current_dir) / provider / selected_option / selected_date).resolve()
+
+            if not symbol_dir.exists():
+                continue
+
+            for extension in SNAPSHOT_EXTENSIONS:
+                file_path = symbol_dir / f'{stem}{extension}'
+
+                if file_path.exists():
+                    return file_path
+
+        return None
+
+    ###############################################################
+    ### Typed Table
+    ###############################################################
+
+    def to_table(self, df):
+        """
+        Validated CHAIN_SCHEMA table (see ChainSchema.enforce).
+        """
+        return ChainSchema().enforce(df)
+
+    ###############################################################
+    ### Projection & Predicate (pushed down into the reader)
+    ###############################################################
+
+    @staticmethod
+    def build_filter(strike_range=None, expirations=None, option_type=None):
+        """
+        Same rules as DataFilter: strike_dw < strike < strike_up.
+        """
+        expression = None
+
+        def combine(expression, new_expression):
+            return new_expression if expression is None else expression & new_expression
+
+        if strike_range:
+            strike_dw, strike_up = strike_range
+            expression = combine(expression, (pc.field('strike') > float(strike_dw)) & (pc.field('strike') < float(strike_up)))
+
+        if expirations:
+            expiration_list = [pd.Timestamp(exp).strftime('%Y-%m-%d') for exp in expirations]
+            expression = combine(expression, pc.field('expiration').isin(expiration_list))
+
+        if option_type:
+            option_list = [option_type] if isinstance(option_type, str) else list(option_type)
+            expression = combine(expression, pc.field('option_type').isin(option_list))
+
+        return expression
+
+    @staticmethod
+    def compact_table(table):
+        """
+        Categorical low-cardinality strings, int32 counts, float32 quotes & greeks,
+        datetime64 expirations. Casts are done in Arrow, before to_pandas.
+        """
+        for i, name in enumerate(table.column_names):
+
+            column = table.column(i)
+
+            if name in CATEGORY_COLUMNS and pa.types.is_string(column.type):
+                column = pc.dictionary_encode(column)
+
+            elif name in INT32_COLUMNS and pa.types.is_integer(column.type):
+                column = pc.cast(column, pa.int32())
+
+            elif name in FLOAT32_COLUMNS and pa.types.is_floating(column.type):
+                column = pc.cast(column, pa.float32())
+
+            elif name == 'expiration' and pa.types.is_string(column.type):
+                column = pc.strptime(column, format='%Y-%m-%d', unit='ns', error_is_null=True)
+
+            else:
+                continue
+
+            table = table.set_column(i, name, column)
+
+        return table
+
+    @staticmethod
+    def to_dataframe(table, compact=True):
+
+        if not compact:
+            return table.to_pandas(split_blocks=True)
+
+        return SnapshotStore.compact_table(table).to_pandas(
+            split_blocks=True,
+            date_as_object=False,
+            types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get,
+        )
+
+    @staticmethod
+    def select(table, columns=None, filters=None):
+
+        if filters is not None:
+            table = table.filter(filters)
+
+        if columns:
+            table = table.select([col for col in columns if col in table.column_names])
+
+        return table
+
+    ###############################################################
+    ### Write / Read
+    ###############################################################
+
+    @staticmethod
+    def tmp_path(file_path):
+        """
+        Temporary sibling of file_path (not matched by the *.parquet / *.csv patterns).
+        """
+        file_path = Path(file_path)
+
+        return file_path.with_name(f'.{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+    def write_parquet(self, table, file_path):
+        """
+        Atomic write: readers see the previous file or the new one, never a partial file.
+        """
+        tmp_path = self.tmp_path(file_path)
+
+        table = ChainSchema.stamp(table)
+
+        try:
+            pq.write_table(table, tmp_path, compression=PARQUET_COMPRESSION, row_group_size=PARQUET_ROW_GROUP_SIZE)
+            os.replace(tmp_path, file_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def delta_base(self, file_path):
+        """
+        First full snapshot of the day (same provider/symbol/date directory), if it is older than file_path.
+        Snapshots written with another chain schema version have other columns and are not used as a base.
+        """
+        class_SnapshotDelta = SnapshotDelta()
+
+        for base_path in sorted(Path(file_path).parent.glob('*.parquet')):
+
+            if base_path.name >= Path(file_path).name:
+                return None
+
+            if not class_SnapshotDelta.is_delta(base_path) and ChainSchema.version(pq.read_schema(base_path)) == CHAIN_SCHEMA_VERSION:
+                return base_path
+
+        return None
+
+    def expand_dependents(self, base_path):
+        """
+        Rewrites the deltas built on base_path as full snapshots (before base_path is replaced).
+        """
+        class_SnapshotDelta = SnapshotDelta()
+
+        for file_path in class_SnapshotDelta.dependents(base_path):
+            self.write_parquet(class_SnapshotDelta.read_table(file_path), file_path)
+
+    def materialize_aliases(self, file_path):
+        """
+        Rewrites the aliases pointing to file_path as real snapshots (before file_path is replaced).
+        """
+        class_SnapshotCatalog = SnapshotCatalog()
+
+        aliases = class_SnapshotCatalog.aliases_of(file_path)
+
+        if not aliases:
+            return
+
+        table = self.read_table(file_path)
+
+        for alias_path in aliases:
+            self.write_snapshot(table.to_pandas(), alias_path.with_suffix(Path(file_path).suffix), dedup=False)
+
+    def release(self, file_path):
+        """
+        file_path is about to be replaced: deltas built on it and aliases to it get their own copy,
+        an alias previously written for the same snapshot is removed.
+        """
+        alias_path = file_path.with_suffix(ALIAS_EXTENSION)
+
+        if alias_path.exists():
+            SnapshotCatalog().unregister(alias_path)
+            alias_path.unlink()
+
+        if file_path.exists():
+            self.materialize_aliases(file_path)
+
+            if file_path.suffix == '.parquet':
+                self.expand_dependents(file_path)
+
+    def write_alias(self, file_path, previous, content_hash):
+        """
+        Records file_path as an alias of the previous snapshot (same content), returns the target file.
+        """
+        class_SnapshotCatalog = SnapshotCatalog()
+
+        target_path = Path(previous['alias_of'] or previous['file_path'])
+        alias_path = file_path.with_suffix(ALIAS_EXTENSION)
+
+        if file_path.exists():
+            self.release(file_path)
+            class_SnapshotCatalog.unregister(file_path)
+            file_path.unlink()
+
+        class_SnapshotCatalog.write_alias(alias_path, target_path, content_hash)
+        class_SnapshotCatalog.register(alias_path)
+
+        print(f"Unchanged chain: {alias_path.name} -> {target_path.name}")
+
+        return target_path
+
+    def write_snapshot(self, df, file_path, delta_encoding=SNAPSHOT_DELTA_ENCODING, dedup=SNAPSHOT_DEDUP):
+        """
+        Returns the file holding the snapshot: file_path, or the previous snapshot
+        when the chain is unchanged (dedup, only an alias is written).
+        """
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Schema enforced once here, whatever the provider and the format
+        table = self.to_table(df)
+        content_hash = ChainSchema.content_hash(table)
+
+        if dedup:
+            previous = SnapshotCatalog().previous(file_path)
+
+            if previous is not None and previous['content_hash'] == content_hash:
+
+                previous_path = Path(previous['file_path'])
+
+                # Same snapshot imported again, nothing to write
+                if previous_path in (file_path, file_path.with_suffix(ALIAS_EXTENSION)):
+                    return Path(previous['alias_of'] or previous_path)
+
+                # Another format of the same snapshot is not an alias
+                if previous_path.with_suffix('') != file_path.with_suffix(''):
+                    return self.write_alias(file_path, previous, content_hash)
+
+        # Replaced in place (os.replace), the deltas and aliases built on the old file are expanded first
+        self.release(file_path)
+
+        catalog_df = table.select(['strike', 'expiration']).to_pandas()
+
+        if file_path.suffix == '.parquet':
+
+            base_path = self.delta_base(file_path) if delta_encoding else None
+
+            if base_path is not None:
+                delta_table = SnapshotDelta().encode(pq.read_table(base_path), table, base_path.name)
+                table = delta_table if delta_table is not None else table
+
+            metadata = dict(table.schema.metadata or {})
+            metadata[CONTENT_HASH_KEY] = content_hash.encode()
+
+            self.write_parquet(table.replace_schema_metadata(metadata), file_path)
+
+        else:
+            tmp_path = self.tmp_path(file_path)
+            table.to_pandas().to_csv(tmp_path)
+            os.replace(tmp_path, file_path)
+
+        SnapshotCatalog().register(file_path, catalog_df, content_hash)
+
+        return file_path
+
+    def read_table(self, file_path, columns=None, filters=None):
+
+        file_path = Path(file_path)
+
+        if file_path.suffix == '.parquet':
+
+            read_columns = columns
+
+            # Written before the quality flags: conform() computes them from their input columns
+            if columns and QUALITY_COLUMN in columns:
+                file_columns = pq.read_schema(file_path).names
+                if QUALITY_COLUMN not in file_columns:
+                    inputs = QUALITY_INPUT_COLUMNS + [QUALITY_TIME_COLUMN] * (QUALITY_TIME_COLUMN in file_columns)
+                    read_columns = [col for col in dict.fromkeys(columns + inputs) if col != QUALITY_COLUMN]
+
+            if SnapshotDelta.is_delta(file_path):
+                table = self.select(SnapshotDelta().read_table(file_path, read_columns if filters is None else None), read_columns, filters)
+            else:
+                table = pq.read_table(file_path, columns=read_columns, filters=filters)
+
+            return self.select(ChainSchema().conform(table), columns)
+
+        ddf = dd.read_csv(str(file_path), assume_missing=True)
+
+        return self.select(self.to_table(ddf.compute()), columns, filters)
+
+    def read_snapshot(self, file_path, hot_tier=HOT_TIER_ENABLED, columns=None, filters=None, compact=True):
+
+        if not hot_tier:
+            return self.to_dataframe(self.read_table(file_path, columns, filters), compact)
+
+        class_SnapshotHotTier = SnapshotHotTier()
+
+        table = class_SnapshotHotTier.get(file_path)
+
+        if table is not None:
+            table = self.select(table, columns, filters)
+
+        elif columns or filters is not None:
+            # partial read, the hot tier is only filled by full loads
+            table = self.read_table(file_path, columns, filters)
+
+        else:
+            table = self.read_table(file_path)
+            class_SnapshotHotTier.put(file_path, table)
+
+        return self.to_dataframe(table, compact)
+
+    ###############################################################
+    ### Migration CSV -> Parquet
+    ###############################################################
+
+    def migrate_csv_to_parquet(self, selected_option=None, remove_csv=True):
+
+        converted = []
+
+        for provider in PROVIDER_LIST:
+
+            provider_dir = (Path(self.current_dir) / provider).resolve()
+
+            if not provider_dir.exists():
+                continue
+
+            pattern = f'{selected_option}/*/*.csv' if selected_option else '*/*/*.csv'
+
+            for csv_path in sorted(provider_dir.glob(pattern)):
+
+                parquet_path = csv_path.with_suffix('.parquet')
+
+                try:
+                    df = pd.read_csv(csv_path)
+                    self.write_snapshot(df, parquet_path, dedup=False)
+
+                except (pd.errors.EmptyDataError, pa.ArrowInvalid) as e:
+                    print(f"Skipped {csv_path}: {e}")
+                    continue
+
+                if remove_csv:
+                    os.remove(csv_path)
+
+                print(f"Converted: {csv_path.name} -> {parquet_path.name}")
+                converted.append(parquet_path)
+
+        return converted
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Convert imported CSV snapshots to Parquet.')
+    parser.add_argument('--symbol', default=None, help='Only convert this option symbol (default: all).')
+    parser.add_argument('--keep-csv', action='store_true', help='Keep the original CSV files.')
+    args = parser.parse_args()
+
+    files = SnapshotStore().migrate_csv_to_parquet(args.symbol, remove_csv=not args.keep_csv)
+    print(f"{len(files)} snapshot(s) converted")
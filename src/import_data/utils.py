@@ -7,12 +7,16 @@ from pathlib import Path
 
 import pandas as pd
 import pytz
-import dask.dataframe as dd
 import yfinance as yf
 
 from src.import_data.import_data import ImportOptionSymbol
+from src.import_data.snapshot_store import SnapshotStore
+from src.import_data.catalog import SnapshotCatalog
+from src.import_data.snapshot_dataset import SnapshotDataset
+from src.import_data.bar_store import BarStore
+from src.import_data.chain_schema import ChainSchema
 
-from src.config.constant import PROVIDER_LIST, UTC, CBOE_CLOSE_UTC, UTC_NAME
+from src.config.constant import PROVIDER_LIST, UTC, CBOE_CLOSE_UTC, UTC_NAME, SPOT_POLICY
 from system.file_paths import get_data_dir_imported, get_global_dir
 
 
@@ -86,10 +90,16 @@ class LoadingData:
 
 
     ###############################################################
-    ### Import CSV data Already imported
+    ### Import CSV / Parquet data Already imported
     ###############################################################
 
-    def get_data_csv(self, selected_option, selected_date, selected_hour):
+    def get_data_csv(self, selected_option, selected_date, selected_hour, columns=None, strike_range=None, expirations=None, option_type=None, compact=True):
+        """
+        columns, strike_range (strike_dw, strike_up), expirations and option_type
+        are pushed down into the file reader: only needed columns and row groups are decoded.
+        compact: category / int32 / float32 / datetime64 dtypes. Use compact=False for
+        DataFrames sent to a dcc.Store (string expirations, float64 values).
+        """
 
         utc_value = UTC_NAME[UTC]
 
@@ -100,31 +110,30 @@ class LoadingData:
 
         if selected_hour == CBOE_CLOSE_UTC:
             selected_hour = 'close'
-      
-        utc_value = utc_value.replace(":", "_")
 
-        file_name = f'{selected_date}_{selected_hour}_{utc_value}_{selected_option}.csv'
-    
-        symbol_dirs = (
-            (Path(self.current_dir) / provider / selected_option / selected_date).resolve()
-            for provider in PROVIDER_LIST
-        )
-        
-        for symbol_dir in symbol_dirs:
-            if symbol_dir.exists():
-                file_path = symbol_dir / file_name
-                
-                try:
-                    ddf = dd.read_csv(str(file_path), assume_missing=True)
-                
-                    df = ddf.compute()
-                    return df
-                except FileNotFoundError:
-                    print(f"File not found : {file_path}")
-                except pd.errors.EmptyDataError:
-                    print(f"Empty file : {file_path}")
-                except Exception as e:
-                    print(f"Error : {e}")
+        file_path = SnapshotCatalog().find(selected_option, selected_date, selected_hour, utc=utc_value.replace(':', '_'))
+
+        if file_path is None or not file_path.exists():
+
+            stem = SnapshotStore.snapshot_stem(selected_date, selected_hour, utc_value, selected_option)
+            file_path = SnapshotStore().find_snapshot(selected_option, selected_date, stem)
+
+            if file_path is not None:
+                SnapshotCatalog().register(file_path)
+
+        if file_path is not None:
+
+            filters = SnapshotStore.build_filter(strike_range, expirations, option_type)
+
+            try:
+                return SnapshotStore().read_snapshot(file_path, columns=columns, filters=filters, compact=compact)
+
+            except FileNotFoundError:
+                print(f"File not found : {file_path}")
+            except pd.errors.EmptyDataError:
+                print(f"Empty file : {file_path}")
+            except Exception as e:
+                print(f"Error : {e}")
         
         raise ValueError(f"File not found {selected_option} to date {selected_date}")
     
@@ -153,7 +162,8 @@ class LoadingData:
             print(f"Error (date): {e}")
             return 0.0
 
-    
+        class_BarStore = BarStore()
+
         def localize_timezone(df):
             if df.empty:
                 return df
@@ -188,14 +198,7 @@ class LoadingData:
 
         def get_1m_data():
             try:
-                if selected_date == datetime.now().astimezone(pytz.timezone(UTC)):
-                    data = yf.download(underlying_ticker, period='1d', interval='1m', multi_level_index=False)
-                else:
-                    data = yf.download(underlying_ticker,
-                                    start=selected_date.strftime('%Y-%m-%d'),
-                                    end=end_date.strftime('%Y-%m-%d'),
-                                    interval='1m',
-                                    multi_level_index=False)
+                data = class_BarStore.get_bars(underlying_ticker, '1m', selected_date, end_date)
                 data = localize_timezone(data)
                 if not data.empty:
                     data_filtered = data[data.index.time == selected_hour]
@@ -211,11 +214,7 @@ class LoadingData:
         def get_1h_data():
             try:
 
-                data = yf.download(underlying_ticker,
-                                start=selected_date.strftime('%Y-%m-%d'),
-                                end=end_date.strftime('%Y-%m-%d'),
-                                interval='1h',
-                                multi_level_index=False)
+                data = class_BarStore.get_bars(underlying_ticker, '1h', selected_date, end_date)
                 
                 if data.empty:
                     return None
@@ -240,11 +239,7 @@ class LoadingData:
         def get_1d_data():
             try:
 
-                data = yf.download(underlying_ticker,
-                                start=selected_date.strftime('%Y-%m-%d'),
-                                end=end_date.strftime('%Y-%m-%d'),
-                                interval='1d',
-                                multi_level_index=False)
+                data = class_BarStore.get_bars(underlying_ticker, '1d', selected_date, end_date)
                 
                 if data.empty:
                     return None
@@ -286,6 +281,46 @@ class LoadingData:
             print(f"Global Error: {e}")
             return 0.0
 
+    ###############################################################
+    ### Spot resolution (price captured with the snapshot first)
+    ###############################################################
+
+    @staticmethod
+    def snapshot_spot(dataframe):
+        """
+        underlying_price carried by a loaded chain, None if missing.
+        """
+        if dataframe is None or len(dataframe) == 0 or 'underlying_price' not in dataframe.columns:
+            return None
+
+        prices = pd.to_numeric(dataframe['underlying_price'], errors='coerce')
+        prices = prices[prices > 0]
+
+        return round(float(prices.median()), 2) if not prices.empty else None
+
+    def get_spot(self, ticker, selected_date='', selected_hour='', dataframe=None, selected_option=None, policy=SPOT_POLICY):
+        """
+        policy 'snapshot': underlying_price of the chain (dataframe, or the snapshot of selected_option),
+        yFinance only if the snapshot has no price. policy 'network': yFinance bars.
+        """
+        if policy == 'snapshot':
+
+            spot = self.snapshot_spot(dataframe)
+
+            if spot is None and selected_option and selected_date and selected_hour:
+                try:
+                    spot = self.snapshot_spot(self.get_data_csv(selected_option, selected_date, selected_hour, columns=['underlying_price']))
+                except ValueError:
+                    spot = None
+
+            if spot is not None:
+                return spot
+
+        if selected_hour:
+            return self.get_st_price_hour(None, selected_date, selected_hour, ticker)
+
+        return self.get_last_st(None, True, selected_date, ticker)
+
     ###############################################################
     ### get last underlying price
     ###############################################################
@@ -318,17 +353,12 @@ class LoadingData:
     def _fetch_recent_data(self, ticker, now):
  
         day_range = now - pd.Timedelta(days=3)
-        last_data = yf.download(
-            ticker,
-            start=day_range.strftime('%Y-%m-%d'),
-            end=now.strftime('%Y-%m-%d'),
-            interval='1d'
-        )
+        last_data = BarStore().get_bars(ticker, '1d', day_range, now)
         
         if last_data.empty:
             return 0.0
             
-        self.last_st = round(last_data['Close'].iloc[-1].to_numpy()[0], 2)
+        self.last_st = round(float(last_data['Close'].iloc[-1]), 2)
         return self.last_st
 
     def _fetch_historical_data(self, ticker, selected_date, now):
@@ -337,7 +367,7 @@ class LoadingData:
             selected_date = pd.to_datetime(selected_date)
    
             if selected_date.date() == now.date():
-                last_data = yf.download(ticker, period='1d', interval='1m')
+                last_data = BarStore().get_bars(ticker, '1m', selected_date, selected_date + pd.Timedelta(days=1))
             else:
        
                 end_date = selected_date - pd.Timedelta(days=1)
@@ -348,7 +378,7 @@ class LoadingData:
                     last_data = self._download_data(ticker, end_date, selected_date)
 
             if not last_data.empty:
-                self.last_st = round(last_data['Close'].iloc[-1].to_numpy()[0], 2)
+                self.last_st = round(float(last_data['Close'].iloc[-1]), 2)
             else:
                 self.last_st = 0.0
 
@@ -361,12 +391,7 @@ class LoadingData:
     def _download_data(self, ticker, start_date, end_date):
 
         try:
-            return yf.download(
-                ticker,
-                start=start_date.strftime('%Y-%m-%d'),
-                end=end_date.strftime('%Y-%m-%d'),
-                interval='1d'
-            )
+            return BarStore().get_bars(ticker, '1d', start_date, end_date)
         except Exception as e:
             print(f"Download failed for {ticker}: {str(e)}")
             return pd.DataFrame()
@@ -483,58 +508,40 @@ class LoadingData:
 
         return selected_option, None, [], [], []
     
+    ###############################################################
+    ### Load History (compacted dataset)
+    ###############################################################
+
+    def get_history_data(self, selected_option, available_data, columns=None, compact=True):
+        """
+        available_data: {date: [hours]} -> {(date, hour): DataFrame}, read in one scan of the compacted dataset.
+        Snapshots not compacted yet are missing from the result, load them with get_data_csv.
+        """
+        keys = [(date_str, hour) for date_str, hours in available_data.items() for hour in hours]
+
+        try:
+            return SnapshotDataset().load(selected_option, keys, columns, compact)
+        except Exception as e:
+            print(f"Dataset read error ({selected_option}): {e}")
+            return {}
+
     ###############################################################
     ### Load Dates Already Imported
     ###############################################################
     
     def load_date_imported(self, option_ticker, hour=False, selected_date=None):
-        date_list = []
 
         if selected_date and isinstance(selected_date, date):
        
             selected_date = selected_date.strftime('%Y-%m-%d')
 
-        for provider in PROVIDER_LIST:
-
-            if not hour:
+        class_SnapshotCatalog = SnapshotCatalog()
 
-                symbol_dir = (Path(self.current_dir) / provider / option_ticker).resolve()
-
-                if not symbol_dir.exists():
-                    continue
-
-                try:
-              
-                    date_list = sorted(set(
-                        file[:10] 
-                        for file in os.listdir(symbol_dir) 
-                        if not file.endswith(".json") and len(file) >= 10
-                    ))
-                    
-                    return date_list
-
-                except OSError as e:
-                    print(f"Error accessing {symbol_dir}: {e}")
-                
-            elif hour and selected_date:
+        if not hour:
+            return class_SnapshotCatalog.list_dates(option_ticker)
                 
-                symbol_dir = (Path(self.current_dir) / provider / option_ticker / selected_date).resolve()
-            
-                if not symbol_dir.exists():
-                    continue
-            
-                try:
-    
-                    hour_list = sorted(set(
-                        file[11:16] 
-                        for file in os.listdir(symbol_dir) 
-                        if not file.endswith(".json") and len(file) >= 10
-                    ))
-                    
-                    return hour_list
-
-                except OSError as e:
-                    print(f"Error accessing {symbol_dir}: {e}")
+        elif hour and selected_date:
+            return class_SnapshotCatalog.list_hours(option_ticker, selected_date)
             
         return []
     
@@ -545,23 +552,11 @@ class LoadingData:
 
     def load_existing_symbols(self):
         class_ImportOptionSymbol = ImportOptionSymbol()
-        ALL_SYMBOL_LIST = class_ImportOptionSymbol.load_all_symbol_json()
-
-        SYMBOL_LIST = []  
-
-        for provider in PROVIDER_LIST:
-
-            symbol_dir = (Path(self.current_dir) / provider).resolve()
-
-            if not os.path.exists(symbol_dir):
-                print(f"Directory does not exist: {symbol_dir}")
-                continue
+        ALL_SYMBOL_SET = set(class_ImportOptionSymbol.load_all_symbol_json())
 
-            existing_symbols = [
-                entry.name for entry in os.scandir(symbol_dir) if entry.is_dir()
-            ]
+        existing_symbols = SnapshotCatalog().list_symbols()
 
-            SYMBOL_LIST.extend(symbol for symbol in existing_symbols if symbol in ALL_SYMBOL_LIST)
+        SYMBOL_LIST = [symbol for symbol in existing_symbols if symbol in ALL_SYMBOL_SET]
 
         return SYMBOL_LIST
     
@@ -641,7 +636,7 @@ class ConvertData:
         
         if isinstance(df, pd.DataFrame):
         
-            df[col] = pd.to_datetime(df[col])
+            df[col] = ChainSchema.expiration_dates(df[col])
             
             df['expiration_in_day'] = (df[col] - current_date).dt.days
             
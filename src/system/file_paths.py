@@ -27,4 +27,13 @@ def get_data_dir_imported():
     return get_data_dir() / 'imported'
 
 def get_global_dir():
-    return Path(__file__).resolve().parent.parent.parent
\ No newline at end of file
+    return Path(__file__).resolve().parent.parent.parent
+
+def get_data_dir_cache():
+    return get_data_dir() / 'cache'
+
+def get_data_dir_dataset():
+    return get_data_dir() / 'dataset'
+
+def get_data_dir_drop():
+    return get_data_dir() / 'drop'
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+
 from dash import Dash, html, dcc, Input, State, Output
 import dash_bootstrap_components as dbc
 from src.gui.pages.sidebar import SideBar
@@ -11,6 +13,7 @@ import src.gui.callbacks.callBackSettings
 import src.gui.callbacks.callBackImportData
 import src.gui.callbacks.callBackMarketMetrics
 import src.gui.callbacks.callBackPayoff
+from src.import_data.snapshot_dataset import SnapshotDataset
 
 dbc_css = "https://cdn.jsdelivr.net/gh/AnnMarieW/dash-bootstrap-templates/dbc.min.css"
 
@@ -108,4 +111,7 @@ def display_page(pathname):
     return styles
 
 if __name__ == '__main__':
+    # debug=True runs the app in a reloader child process: compaction only starts in the serving one
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        SnapshotDataset().start_background()
     app.run(debug=True)
\ No newline at end of file